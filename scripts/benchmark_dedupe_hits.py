@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compare hit deduplication with per-query URI/hash computation against precomputed index-time keys."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wks.api.index._chunk_dedupe_keys import _chunk_dedupe_keys
+from wks.api.search._dedupe_hits import _dedupe_hits
+from wks.api.search._rrf import rrf_merge
+
+
+def _ranked_lists(indexes: int, depth: int, docs: int, seed: int, precomputed: bool) -> list[list[dict]]:
+    rng = np.random.default_rng(seed)
+    ranked_lists: list[list[dict]] = []
+    for _ in range(indexes):
+        ranked: list[dict] = []
+        for row in rng.choice(docs * 4, size=depth, replace=False).tolist():
+            uri = f"/data/papers/doc{row // 4}.txt"
+            text = f"chunk {row} " + "reactor coolant fission yield " * 40
+            hit = {"uri": uri, "chunk_index": row % 4, "score": 1.0, "tokens": 256, "text": text}
+            if precomputed:
+                canonical_uri, text_hash = _chunk_dedupe_keys(uri, text)
+                hit.update({"canonical_uri": canonical_uri, "text_hash": text_hash})
+            ranked.append(hit)
+        ranked_lists.append(ranked)
+    return ranked_lists
+
+
+def _strategy_dedupe(ranked_lists: list[list[dict]], k: int) -> list[dict]:
+    per_index = [_dedupe_hits(ranked, len(ranked)) for ranked in ranked_lists]
+    return _dedupe_hits(rrf_merge(per_index, k), k)
+
+
+def _time(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--indexes", type=int, default=3)
+    parser.add_argument("--docs", type=int, default=2_000)
+    parser.add_argument("-k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    depth = args.k * 3
+    legacy = _ranked_lists(args.indexes, depth, args.docs, args.seed, precomputed=False)
+    precomputed = _ranked_lists(args.indexes, depth, args.docs, args.seed, precomputed=True)
+    legacy_hits = _strategy_dedupe(legacy, args.k)
+    precomputed_hits = _strategy_dedupe(precomputed, args.k)
+    mismatches = int(
+        [(hit["uri"], hit["chunk_index"]) for hit in legacy_hits]
+        != [(hit["uri"], hit["chunk_index"]) for hit in precomputed_hits]
+    )
+
+    legacy_ms = _time(lambda: _strategy_dedupe(legacy, args.k), args.repeat)
+    precomputed_ms = _time(lambda: _strategy_dedupe(precomputed, args.k), args.repeat)
+
+    print(f"strategy:          {args.indexes} indexes x {depth} hits (k={args.k})")
+    print(f"per-query keys:    {legacy_ms:8.3f} ms/query")
+    print(f"precomputed keys:  {precomputed_ms:8.3f} ms/query")
+    print(f"speedup:           {legacy_ms / max(precomputed_ms, 1e-9):8.2f}x")
+    print(f"ranking mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
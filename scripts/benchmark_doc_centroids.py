@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Compare brute-force semantic top-k against two-stage document-centroid retrieval."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wks.api.index._DocumentCentroids import _build_document_centroids
+
+
+def _top_k(matrix: np.ndarray, query: np.ndarray, k: int, rows: np.ndarray | None = None) -> np.ndarray:
+    candidates = np.arange(len(matrix)) if rows is None else rows
+    scores = (matrix[candidates] @ query).astype(np.float64)
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return candidates[top[np.lexsort((top, -scores[top]))]]
+
+
+def _time(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--chunks", type=int, default=24, help="mean chunks per document")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--noise", type=float, default=0.6, help="chunk spread around its document topic")
+    parser.add_argument("--candidates", type=int, default=200, help="documents kept by stage one")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    chunk_counts = rng.integers(1, 2 * args.chunks, size=args.docs)
+    uri_ids = np.repeat(np.arange(args.docs), chunk_counts)
+    chunk_indexes = np.concatenate([np.arange(count) for count in chunk_counts])
+    topics = rng.standard_normal((args.docs, args.dim), dtype=np.float32)
+    topics /= np.linalg.norm(topics, axis=1, keepdims=True)
+    noise = rng.standard_normal((len(uri_ids), args.dim), dtype=np.float32)
+    noise *= args.noise / np.sqrt(args.dim)
+    matrix = topics[uri_ids] + noise
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    queries = matrix[rng.choice(len(matrix), size=args.queries, replace=False)]
+    queries += args.noise / np.sqrt(args.dim) * rng.standard_normal(queries.shape, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    build_start = time.perf_counter()
+    centroids = _build_document_centroids(matrix, uri_ids, chunk_indexes, args.docs)
+    build_ms = (time.perf_counter() - build_start) * 1000.0
+
+    def staged(query: np.ndarray) -> np.ndarray:
+        return _top_k(matrix, query, args.k, centroids.rows(centroids.top_documents(query, args.candidates)))
+
+    recall = np.mean(
+        [len(set(staged(query).tolist()) & set(_top_k(matrix, query, args.k).tolist())) / args.k for query in queries]
+    )
+    brute_ms = _time(lambda: [_top_k(matrix, query, args.k) for query in queries], 1) / args.queries
+    staged_ms = _time(lambda: [staged(query) for query in queries], 1) / args.queries
+
+    print(f"matrix:             {len(matrix)} x {args.dim} float32 over {args.docs} documents")
+    print(f"centroids:          {len(centroids.vectors)} vectors built in {build_ms:.1f} ms")
+    print(f"brute force:        {brute_ms:8.2f} ms/query")
+    print(f"two-stage (M={args.candidates}):{' ' * max(0, 4 - len(str(args.candidates)))}{staged_ms:8.2f} ms/query")
+    print(f"speedup:            {brute_ms / max(staged_ms, 1e-9):8.2f}x")
+    print(f"recall@{args.k}:{' ' * (12 - len(str(args.k)))}{recall:8.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compare exhaustive postings scoring with MaxScore top-k on a synthetic corpus."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wks.api.index._PostingStore import _PostingStats
+from wks.api.search._bm25 import _build_term_postings, _score_postings, _top_k_postings
+
+
+def _synthetic_postings(chunk_count: int, term_count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(20, 400, size=chunk_count)
+    stats = _PostingStats(chunk_count=chunk_count, total_length=int(lengths.sum()), next_chunk_id=chunk_count)
+    doc_freqs = np.minimum(chunk_count, (chunk_count * 0.6 / np.arange(1, term_count + 1) ** 1.1).astype(int) + 1)
+    postings = []
+    for doc_freq in doc_freqs:
+        chunk_ids = rng.choice(chunk_count, size=int(doc_freq), replace=False)
+        tfs = rng.geometric(0.5, size=len(chunk_ids))
+        rows = [(int(c), int(tf), int(lengths[c])) for c, tf in zip(chunk_ids, tfs, strict=True)]
+        postings.append(_build_term_postings(rows, stats))
+    return postings
+
+
+def _time(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=400_000)
+    parser.add_argument("--terms", type=int, default=2_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--query-terms", type=int, default=4)
+    parser.add_argument("-k", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"Building {args.terms} synthetic posting lists over {args.chunks} chunks...")
+    postings = _synthetic_postings(args.chunks, args.terms, args.seed)
+    queries = [
+        [postings[int(i)] for i in rng.choice(args.terms, size=args.query_terms, replace=False)]
+        for _ in range(args.queries)
+    ]
+    queries.extend([[postings[0], postings[1], postings[int(i)]] for i in rng.integers(50, args.terms, size=10)])
+
+    exhaustive_ms = 0.0
+    pruned_ms = 0.0
+    mismatches = 0
+    for query in queries:
+        exhaustive_ms += _time(lambda query=query: _score_postings(query), repeat=3)
+        pruned_ms += _time(lambda query=query: _top_k_postings(query, args.k), repeat=3)
+        expected = _score_postings(query)[1][: args.k]
+        actual = _top_k_postings(query, args.k)[1]
+        if not np.allclose(expected, actual, rtol=1e-5):
+            mismatches += 1
+
+    print(f"queries:            {len(queries)} (k={args.k})")
+    print(f"exhaustive scoring: {exhaustive_ms / len(queries):8.2f} ms/query")
+    print(f"maxscore top-k:     {pruned_ms / len(queries):8.2f} ms/query")
+    print(f"speedup:            {exhaustive_ms / max(pruned_ms, 1e-9):8.2f}x")
+    print(f"score mismatches:   {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare the per-row Python semantic ranking loop with the vectorized top-k path."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wks.api.index._collection_fingerprint import _CollectionFingerprint
+from wks.api.search._dedupe_hits import _dedupe_hits
+from wks.api.search._SearchRuntime import (
+    _SEARCH_RUNTIME,
+    _extract_path_segments,
+    _row_ids,
+    _segment_rows,
+    _SemanticIndexState,
+)
+from wks.services import search as search_service
+
+
+def _synthetic_state(rows: int, dim: int, seed: int) -> tuple[_SemanticIndexState, list[dict]]:
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(size=(rows, dim)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    folders = ["agents", "reports", "notes", "papers", "drafts"]
+    docs = [
+        {
+            "uri": f"file://host/data/{folders[row % len(folders)]}/doc{row // 8}.txt",
+            "chunk_index": row % 8,
+            "tokens": 64,
+            "text": f"chunk {row}",
+        }
+        for row in range(rows)
+    ]
+    uris, uri_ids, chunk_indexes = _row_ids([(doc["uri"], doc["chunk_index"]) for doc in docs])
+    state = _SemanticIndexState(
+        index_name="benchmark",
+        embedding_model="benchmark-model",
+        fingerprint=_CollectionFingerprint(count=rows, newest_id=None),
+        generation=0,
+        uris=uris,
+        uri_ids=uri_ids,
+        chunk_indexes=chunk_indexes,
+        matrix=matrix,
+        segment_rows=_segment_rows(uris, uri_ids),
+    )
+    return state, docs
+
+
+def _loop_rank(state: _SemanticIndexState, docs: list[dict], segments: list[frozenset[str]], query_embedding, query, k):
+    scores = state.matrix @ query_embedding
+    query_terms = {term.lower() for term in query.split() if term}
+    boosted: list[float] = []
+    for index, row_segments in enumerate(segments):
+        matches = sum(1 for term in query_terms if term in row_segments)
+        boosted.append(float(scores[index]) * (1.0 + 0.2 * matches))
+    ranked = sorted(range(len(boosted)), key=lambda item: boosted[item], reverse=True)
+    hits = [{**docs[item], "score": round(boosted[item], 4)} for item in ranked]
+    return _dedupe_hits(hits, k)
+
+
+def _time(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Building a synthetic {args.rows} x {args.dim} semantic index...")
+    state, docs = _synthetic_state(args.rows, args.dim, args.seed)
+    segments = [_extract_path_segments(doc["uri"]) for doc in docs]
+    _SEARCH_RUNTIME.get_semantic_chunks = lambda _config, _state, rows: [docs[row] for row in rows]
+    query = "agents quarterly report"
+
+    loop_ms = 0.0
+    vector_ms = 0.0
+    mismatches = 0
+    for row in np.random.default_rng(args.seed).choice(args.rows, size=args.queries, replace=False):
+        query_embedding = state.matrix[int(row)]
+        expected = _loop_rank(state, docs, segments, query_embedding, query, args.k)
+        actual = search_service._rank_semantic_hits(None, state, query_embedding, query, args.k)
+        loop_ms += _time(lambda q=query_embedding: _loop_rank(state, docs, segments, q, query, args.k), repeat=1)
+        vector_ms += _time(
+            lambda q=query_embedding: search_service._rank_semantic_hits(None, state, q, query, args.k), repeat=3
+        )
+        if [(hit["uri"], hit["score"]) for hit in expected] != [(hit["uri"], hit["score"]) for hit in actual]:
+            mismatches += 1
+
+    print(f"queries:           {args.queries} (k={args.k})")
+    print(f"python loop:       {loop_ms / args.queries:8.2f} ms/query")
+    print(f"vectorized top-k:  {vector_ms / args.queries:8.2f} ms/query")
+    print(f"speedup:           {loop_ms / max(vector_ms, 1e-9):8.2f}x")
+    print(f"ranking mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Compare single-process semantic top-k scoring against multi-process sharded scoring."""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wks.api.index._ShardedMatrix import _ShardedMatrix
+
+
+def _single_top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = (matrix @ query).astype(np.float64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.lexsort((top, -scores[top]))]
+
+
+def _time(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--shards", type=int, default=min(os.cpu_count() or 2, 8))
+    parser.add_argument("-k", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    matrix = rng.standard_normal((args.rows, args.dim), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = matrix[args.rows // 2].copy()
+    sharded = _ShardedMatrix(matrix, args.shards)
+    sharded.top_k(query, args.k)
+
+    expected = _single_top_k(matrix, query, args.k)
+    rows, _ = sharded.top_k(query, args.k)
+    mismatches = int(not np.array_equal(rows, expected))
+
+    single_ms = _time(lambda: _single_top_k(matrix, query, args.k), args.repeat)
+    sharded_ms = _time(lambda: sharded.top_k(query, args.k), args.repeat)
+
+    print(f"matrix:             {args.rows} x {args.dim} float32 ({matrix.nbytes / 2**30:.2f} GiB)")
+    print(f"single process:     {single_ms:8.2f} ms/query")
+    print(f"{args.shards} shards:{' ' * (12 - len(str(args.shards)))}{sharded_ms:8.2f} ms/query")
+    print(f"speedup:            {single_ms / max(sharded_ms, 1e-9):8.2f}x")
+    print(f"ranking mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -39,6 +39,88 @@ def test_rest_server_read_endpoints(monkeypatch, tmp_path):
     assert "monitor" in sections_response.json()["sections"]
 
 
+def test_rest_server_search_batch(monkeypatch, tmp_path):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={"default_index": "main", "indexes": {"main": {"engine": "textpass"}}},
+    )
+    write_and_index_search_docs(tmp_path)
+
+    client = TestClient(create_app(service=WKSService()))
+    response = client.post("/search/batch", json={"queries": ["fission", "reactor"], "k": 2})
+    missing = client.post("/search/batch", json={"queries": ["fission"], "index": "missing"})
+
+    assert response.status_code == 200
+    assert [len(result["hits"]) > 0 for result in response.json()["results"]] == [True, True]
+    assert missing.status_code == 404
+
+
+def test_rest_server_search_stream(monkeypatch, tmp_path):
+    import json
+
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={"default_index": "main", "indexes": {"main": {"engine": "textpass"}}},
+    )
+    write_and_index_search_docs(tmp_path)
+
+    client = TestClient(create_app(service=WKSService()))
+    ndjson = client.get("/search/stream", params={"query": "fission", "k": 2})
+    sse = client.get("/search/stream", params={"query": "fission", "k": 2, "format": "sse"})
+    missing = client.get("/search/stream", params={"query": "fission", "index": "missing"})
+
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [event["event"] for event in events] == ["hits", "summary"]
+    assert events[0]["hits"] == events[1]["summary"]["hits"]
+    assert sse.status_code == 200
+    assert sse.headers["content-type"].startswith("text/event-stream")
+    assert sse.text.startswith("event: hits\ndata: ")
+    assert "event: summary\n" in sse.text
+    assert missing.status_code == 404
+
+
+def test_rest_server_search_timings(monkeypatch, tmp_path):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={"default_index": "main", "indexes": {"main": {"engine": "textpass"}}},
+    )
+    write_and_index_search_docs(tmp_path)
+
+    client = TestClient(create_app(service=WKSService()))
+    plain = client.get("/search", params={"query": "fission"})
+    timed = client.get("/search", params={"query": "fission", "timings": "true"})
+
+    assert plain.json()["timings"] is None
+    assert "scoring" in timed.json()["timings"]["phases"]
+    assert timed.json()["timings"]["cache"]["lexical_state:main"] is True
+
+
+def test_rest_server_search_filters(monkeypatch, tmp_path):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={"default_index": "main", "indexes": {"main": {"engine": "textpass"}}},
+    )
+    docs = write_and_index_search_docs(tmp_path)
+
+    client = TestClient(create_app(service=WKSService()))
+    under = client.get("/search", params={"query": "reactor", "uri_prefix": str(docs[2])})
+    by_ext = client.get("/search", params=[("query", "reactor"), ("extensions", "md"), ("extensions", "pdf")])
+
+    assert [hit["uri"].rsplit("/", 1)[-1] for hit in under.json()["hits"]] == ["coolant.txt"]
+    assert by_ext.status_code == 200
+    assert by_ext.json()["hits"] == []
+
+
 def test_rest_server_maps_service_failures(monkeypatch, tmp_path):
     _SEARCH_RUNTIME.reset()
     setup_search_config(
@@ -62,3 +144,22 @@ def test_rest_server_validates_default_config_at_startup(monkeypatch):
 
     with pytest.raises(ValueError, match="broken config"):
         create_app()
+
+
+def test_rest_server_ready_reports_warmup(monkeypatch, tmp_path):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={"default_index": "main", "indexes": {"main": {"engine": "textpass"}}},
+    )
+    write_and_index_search_docs(tmp_path)
+    service = WKSService()
+
+    with TestClient(create_app(service=service)) as client:
+        service.ready(wait=30)
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert response.json()["indexes"] == ["main"]
@@ -0,0 +1,29 @@
+import pytest
+
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.database.BulkWriteOp import BulkWriteOp
+from wks.api.database.Database import Database
+
+pytestmark = pytest.mark.database
+
+
+def test_bulk_write_applies_neutral_operations_and_counts(tracked_wks_config):
+    with Database(WKSConfig.load().database, "bulk_write_test") as db:
+        db.insert_many([{"key": 1}, {"key": 2}, {"key": 3}])
+        counts = db.bulk_write(
+            [
+                BulkWriteOp.insert({"key": 4}),
+                BulkWriteOp.update({"key": {"$in": [1, 2]}}, {"$set": {"seen": True}}),
+                BulkWriteOp.delete({"key": 3}),
+            ],
+            ordered=False,
+        )
+        docs = sorted(db.find({}, {"_id": 0}), key=lambda doc: doc["key"])
+
+    assert (counts.inserted, counts.updated, counts.deleted) == (1, 2, 1)
+    assert docs == [{"key": 1, "seen": True}, {"key": 2, "seen": True}, {"key": 4}]
+
+
+def test_bulk_write_with_no_operations_is_a_no_op(tracked_wks_config):
+    with Database(WKSConfig.load().database, "bulk_write_test") as db:
+        assert not db.bulk_write([]).changed
@@ -62,6 +62,235 @@ def test_cmd_index_alt_index(tmp_path, monkeypatch):
     assert result.output["chunk_count"] >= 1
 
 
+def test_cmd_index_maintains_postings_on_reindex(tmp_path, monkeypatch):
+    from wks.api.index._ChunkStore import _ChunkStore
+
+    test_file = make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    test_file.write_text("Nuclear fission products are generated during reactor operation.\n")
+    assert run_cmd(cmd, "main", str(test_file)).success is True
+    test_file.write_text("Reactor coolant loops transfer heat.\n")
+    assert run_cmd(cmd, "main", str(test_file)).success is True
+
+    with Database(WKSConfig.load().database, "index") as db:
+        store = _ChunkStore(db)
+        stats = store.posting_stats("main")
+        postings = store.postings("main", ["fission", "coolant"])
+
+    assert stats is not None
+    assert stats.chunk_count == 1
+    assert stats.total_length == 5
+    assert postings["fission"] == []
+    assert len(postings["coolant"]) == 1
+
+
+def test_cmd_index_skips_unchanged_file_unless_forced(tmp_path, monkeypatch):
+    import wks.api.transform.cmd_engine as cmd_engine_module
+
+    test_file = make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    test_file.write_text("Nuclear fission products are generated during reactor operation.\n" * 20)
+    first = run_cmd(cmd, "main", str(test_file))
+    assert first.output["unchanged"] is False
+
+    transforms = []
+    original_cmd_engine = cmd_engine_module.cmd_engine
+
+    def counting_cmd_engine(*args, **kwargs):
+        transforms.append(args)
+        return original_cmd_engine(*args, **kwargs)
+
+    monkeypatch.setattr(cmd_engine_module, "cmd_engine", counting_cmd_engine)
+
+    second = run_cmd(cmd, "main", str(test_file))
+    assert second.success is True
+    assert second.output["unchanged"] is True
+    assert second.output["chunk_count"] == first.output["chunk_count"]
+    assert second.output["checksum"] == first.output["checksum"]
+    assert transforms == []
+
+    forced = run_cmd(cmd, "main", str(test_file), force=True)
+    assert forced.output["unchanged"] is False
+    assert len(transforms) == 1
+
+    test_file.write_text("Reactor coolant loops transfer heat.\n")
+    changed = run_cmd(cmd, "main", str(test_file))
+    assert changed.output["unchanged"] is False
+    assert changed.output["checksum"] != first.output["checksum"]
+    assert len(transforms) == 2
+
+
+def test_cmd_index_reports_zero_chunk_file_as_unchanged(tmp_path, monkeypatch):
+    test_file = make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    test_file.write_text("")
+
+    first = run_cmd(cmd, "main", str(test_file))
+    second = run_cmd(cmd, "main", str(test_file))
+    test_file.write_text("Reactor coolant loops transfer heat.\n")
+    changed = run_cmd(cmd, "main", str(test_file))
+
+    assert first.output["chunk_count"] == 0
+    assert first.output["unchanged"] is False
+    assert second.output["unchanged"] is True
+    assert second.output["chunk_count"] == 0
+    assert changed.output["unchanged"] is False
+    assert changed.output["chunk_count"] == 1
+
+
+def test_cmd_index_reindexes_when_index_spec_changes(tmp_path, monkeypatch):
+    test_file = make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    test_file.write_text("Nuclear fission products are generated during reactor operation.\n" * 20)
+    first = run_cmd(cmd, "main", str(test_file))
+    assert run_cmd(cmd, "main", str(test_file)).output["unchanged"] is True
+
+    config_path = tmp_path / "wks_home" / "config.json"
+    config_dict = json.loads(config_path.read_text())
+    config_dict["index"]["indexes"]["main"]["max_tokens"] = 64
+    config_dict["index"]["indexes"]["main"]["overlap_tokens"] = 16
+    config_path.write_text(json.dumps(config_dict))
+
+    resized = run_cmd(cmd, "main", str(test_file))
+    assert resized.output["unchanged"] is False
+    assert resized.output["chunk_count"] > first.output["chunk_count"]
+
+
+def test_chunk_store_replace_uri_writes_only_the_delta(tmp_path, monkeypatch):
+    from wks.api.index._Chunk import _Chunk
+    from wks.api.index._ChunkStore import _ChunkStore
+
+    make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    uri = str(URI.from_path(tmp_path / "doc.txt"))
+    texts = ["reactor coolant loops", "fission products decay", "control rods absorb neutrons"]
+
+    def chunks(*items):
+        return [
+            _Chunk(text=text, uri=uri, chunk_index=i, tokens=3, is_continuation=i > 0) for i, text in enumerate(items)
+        ]
+
+    with Database(WKSConfig.load().database, "index") as db:
+        store = _ChunkStore(db)
+        first = store.replace_uri("main", uri, "v1", chunks(*texts))
+        ids = {doc["chunk_index"]: doc["chunk_id"] for doc in db.find({"index_name": "main"})}
+        trigrams = db.get_database()["index_trigrams"]
+        gram_ids = {doc["gram"]: doc["_id"] for doc in trigrams.find({"index_name": "main"})}
+        edited = store.replace_uri("main", uri, "v2", chunks(texts[0], "fission yields differ", texts[2]))
+        regram_ids = {doc["gram"]: doc["_id"] for doc in trigrams.find({"index_name": "main"})}
+        generation = store.generation("main")
+        repeated = store.replace_uri("main", uri, "v2", chunks(texts[0], "fission yields differ", texts[2]))
+        docs = {doc["chunk_index"]: doc for doc in db.find({"index_name": "main"})}
+        stats = store.posting_stats("main")
+        postings = store.postings("main", ["decay", "yields"])
+        fuzzy_hits, _ = store.search_trigrams("main", "yields", 5)
+
+        assert (first.inserted, first.updated, first.deleted) == (3, 0, 0)
+        assert (edited.inserted, edited.updated, edited.deleted) == (1, 2, 1)
+        assert not repeated.changed
+        assert store.generation("main") == generation
+    assert docs[0]["chunk_id"] == ids[0] and docs[2]["chunk_id"] == ids[2]
+    assert docs[1]["chunk_id"] not in ids.values()
+    assert {doc["checksum"] for doc in docs.values()} == {"v2"}
+    assert stats is not None and stats.chunk_count == 3
+    assert postings["decay"] == []
+    assert [chunk_id for chunk_id, _, _ in postings["yields"]] == [docs[1]["chunk_id"]]
+    assert [hit.text for hit in fuzzy_hits] == ["fission yields differ"]
+    assert regram_ids["coo"] == gram_ids["coo"]
+    assert "cay" in gram_ids and "cay" not in regram_ids
+
+
+def test_embedding_store_replace_uri_replaces_only_changed_vectors(tmp_path, monkeypatch):
+    from wks.api.index._build_embedding_docs import build_embedding_docs
+    from wks.api.index._Chunk import _Chunk
+    from wks.api.index._EmbeddingMatrix import _EmbeddingMatrix
+    from wks.api.index._EmbeddingStore import _EmbeddingStore
+
+    make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    uri = str(URI.from_path(tmp_path / "doc.txt"))
+    chunks = [_Chunk(text=f"chunk {i}", uri=uri, chunk_index=i, tokens=2, is_continuation=False) for i in range(3)]
+
+    def docs(vectors, mode="text"):
+        return build_embedding_docs("main", "test-model", mode, chunks, np.asarray(vectors, dtype=np.float32))
+
+    vectors = np.eye(3, dtype=np.float32)
+    with Database(WKSConfig.load().database, "index_embeddings") as db:
+        store = _EmbeddingStore(db)
+        store.replace_uri("main", "test-model", uri, docs(vectors))
+        before = {doc["chunk_index"]: doc["_id"] for doc in db.find({"index_name": "main"})}
+        vectors[1] = [0.0, 0.6, 0.8]
+        changed = store.replace_uri("main", "test-model", uri, docs(vectors))
+        snapshot = _EmbeddingMatrix("main", "test-model").load()
+        generation = store.generation("main", "test-model")
+        repeated = store.replace_uri("main", "test-model", uri, docs(vectors))
+        after = {doc["chunk_index"]: doc["_id"] for doc in db.find({"index_name": "main"})}
+        _, matrix = store.get_all("main", "test-model")
+
+        assert (changed.inserted, changed.updated, changed.deleted) == (0, 1, 0)
+        assert not repeated.changed
+        assert store.generation("main", "test-model") == generation
+        remode = store.replace_uri("main", "test-model", uri, docs(vectors, mode="image"))
+    assert after == before
+    assert np.allclose(np.sort(matrix, axis=0), np.sort(vectors, axis=0))
+    assert snapshot is not None
+    live = snapshot.matrix if snapshot.live_rows is None else snapshot.matrix[snapshot.live_rows]
+    assert np.allclose(dict(zip(snapshot.rows, live, strict=True))[(uri, 1)], vectors[1])
+    assert (remode.inserted, remode.updated, remode.deleted) == (3, 0, 3)
+
+
+def test_embedding_store_replace_uri_fingerprints_collection_once(tmp_path, monkeypatch):
+    from wks.api.index import _EmbeddingStore as embedding_store_mod
+    from wks.api.index._build_embedding_docs import build_embedding_docs
+    from wks.api.index._Chunk import _Chunk
+    from wks.api.index._collection_fingerprint import _collection_fingerprint
+    from wks.api.index._EmbeddingMatrix import _EmbeddingMatrix
+
+    make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    model_filter = {"index_name": "main", "embedding_model": "test-model"}
+    fingerprinted: list[dict] = []
+
+    def recording_fingerprint(db, filter_doc):
+        fingerprinted.append(filter_doc)
+        return _collection_fingerprint(db, filter_doc)
+
+    monkeypatch.setattr(embedding_store_mod, "_collection_fingerprint", recording_fingerprint)
+
+    def docs(uri, count, scale):
+        chunks = [
+            _Chunk(text=f"{uri} {i}", uri=uri, chunk_index=i, tokens=2, is_continuation=False) for i in range(count)
+        ]
+        vectors = np.full((count, 3), scale, dtype=np.float32)
+        return build_embedding_docs("main", "test-model", "text", chunks, vectors)
+
+    first, second = (str(URI.from_path(tmp_path / name)) for name in ("a.txt", "b.txt"))
+    with Database(WKSConfig.load().database, "index_embeddings") as db:
+        store = embedding_store_mod._EmbeddingStore(db)
+        for uri, chunk_docs in ((first, docs(first, 3, 0.1)), (second, docs(second, 2, 0.2)), (second, [])):
+            fingerprinted.clear()
+            store.replace_uri("main", "test-model", uri, chunk_docs)
+            snapshot = _EmbeddingMatrix("main", "test-model").load()
+
+            assert fingerprinted == [model_filter]
+            assert snapshot is not None
+            assert snapshot.fingerprint == _collection_fingerprint(db, model_filter)
+
+
+def test_database_reset_index_clears_postings_and_trigrams(tmp_path, monkeypatch):
+    from wks.api.database.cmd_reset import cmd_reset
+    from wks.api.index._ChunkStore import _ChunkStore
+
+    test_file = make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
+    test_file.write_text("Nuclear fission products are generated during reactor operation.\n")
+    assert run_cmd(cmd, "main", str(test_file)).success is True
+
+    assert run_cmd(cmd_reset, "index").success is True
+
+    with Database(WKSConfig.load().database, "index") as db:
+        store = _ChunkStore(db)
+        assert store.posting_stats("main") is None
+        assert store.postings("main", ["fission"])["fission"] == []
+        assert store.search_trigrams("main", "fission", 5)[0] == []
+    assert run_cmd(cmd, "main", str(test_file)).success is True
+    with Database(WKSConfig.load().database, "index") as db:
+        stats = _ChunkStore(db).posting_stats("main")
+    assert stats is not None and stats.chunk_count == 1
+
+
 def test_cmd_index_unknown_index(tmp_path, monkeypatch):
     test_file = make_index_env(tmp_path, monkeypatch, indexes=default_indexes())
     test_file.write_text("content")
@@ -111,6 +340,39 @@ def test_cmd_index_populates_embeddings_for_semantic_index(tmp_path, monkeypatch
     with Database(config.database, "index_embeddings") as db:
         assert db.count_documents({"index_name": "main", "embedding_model": "test-model"}) >= 1
 
+    assert run_cmd(cmd, "main", str(test_file)).output["unchanged"] is True
+    with Database(config.database, "index_embeddings") as db:
+        db.delete_many({"index_name": "main"})
+    assert run_cmd(cmd, "main", str(test_file)).output["unchanged"] is False
+
+
+def test_cmd_index_stores_dedupe_keys_on_chunks_and_embeddings(tmp_path, monkeypatch):
+    from hashlib import sha256
+
+    test_file = make_index_env(
+        tmp_path,
+        monkeypatch,
+        indexes={"default_index": "main", "indexes": {"main": {"engine": "textpass", "embedding_model": "test-model"}}},
+    )
+    monkeypatch.setattr(
+        "wks.api.index._embedding_utils.embed_texts",
+        lambda texts, model_name, batch_size: np.ones((len(texts), 3), dtype=np.float32),
+    )
+    test_file.write_text("Nuclear fission products are generated during reactor operation.\n")
+
+    assert run_cmd(cmd, "main", str(test_file)).success is True
+
+    config = WKSConfig.load()
+    with Database(config.database, "index") as db:
+        chunks = list(db.find({"index_name": "main"}, {"_id": 0}))
+    with Database(config.database, "index_embeddings") as db:
+        embeddings = list(db.find({"index_name": "main"}, {"_id": 0}))
+    assert chunks
+    assert len(embeddings) == len(chunks)
+    for doc in chunks + embeddings:
+        assert doc["canonical_uri"] == str(URI.from_any(doc["uri"]))
+        assert doc["text_hash"] == sha256(doc["text"].encode("utf-8")).hexdigest()
+
 
 def test_cmd_index_populates_combo_embeddings_for_image_text_index(tmp_path, monkeypatch):
     image_path = tmp_path / "cat.png"
@@ -168,4 +430,6 @@ def test_cmd_index_populates_combo_embeddings_for_image_text_index(tmp_path, mon
         doc = db.find_one({"index_name": "main", "embedding_model": "test-clip-model"}, {"_id": 0})
     assert doc is not None
     assert doc["embedding_mode"] == "image_text_combo"
-    assert len(doc["embedding"]) == 3
+    assert doc["embedding_dtype"] == "float32"
+    assert doc["embedding_dim"] == 3
+    assert np.frombuffer(doc["embedding"], dtype="<f4").shape == (3,)
@@ -1,11 +1,20 @@
 import json
+import time
 from pathlib import Path
 
+import numpy as np
+import pytest
+
 from tests.conftest import run_cmd
+from wks.api.config.URI import URI
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.database.Database import Database
+from wks.api.index import _BackfillPipeline
+from wks.api.index._EmbeddingMatrix import _EmbeddingMatrix
 from wks.api.index.cmd_backfill import cmd_backfill
 
 
-def _setup_backfill_env(tmp_path, monkeypatch, min_priority: float = 0.0) -> Path:
+def _setup_backfill_env(tmp_path, monkeypatch, min_priority: float = 0.0, **index_overrides) -> Path:
     from tests.conftest import minimal_config_dict
 
     doc_dir = tmp_path / "docs"
@@ -22,6 +31,7 @@ def _setup_backfill_env(tmp_path, monkeypatch, min_priority: float = 0.0) -> Pat
                 "min_priority": min_priority,
             }
         },
+        **index_overrides,
     }
 
     wks_home = tmp_path / "wks_home"
@@ -119,3 +129,159 @@ def test_backfill_empty_monitor(tmp_path, monkeypatch):
     assert result.output["indexed"] == 0
     assert result.output["skipped"] == 0
     assert result.output["errors"] == []
+
+
+def _semantic_backfill_env(tmp_path, monkeypatch, backfill: dict) -> tuple[list[str], list[list[str]]]:
+    doc_dir = _setup_backfill_env(tmp_path, monkeypatch, backfill=backfill)
+    config_path = tmp_path / "wks_home" / "config.json"
+    config_dict = json.loads(config_path.read_text())
+    config_dict["index"]["indexes"]["main"].update(
+        {"embedding_model": "test-model", "max_tokens": 4, "overlap_tokens": 0}
+    )
+    config_path.write_text(json.dumps(config_dict))
+    calls: list[list[str]] = []
+
+    def fake_embed_texts(texts: list[str], model_name: str, batch_size: int) -> np.ndarray:
+        calls.append(list(texts))
+        return np.asarray([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+    uris = []
+    for i in range(5):
+        doc = doc_dir / f"note{i}.txt"
+        doc.write_text(f"document {i} talks about reactor physics and fission yield number {i}\n")
+        uris.append(str(URI.from_path(doc)))
+    _populate_monitor([(uri, 50.0) for uri in uris])
+    return uris, calls
+
+
+def test_backfill_batches_embeddings_across_files(tmp_path, monkeypatch):
+    uris, calls = _semantic_backfill_env(tmp_path, monkeypatch, {"embed_batch_size": 1000, "write_batch_files": 2})
+
+    result = cmd_backfill("main")
+    messages = [message for _, message in result.progress_callback(result)]
+
+    assert result.success is True
+    assert result.output["indexed"] == 5
+    assert result.output["errors"] == []
+    assert len(calls) == 1
+    assert len(calls[0]) == result.output["chunk_count"] >= 5
+    assert any("files/s" in message and "chunks/s" in message for message in messages)
+    config = WKSConfig.load()
+    with Database(config.database, "index_embeddings") as db:
+        stored = {doc["uri"] for doc in db.find({"index_name": "main"}, {"uri": 1})}
+    snapshot = _EmbeddingMatrix("main", "test-model").load()
+    assert stored == set(uris)
+    assert snapshot is not None and len(snapshot.rows) == result.output["chunk_count"]
+
+
+def test_backfill_skips_unchanged_files_unless_forced(tmp_path, monkeypatch):
+    uris, _ = _semantic_backfill_env(tmp_path, monkeypatch, {})
+    first = run_cmd(cmd_backfill, "main")
+    transforms: list[str] = []
+    real_transform = _BackfillPipeline._transform_content
+
+    def counting_transform(engine, file_path, config):
+        transforms.append(file_path.name)
+        return real_transform(engine, file_path, config)
+
+    monkeypatch.setattr("wks.api.index._BackfillPipeline._transform_content", counting_transform)
+    Path(URI.from_any(uris[0]).path).write_text("a rewritten note about coolant loops\n")
+
+    second = run_cmd(cmd_backfill, "main")
+    forced = run_cmd(cmd_backfill, "main", force=True)
+
+    assert first.output["indexed"] == 5
+    assert second.output["indexed"] == 1
+    assert second.output["unchanged"] == 4
+    assert forced.output["indexed"] == 5
+    assert forced.output["unchanged"] == 0
+    assert sorted(transforms) == sorted(["note0.txt"] + [f"note{i}.txt" for i in range(5)])
+
+
+def test_backfill_plans_unchanged_files_with_bulk_lookups(tmp_path, monkeypatch):
+    uris, _ = _semantic_backfill_env(tmp_path, monkeypatch, {})
+    assert run_cmd(cmd_backfill, "main").output["indexed"] == 5
+    opened: list[str] = []
+    real_enter = Database.__enter__
+
+    def counting_enter(self):
+        opened.append(self.name)
+        return real_enter(self)
+
+    monkeypatch.setattr(Database, "__enter__", counting_enter)
+    jobs, missing, unchanged = _BackfillPipeline._plan_jobs(WKSConfig.load(), uris + uris[:1])
+
+    assert jobs == {} and missing == []
+    assert unchanged == uris
+    assert sorted(opened) == ["index", "index_embeddings"]
+
+
+def test_backfill_reports_failed_transforms(tmp_path, monkeypatch):
+    uris, _ = _semantic_backfill_env(tmp_path, monkeypatch, {"transform_workers": 2, "chunk_workers": 2})
+    real_transform = _BackfillPipeline._transform_content
+
+    def flaky_transform(engine, file_path, config):
+        if file_path.name == "note3.txt":
+            raise RuntimeError("boom")
+        return real_transform(engine, file_path, config)
+
+    monkeypatch.setattr("wks.api.index._BackfillPipeline._transform_content", flaky_transform)
+
+    result = run_cmd(cmd_backfill, "main")
+
+    assert result.output["indexed"] == 4
+    assert result.output["skipped"] == 1
+    assert result.output["errors"] == [f"{uris[3]}: Index 'main': Transform failed: boom"]
+
+
+@pytest.mark.parametrize(
+    "target", ["_build_embedding_docs.build_embedding_docs", "_BackfillPipeline._BackfillPipeline._write"]
+)
+def test_backfill_raises_stage_failures_instead_of_hanging(tmp_path, monkeypatch, target):
+    _semantic_backfill_env(tmp_path, monkeypatch, {"embed_batch_size": 2, "write_batch_files": 1})
+
+    def broken(*args, **kwargs):
+        raise KeyError("stage broke")
+
+    module, _, attr = target.rpartition(".")
+    monkeypatch.setattr(f"wks.api.index.{module}.{attr}", broken)
+
+    with pytest.raises(KeyError, match="stage broke"):
+        run_cmd(cmd_backfill, "main")
+
+
+def test_backfill_never_overfills_a_single_slot_chunk_queue(tmp_path, monkeypatch):
+    uris, _ = _semantic_backfill_env(
+        tmp_path, monkeypatch, {"queue_size": 1, "transform_workers": 3, "chunk_workers": 2, "write_batch_files": 1}
+    )
+    real_chunk = _BackfillPipeline._BackfillPipeline._chunk
+
+    def slow_chunk(self, job, future):
+        time.sleep(0.02)
+        real_chunk(self, job, future)
+
+    monkeypatch.setattr(_BackfillPipeline._BackfillPipeline, "_chunk", slow_chunk)
+
+    result = run_cmd(cmd_backfill, "main")
+
+    assert result.output["indexed"] == len(uris)
+    assert result.output["errors"] == []
+
+
+def test_backfill_transforms_in_worker_processes(tmp_path, monkeypatch):
+    doc_dir = _setup_backfill_env(tmp_path, monkeypatch, backfill={"transform_workers": 2})
+    monkeypatch.setattr("wks.api.index._BackfillPipeline._IN_PROCESS_DATABASES", set())
+    uris = []
+    for i in range(3):
+        doc = doc_dir / f"note{i}.txt"
+        doc.write_text(f"Worker process content {i}.\n")
+        uris.append(str(URI.from_path(doc)))
+    _populate_monitor([(uri, 50.0) for uri in uris])
+
+    result = run_cmd(cmd_backfill, "main")
+
+    assert result.output["indexed"] == 3
+    assert result.output["errors"] == []
+    with Database(WKSConfig.load().database, "index") as db:
+        assert {doc["uri"] for doc in db.find({"index_name": "main"}, {"uri": 1})} == set(uris)
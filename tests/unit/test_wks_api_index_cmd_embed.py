@@ -4,10 +4,14 @@ import numpy as np
 from PIL import Image
 
 from tests.conftest import run_cmd
+from wks.api.config.URI import URI
 from wks.api.config.WKSConfig import WKSConfig
 from wks.api.database.Database import Database
+from wks.api.index._collection_fingerprint import _collection_fingerprint
+from wks.api.index._EmbeddingMatrix import _EmbeddingMatrix
 from wks.api.index.cmd import cmd as index_cmd
 from wks.api.index.cmd_embed import cmd_embed
+from wks.api.index.cmd_optimize import cmd_optimize
 
 
 def _make_index_env(tmp_path, monkeypatch):
@@ -162,3 +166,135 @@ def test_cmd_embed_image_text_combo_success(tmp_path, monkeypatch):
     assert result.success is True
     assert result.output["embedding_model"] == "test-clip-model"
     assert result.output["dimensions"] == 3
+
+
+def test_index_cmd_keeps_matrix_file_in_sync(tmp_path, monkeypatch):
+    _make_index_env(tmp_path, monkeypatch)
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", _fake_embed_texts)
+    docs = [tmp_path / "a.txt", tmp_path / "b.txt"]
+    docs[0].write_text("Nuclear fission products are generated during reactor operation.\n")
+    docs[1].write_text("Python scripts automate reactor analysis.\n")
+    for doc in docs:
+        assert run_cmd(index_cmd, "main", str(doc)).success is True
+    assert run_cmd(cmd_embed, "main", batch_size=8).success is True
+
+    docs[0].write_text("Fission fission fission.\n")
+    assert run_cmd(index_cmd, "main", str(docs[0])).success is True
+
+    config = WKSConfig.load()
+    with Database(config.database, "index_embeddings") as db:
+        stored = {
+            (doc["uri"], doc["chunk_index"]): np.frombuffer(doc["embedding"], dtype="<f4")
+            for doc in db.find({"index_name": "main", "embedding_model": "test-model"}, {"_id": 0})
+        }
+        fingerprint = _collection_fingerprint(db, {"index_name": "main", "embedding_model": "test-model"})
+    snapshot = _EmbeddingMatrix("main", "test-model").load()
+
+    assert snapshot is not None
+    assert snapshot.fingerprint == fingerprint
+    assert sorted(snapshot.rows) == sorted(stored)
+    for row, vector in zip(snapshot.rows, snapshot.matrix, strict=True):
+        np.testing.assert_allclose(vector, stored[row], rtol=1e-6)
+
+
+def test_index_cmd_assigns_new_rows_to_ann_lists(tmp_path, monkeypatch):
+    _make_index_env(tmp_path, monkeypatch)
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", _fake_embed_texts)
+    first = tmp_path / "a.txt"
+    first.write_text("Nuclear fission products are generated during reactor operation.\n")
+    assert run_cmd(index_cmd, "main", str(first)).success is True
+    assert run_cmd(cmd_optimize).output["built_ann"] == ["main"]
+    before = _EmbeddingMatrix("main", "test-model").load()
+
+    second = tmp_path / "b.txt"
+    second.write_text("Python scripts automate reactor analysis.\n")
+    assert run_cmd(index_cmd, "main", str(second)).success is True
+    after = _EmbeddingMatrix("main", "test-model").load()
+
+    assert before is not None and before.centroids is not None
+    assert after is not None and after.centroids is not None and after.lists is not None
+    np.testing.assert_array_equal(after.centroids, before.centroids)
+    assert len(after.lists) == len(after.rows) > len(before.rows)
+
+
+def test_cmd_embed_only_embeds_changed_chunks(tmp_path, monkeypatch):
+    _make_index_env(tmp_path, monkeypatch)
+    embedded: list[str] = []
+
+    def counting_embed_texts(texts: list[str], model_name: str, batch_size: int) -> np.ndarray:
+        embedded.extend(texts)
+        return _fake_embed_texts(texts, model_name, batch_size)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", counting_embed_texts)
+    docs = [tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "c.txt"]
+    docs[0].write_text("Nuclear fission products are generated during reactor operation.\n")
+    docs[1].write_text("Python scripts automate reactor analysis.\n")
+    docs[2].write_text("Python scripts automate reactor analysis.\n")
+    for doc in docs:
+        assert run_cmd(index_cmd, "main", str(doc)).success is True
+
+    first = run_cmd(cmd_embed, "main", batch_size=8)
+    assert first.output["embedded_count"] == 0
+    assert first.output["reused_count"] == first.output["chunk_count"]
+    assert first.output["removed_count"] == 0
+
+    config = WKSConfig.load()
+    model_filter = {"index_name": "main", "embedding_model": "test-model"}
+    with Database(config.database, "index_embeddings") as db:
+        c_uri = str(URI.from_path(docs[2]))
+        db.delete_many({**model_filter, "uri": c_uri})
+        orphan = dict(db.find_one({**model_filter, "uri": str(URI.from_path(docs[1]))}, {"_id": 0}))
+        db.insert_one({**orphan, "uri": "file://host/tmp/deleted.txt"})
+        db.update_one({**model_filter, "text": {"$regex": "fission"}}, {"$set": {"text_hash": "stale"}})
+    embedded.clear()
+
+    second = run_cmd(cmd_embed, "main", batch_size=8)
+
+    assert second.success is True
+    assert embedded == []
+    assert second.output["embedded_count"] == 1
+    assert second.output["reused_count"] == second.output["chunk_count"] - 1
+    assert second.output["removed_count"] == 2
+    with Database(config.database, "index_embeddings") as db:
+        stored = {
+            (doc["uri"], doc["chunk_index"]): np.frombuffer(doc["embedding"], dtype="<f4")
+            for doc in db.find(model_filter, {"_id": 0})
+        }
+        fingerprint = _collection_fingerprint(db, model_filter)
+    snapshot = _EmbeddingMatrix("main", "test-model").load()
+    assert len(stored) == second.output["chunk_count"]
+    assert snapshot is not None
+    assert snapshot.fingerprint == fingerprint
+    assert sorted(snapshot.rows) == sorted(stored)
+    for row, vector in zip(snapshot.rows, snapshot.matrix, strict=True):
+        np.testing.assert_allclose(vector, stored[row], rtol=1e-6)
+
+
+def test_cmd_embed_reads_text_only_for_chunks_missing_hashes(tmp_path, monkeypatch):
+    from wks.api.index._EmbeddingStore import _EmbeddingStore
+
+    _make_index_env(tmp_path, monkeypatch)
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", _fake_embed_texts)
+    for name, text in [("a.txt", "Nuclear fission products.\n"), ("b.txt", "Python scripts automate analysis.\n")]:
+        (tmp_path / name).write_text(text)
+        assert run_cmd(index_cmd, "main", str(tmp_path / name)).success is True
+    model_filter = {"index_name": "main", "embedding_model": "test-model"}
+    with Database(WKSConfig.load().database, "index_embeddings") as db:
+        db.update_one({**model_filter, "text": {"$regex": "fission"}}, {"$unset": {"text_hash": ""}})
+        original_find = db.find
+        text_reads: list[int] = []
+
+        def recording_find(filter_doc, projection=None, *args, **kwargs):
+            docs = list(original_find(filter_doc, projection, *args, **kwargs))
+            if projection and projection.get("text"):
+                text_reads.append(len(docs))
+            return docs
+
+        monkeypatch.setattr(db, "find", recording_find)
+        hashes = _EmbeddingStore(db).get_chunk_hashes("main", "test-model")
+
+    assert text_reads == [1]
+    assert all(doc["text_hash"] and "text" not in doc for doc in hashes)
+    result = run_cmd(cmd_embed, "main", batch_size=8)
+    assert result.output["embedded_count"] == 0
+    assert result.output["reused_count"] == result.output["chunk_count"]
@@ -0,0 +1,75 @@
+import numpy as np
+
+from tests.conftest import run_cmd
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.database.Database import Database
+from wks.api.index._EmbeddingStore import _EmbeddingStore
+from wks.api.index.cmd_migrate import cmd_migrate
+
+
+def test_cmd_migrate_packs_legacy_embeddings(wks_home):
+    config = WKSConfig.load()
+    legacy = [
+        {
+            "index_name": "main",
+            "embedding_model": "test-model",
+            "uri": f"file://host/tmp/doc{i}.txt",
+            "chunk_index": 0,
+            "tokens": 3,
+            "text": f"doc {i}",
+            "embedding": [float(i), 0.5, -1.0],
+        }
+        for i in range(3)
+    ]
+    with Database(config.database, "index_embeddings") as db:
+        db.insert_many([dict(doc) for doc in legacy])
+
+    first = run_cmd(cmd_migrate)
+    second = run_cmd(cmd_migrate)
+
+    assert first.success is True
+    assert first.output["converted"] == {"main:test-model": 3}
+    assert first.output["total_converted"] == 3
+    assert second.output["total_converted"] == 0
+    with Database(config.database, "index_embeddings") as db:
+        stored = db.find_one({"uri": "file://host/tmp/doc2.txt"}, {"_id": 0})
+        docs, matrix = _EmbeddingStore(db).get_all("main", "test-model")
+    assert stored is not None
+    assert stored["embedding_dtype"] == "float32"
+    assert stored["embedding_dim"] == 3
+    np.testing.assert_array_equal(np.frombuffer(stored["embedding"], dtype="<f4"), [2.0, 0.5, -1.0])
+    assert "embedding" not in docs[0]
+    np.testing.assert_array_equal(np.sort(matrix[:, 0]), [0.0, 1.0, 2.0])
+
+
+def test_cmd_migrate_flushes_conversions_in_bulk_batches(wks_home, monkeypatch):
+    config = WKSConfig.load()
+    with Database(config.database, "index_embeddings") as db:
+        db.insert_many(
+            [
+                {
+                    "index_name": "main",
+                    "embedding_model": "m",
+                    "uri": f"u{i}",
+                    "chunk_index": 0,
+                    "embedding": [1.0, 0.0],
+                }
+                for i in range(5)
+            ]
+        )
+    writes = []
+    original = Database.bulk_write
+
+    def counting_bulk_write(self, operations, ordered=True):
+        writes.append(len(operations))
+        return original(self, operations, ordered)
+
+    monkeypatch.setattr("wks.api.index._EmbeddingStore._PACK_BATCH_SIZE", 2)
+    monkeypatch.setattr(Database, "bulk_write", counting_bulk_write)
+
+    result = run_cmd(cmd_migrate)
+
+    assert result.output["total_converted"] == 5
+    assert writes == [2, 2, 1]
+    with Database(config.database, "index_embeddings") as db:
+        assert db.count_documents({"embedding_dtype": "float32"}) == 5
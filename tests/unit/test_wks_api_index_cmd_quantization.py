@@ -0,0 +1,45 @@
+from tests.conftest import run_cmd
+from tests.unit._search_test_helpers import fake_embed_texts, setup_search_config, write_and_index_search_docs
+from wks.api.index.cmd_embed import cmd_embed
+from wks.api.index.cmd_quantization import cmd_quantization
+
+
+def _semantic_env(tmp_path, monkeypatch):
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={
+            "default_index": "main",
+            "indexes": {"main": {"engine": "textpass", "embedding_model": "test-model"}},
+        },
+    )
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+    write_and_index_search_docs(tmp_path)
+    assert run_cmd(cmd_embed, "main", batch_size=8).success is True
+
+
+def test_cmd_quantization_reports_recall_and_size(tmp_path, monkeypatch):
+    _semantic_env(tmp_path, monkeypatch)
+
+    result = run_cmd(cmd_quantization, "main", k=2, queries=5)
+
+    assert result.success is True
+    assert result.output["query_count"] == 3
+    modes = {entry["mode"]: entry for entry in result.output["modes"]}
+    assert set(modes) == {"none", "float16", "int8"}
+    assert modes["float16"]["recall"] == 1.0
+    assert modes["int8"]["recall"] == 1.0
+    assert modes["float16"]["bytes"] * 2 == modes["none"]["bytes"]
+
+
+def test_cmd_quantization_requires_embedding_model(tmp_path, monkeypatch):
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={"default_index": "main", "indexes": {"main": {"engine": "textpass"}}},
+    )
+
+    result = run_cmd(cmd_quantization, "main")
+
+    assert result.success is False
+    assert "embedding_model" in result.output["errors"][0]
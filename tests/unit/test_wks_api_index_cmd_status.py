@@ -59,6 +59,22 @@ def test_optimize_creates_search_index(index_env):
     assert result.output["search_index"] == "wks_chunk_text_search"
 
 
+def test_optimize_indexes_embedding_chunk_keys(index_env):
+    from wks.api.config.WKSConfig import WKSConfig
+    from wks.api.database.Database import Database
+
+    run_cmd(cmd_optimize)
+
+    with Database(WKSConfig.load().database, "index_embeddings") as db:
+        indexes = db.get_database()["index_embeddings"].index_information()
+    assert indexes["wks_embeddings_chunk_key"]["key"] == [
+        ("index_name", 1),
+        ("embedding_model", 1),
+        ("uri", 1),
+        ("chunk_index", 1),
+    ]
+
+
 def test_status_specific_index(index_env):
     result = run_cmd(cmd_status, "main")
     assert result.success is True
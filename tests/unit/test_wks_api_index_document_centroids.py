@@ -0,0 +1,44 @@
+import numpy as np
+
+from wks.api.index._DocumentCentroids import _CENTROID_GROUP_ROWS, _build_document_centroids
+
+
+def _clustered(doc_count=30, chunks=4, dim=16, seed=7):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(doc_count, dim))
+    uri_ids = np.repeat(np.arange(doc_count), chunks)
+    matrix = (centers[uri_ids] + 0.1 * rng.normal(size=(len(uri_ids), dim))).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    permutation = rng.permutation(len(uri_ids))
+    chunk_indexes = np.tile(np.arange(chunks), doc_count)
+    return matrix[permutation], uri_ids[permutation], chunk_indexes[permutation], centers
+
+
+def test_document_centroids_group_long_documents():
+    uri_ids = np.array([0] * 40 + [1] * 3, dtype=np.int64)
+    chunk_indexes = np.concatenate([np.arange(40), np.arange(3)])
+    matrix = np.ones((len(uri_ids), 4), dtype=np.float32)
+
+    centroids = _build_document_centroids(matrix, uri_ids, chunk_indexes, 2)
+
+    assert _CENTROID_GROUP_ROWS == 16
+    assert centroids.document_count == 2
+    assert len(centroids.vectors) == 4
+    np.testing.assert_array_equal(centroids.doc_starts, [0, 3])
+    np.testing.assert_allclose(np.linalg.norm(centroids.vectors, axis=1), 1.0, rtol=1e-6)
+
+
+def test_document_centroids_pick_nearest_documents_and_their_rows():
+    matrix, uri_ids, chunk_indexes, centers = _clustered()
+    centroids = _build_document_centroids(matrix, uri_ids, chunk_indexes, 30)
+    query = (centers[11] / np.linalg.norm(centers[11])).astype(np.float32)
+
+    top = centroids.top_documents(query, 3)
+    restricted = centroids.top_documents(query, 3, allowed_uris=np.array([2, 5, 29]))
+
+    assert top[0] == 11
+    assert sorted(restricted.tolist()) == [2, 5, 29]
+    rows = centroids.rows(top)
+    np.testing.assert_array_equal(rows, np.sort(np.flatnonzero(np.isin(uri_ids, top))))
+    assert len(centroids.rows(np.empty(0, dtype=np.int64))) == 0
+    assert len(_build_document_centroids(matrix[:0], uri_ids[:0], chunk_indexes[:0], 0).top_documents(query, 3)) == 0
@@ -0,0 +1,90 @@
+import logging
+import sqlite3
+
+import numpy as np
+import pytest
+
+from wks.api.index._embed_with_cache import embed_with_cache
+from wks.api.index._EmbeddingCache import _EmbeddingCache
+
+
+def test_embedding_cache_round_trips_and_evicts_least_recently_used(tmp_path):
+    cache = _EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=3 * 16)
+    vectors = {f"h{i}": np.full(4, i, dtype=np.float32) for i in range(3)}
+    cache.put_many("model", "text", vectors)
+
+    assert cache.get_many("model", "clip_text", ["h0"]) == {}
+    assert sorted(cache.get_many("model", "text", ["h0", "missing"])) == ["h0"]
+    cache.put_many("model", "text", {"h3": np.full(4, 3, dtype=np.float32)})
+
+    remaining = cache.get_many("model", "text", ["h0", "h1", "h2", "h3"])
+    assert sorted(remaining) == ["h0", "h3"]
+    np.testing.assert_array_equal(remaining["h3"], np.full(4, 3, dtype=np.float32))
+    assert cache.stats() == {"entries": 2, "bytes": 32}
+
+
+def test_embed_with_cache_embeds_each_text_once(isolated_wks_home, monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake_embed_texts(texts: list[str], model_name: str, batch_size: int) -> np.ndarray:
+        calls.append(list(texts))
+        return np.asarray([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_clip_texts", fake_embed_texts)
+
+    first = embed_with_cache(["alpha", "beta", "alpha"], "test-model", 8)
+    second = embed_with_cache(["beta", "gamma"], "test-model", 8)
+    embed_with_cache(["beta"], "test-model", 8, mode="clip_text")
+    embed_with_cache(["beta"], "other-model", 8)
+
+    assert calls == [["alpha", "beta"], ["gamma"], ["beta"], ["beta"]]
+    np.testing.assert_array_equal(first, [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]])
+    np.testing.assert_array_equal(second, [[4.0, 1.0], [5.0, 1.0]])
+
+
+def test_embed_with_cache_rejects_mixed_vector_shapes(isolated_wks_home, monkeypatch):
+    dims = iter([2, 3])
+
+    def fake_embed_texts(texts: list[str], model_name: str, batch_size: int) -> np.ndarray:
+        return np.ones((len(texts), next(dims)), dtype=np.float32)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+    embed_with_cache(["alpha"], "test-model", 8)
+
+    with pytest.raises(RuntimeError, match=r"embedding_cache\.sqlite3"):
+        embed_with_cache(["alpha", "beta"], "test-model", 8)
+
+
+def test_embed_with_cache_falls_back_when_cache_is_unusable(isolated_wks_home, monkeypatch, caplog):
+    def broken_get_many(self, model_name, mode, text_hashes):
+        raise sqlite3.DatabaseError("file is not a database")
+
+    def fake_embed_texts(texts: list[str], model_name: str, batch_size: int) -> np.ndarray:
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    monkeypatch.setattr(_EmbeddingCache, "get_many", broken_get_many)
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+
+    with caplog.at_level(logging.WARNING):
+        vectors = embed_with_cache(["alpha", "beta"], "test-model", 8)
+
+    np.testing.assert_array_equal(vectors, np.ones((2, 2), dtype=np.float32))
+    assert "embedding_cache.sqlite3 is unavailable" in caplog.text
+
+
+def test_embed_with_cache_returns_vectors_when_cache_write_fails(isolated_wks_home, monkeypatch, caplog):
+    def locked_put_many(self, model_name, mode, vectors):
+        raise sqlite3.OperationalError("database is locked")
+
+    def fake_embed_texts(texts: list[str], model_name: str, batch_size: int) -> np.ndarray:
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    monkeypatch.setattr(_EmbeddingCache, "put_many", locked_put_many)
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+
+    with caplog.at_level(logging.WARNING):
+        vectors = embed_with_cache(["alpha"], "test-model", 8)
+
+    assert vectors.shape == (1, 2)
+    assert "database is locked" in caplog.text
@@ -0,0 +1,101 @@
+import numpy as np
+
+from wks.api.index._collection_fingerprint import _CollectionFingerprint
+from wks.api.index._EmbeddingMatrix import _EmbeddingMatrix
+from wks.api.index._ShardedMatrix import _ShardedMatrix
+
+
+def _matrix_file(tmp_path, rows_per_uri=4, uri_count=3, dim=8):
+    rng = np.random.default_rng(0)
+    rows = [(f"file:///{uri}.md", chunk) for uri in range(uri_count) for chunk in range(rows_per_uri)]
+    matrix = rng.normal(size=(len(rows), dim)).astype(np.float32)
+    matrix_file = _EmbeddingMatrix("main", "test-model", home_dir=tmp_path)
+    matrix_file.write(_CollectionFingerprint(count=len(rows), newest_id="a"), rows, matrix)
+    return matrix_file, rows, matrix
+
+
+def test_replace_uri_keeps_snapshot_memmapped_with_live_rows(tmp_path):
+    matrix_file, rows, matrix = _matrix_file(tmp_path, uri_count=5)
+    replacement = np.full((1, matrix.shape[1]), 0.5, dtype=np.float32)
+
+    matrix_file.replace_uri(
+        _CollectionFingerprint(count=len(rows), newest_id="a"),
+        _CollectionFingerprint(count=len(rows) - 3, newest_id="b"),
+        "file:///1.md",
+        [("file:///1.md", 0)],
+        replacement,
+    )
+    snapshot = matrix_file.load()
+
+    assert snapshot is not None
+    assert isinstance(snapshot.matrix, np.memmap)
+    assert snapshot.matrix.shape[0] == len(rows) + 1
+    assert snapshot.live_rows is not None
+    assert snapshot.rows == [row for row in rows if row[0] != "file:///1.md"] + [("file:///1.md", 0)]
+    expected = np.vstack([matrix[:4], matrix[8:], replacement])
+    np.testing.assert_array_equal(snapshot.matrix[snapshot.live_rows], expected)
+    assert (matrix_file.directory / ".lock").exists()
+
+
+def test_replace_uri_appends_to_row_log_without_rewriting_it(tmp_path):
+    matrix_file, rows, matrix = _matrix_file(tmp_path, uri_count=5)
+    (row_log,) = matrix_file.directory.glob("rows-*.jsonl")
+    written = row_log.read_bytes()
+
+    matrix_file.replace_uri(
+        _CollectionFingerprint(count=len(rows), newest_id="a"),
+        _CollectionFingerprint(count=len(rows) - 3, newest_id="b"),
+        "file:///1.md",
+        [("file:///1.md", 0)],
+        np.full((1, matrix.shape[1]), 0.5, dtype=np.float32),
+    )
+
+    assert list(matrix_file.directory.glob("rows-*.jsonl")) == [row_log]
+    appended = row_log.read_bytes()
+    assert appended.startswith(written)
+    assert appended[len(written) :].count(b"\n") == 1
+
+
+def test_replace_uri_compacts_once_dead_rows_pass_threshold(tmp_path):
+    matrix_file, rows, matrix = _matrix_file(tmp_path, uri_count=2)
+
+    matrix_file.replace_uri(
+        _CollectionFingerprint(count=len(rows), newest_id="a"),
+        _CollectionFingerprint(count=4, newest_id="b"),
+        "file:///0.md",
+        [],
+        np.empty((0, matrix.shape[1]), dtype=np.float32),
+    )
+    snapshot = matrix_file.load()
+
+    assert snapshot is not None
+    assert snapshot.live_rows is None
+    assert snapshot.rows == rows[4:]
+    np.testing.assert_array_equal(snapshot.matrix, matrix[4:])
+
+
+def test_sharded_top_k_skips_dead_rows(tmp_path):
+    rng = np.random.default_rng(5)
+    matrix = rng.normal(size=(60, 8)).astype(np.float32)
+    live_rows = np.setdiff1d(np.arange(60), [3, 17, 40])
+    query = matrix[17]
+
+    rows, scores = _ShardedMatrix(matrix, 3, live_rows).top_k(query, 10)
+
+    live_scores = (matrix[live_rows] @ query).astype(np.float64)
+    expected = np.lexsort((np.arange(len(live_scores)), -live_scores))[:10]
+    np.testing.assert_array_equal(rows, expected)
+    np.testing.assert_allclose(scores, live_scores[expected], rtol=1e-6)
+
+
+def test_has_centroids_follows_rows_metadata(tmp_path):
+    matrix_file, _, matrix = _matrix_file(tmp_path)
+
+    assert matrix_file.has_centroids() is False
+    assert matrix_file.write_centroids(matrix[:2]) is True
+    assert matrix_file.has_centroids() is True
+
+    matrix_file.invalidate()
+
+    assert any(matrix_file.directory.glob("centroids-*.npy"))
+    assert matrix_file.has_centroids() is False
@@ -0,0 +1,41 @@
+import numpy as np
+
+from wks.api.index._IvfLists import _assign_lists, _build_ivf_lists, _list_count, _train_centroids
+
+
+def _clustered_matrix(seed: int = 3, clusters: int = 20, per_cluster: int = 100, dim: int = 32) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    matrix = np.repeat(centers, per_cluster, axis=0) + 0.1 * rng.normal(size=(clusters * per_cluster, dim))
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix.astype(np.float32)
+
+
+def test_ivf_probe_recovers_exact_neighbours():
+    matrix = _clustered_matrix()
+    centroids = _train_centroids(matrix, _list_count(len(matrix)))
+    ivf = _build_ivf_lists(centroids, _assign_lists(matrix, centroids))
+
+    hits = 0
+    for query_row in range(0, len(matrix), 97):
+        query = matrix[query_row]
+        exact = set(np.argsort(-(matrix @ query))[:10].tolist())
+        candidates = ivf.probe(query, 300)
+        approx = candidates[np.argsort(-(matrix[candidates] @ query))[:10]]
+        hits += len(exact & set(approx.tolist()))
+        assert len(candidates) < len(matrix)
+    assert hits / (10 * len(range(0, len(matrix), 97))) >= 0.95
+
+
+def test_ivf_lists_partition_all_rows():
+    matrix = _clustered_matrix(clusters=5, per_cluster=20)
+    centroids = _train_centroids(matrix, 8)
+    assignments = _assign_lists(matrix, centroids)
+    ivf = _build_ivf_lists(centroids, assignments)
+
+    assert ivf.offsets[0] == 0
+    assert ivf.offsets[-1] == len(matrix)
+    assert sorted(ivf.order.tolist()) == list(range(len(matrix)))
+    for list_id in range(len(centroids)):
+        members = ivf.order[ivf.offsets[list_id] : ivf.offsets[list_id + 1]]
+        assert np.all(assignments[members] == list_id)
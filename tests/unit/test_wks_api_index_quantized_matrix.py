@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from wks.api.index._embedding_utils import cosine_scores
+from wks.api.index._QuantizedMatrix import _quantize_matrix
+
+
+@pytest.mark.parametrize(
+    ("mode", "dtype", "ratio", "atol"), [("float16", np.float16, 2, 2e-3), ("int8", np.int8, 4, 2e-2)]
+)
+def test_quantized_scores_track_exact_scores(mode, dtype, ratio, atol):
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(size=(500, 64)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix[3] = 0.0
+    query = matrix[11]
+
+    compact = _quantize_matrix(matrix, mode)
+    scores = cosine_scores(query, compact.values, compact.scales)
+
+    assert compact.values.dtype == dtype
+    assert compact.nbytes <= matrix.nbytes // ratio + matrix.shape[0] * 4
+    assert scores[3] == 0.0
+    np.testing.assert_allclose(scores, cosine_scores(query, matrix), atol=atol)
+
+
+def test_quantize_matrix_rejects_unknown_mode():
+    with pytest.raises(ValueError, match="Unsupported quantization"):
+        _quantize_matrix(np.zeros((2, 2), dtype=np.float32), "int4")
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from wks.api.index._ShardedMatrix import _ShardedMatrix
+
+
+def _reference_top_k(matrix, query, k, boost_rows=None, boost_factors=None):
+    scores = (matrix @ query).astype(np.float64)
+    if boost_rows is not None:
+        scores[boost_rows] *= boost_factors
+    order = np.lexsort((np.arange(len(scores)), -scores))[:k]
+    return order, scores[order]
+
+
+@pytest.mark.parametrize("file_backed", [False, True])
+def test_sharded_top_k_matches_reference(tmp_path, file_backed):
+    rng = np.random.default_rng(3)
+    matrix = rng.normal(size=(1001, 16)).astype(np.float32)
+    if file_backed:
+        path = tmp_path / "matrix.f32"
+        matrix.tofile(path)
+        matrix = np.memmap(path, dtype=np.float32, mode="r", shape=matrix.shape)
+    sharded = _ShardedMatrix(matrix, 3)
+    query = np.asarray(matrix[17])
+    boost_rows = np.array([5, 400, 999], dtype=np.int64)
+    boost_factors = np.array([1.2, 1.4, 1.2])
+
+    assert len(sharded.bounds) == 3
+    assert (sharded.source.path == str(tmp_path / "matrix.f32")) is file_backed
+    for rows_in, factors_in in [(None, None), (boost_rows, boost_factors)]:
+        rows, scores = sharded.top_k(query, 25, rows_in, factors_in)
+        expected_rows, expected_scores = _reference_top_k(np.asarray(matrix), query, 25, rows_in, factors_in)
+        np.testing.assert_array_equal(rows, expected_rows)
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+def test_sharded_matrix_rejects_single_shard():
+    with pytest.raises(ValueError, match="shard_count"):
+        _ShardedMatrix(np.zeros((4, 2), dtype=np.float32), 1)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from wks.api.index._PostingStore import _PostingStats
+from wks.api.search._bm25 import _build_term_postings, _score_postings, _top_k_postings
+
+
+def _random_postings(seed: int, term_sizes: list[int], chunk_count: int):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(5, 300, size=chunk_count)
+    stats = _PostingStats(chunk_count=chunk_count, total_length=int(lengths.sum()), next_chunk_id=chunk_count)
+    postings = []
+    for size in term_sizes:
+        chunk_ids = rng.choice(chunk_count, size=size, replace=False)
+        rows = [(int(chunk_id), int(rng.integers(1, 8)), int(lengths[chunk_id])) for chunk_id in chunk_ids]
+        postings.append(_build_term_postings(rows, stats))
+    return postings
+
+
+@pytest.mark.parametrize(("seed", "k"), [(0, 1), (1, 10), (2, 50), (3, 500)])
+def test_top_k_postings_matches_exhaustive_scoring(seed, k):
+    postings = _random_postings(seed, [12, 150, 3000, 9000], chunk_count=10_000)
+
+    exhaustive_ids, exhaustive_scores = _score_postings(postings)
+    top_ids, top_scores = _top_k_postings(postings, k)
+
+    assert len(top_ids) == k
+    np.testing.assert_allclose(top_scores, exhaustive_scores[:k], rtol=1e-5)
+    assert set(top_ids.tolist()) == set(exhaustive_ids[:k].tolist())
+
+
+def test_top_k_postings_handles_missing_terms():
+    postings = _random_postings(4, [0, 5], chunk_count=100)
+
+    top_ids, top_scores = _top_k_postings(postings, 10)
+
+    assert len(top_ids) == 5
+    assert np.all(np.diff(top_scores) <= 0)
+    assert len(_top_k_postings(_random_postings(5, [0], chunk_count=10), 3)[0]) == 0
@@ -11,9 +11,15 @@ from wks.api.config.URI import URI
 from wks.api.config.WKSConfig import WKSConfig
 from wks.api.database.Database import Database
 from wks.api.index._ChunkStore import _ChunkStore
+from wks.api.index._EmbeddingMatrix import _EmbeddingMatrix
 from wks.api.index._EmbeddingStore import _EmbeddingStore
+from wks.api.index._IndexGenerations import _IndexGenerations
+from wks.api.index._IvfLists import _IvfLists
+from wks.api.index._PostingStore import _PostingStore
 from wks.api.index.cmd import cmd as index_cmd
 from wks.api.index.cmd_embed import cmd_embed
+from wks.api.index.cmd_optimize import cmd_optimize
+from wks.api.search import _SearchRuntime as _SearchRuntime_module
 from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
 from wks.api.search.cmd import cmd as search_cmd
 
@@ -74,6 +80,19 @@ def test_search_no_match(search_env):
     assert result.output["hits"] == []
 
 
+def test_search_lexical_matches_unicode_terms(search_env, tmp_path):
+    doc = tmp_path / "unicode.txt"
+    doc.write_text("Le café du réacteur est fermé.\n東京 タワー の 原子炉 冷却\n", encoding="utf-8")
+    assert run_cmd(index_cmd, "main", str(doc)).success is True
+
+    for query in ("café", "RÉACTEUR", "原子炉"):
+        result = run_cmd(search_cmd, query)
+
+        assert result.success is True
+        assert result.output["hits"]
+        assert result.output["hits"][0]["uri"].endswith("unicode.txt")
+
+
 @pytest.fixture
 def search_env(tmp_path, monkeypatch):
     return setup_indexed_search_env(tmp_path, monkeypatch)
@@ -177,19 +196,25 @@ def test_search_uses_default_index(search_env):
 
 
 @pytest.mark.parametrize("mutate_index", [False, True])
-def test_search_lexical_uses_candidate_loading(search_env, monkeypatch, tmp_path, mutate_index):
+def test_search_lexical_scores_from_postings(search_env, monkeypatch, tmp_path, mutate_index):
     _SEARCH_RUNTIME.reset()
-    call_count = {"count": 0}
+    call_count = {"postings": 0, "search_text": 0}
+    original_postings = _ChunkStore.postings
     original_search_text = _ChunkStore.search_text
 
     def fail_get_all(self, index_name: str):
         raise AssertionError("_ChunkStore.get_all should not be used for lexical search")
 
-    def counting_search_text(self, index_name: str, query: str, limit: int):
-        call_count["count"] += 1
-        return original_search_text(self, index_name, query, limit)
+    def counting_postings(self, index_name: str, terms: list[str]):
+        call_count["postings"] += 1
+        return original_postings(self, index_name, terms)
+
+    def counting_search_text(self, index_name: str, query: str, limit: int, has_trigrams: bool | None = None):
+        call_count["search_text"] += 1
+        return original_search_text(self, index_name, query, limit, has_trigrams)
 
     monkeypatch.setattr(_ChunkStore, "get_all", fail_get_all)
+    monkeypatch.setattr(_ChunkStore, "postings", counting_postings)
     monkeypatch.setattr(_ChunkStore, "search_text", counting_search_text)
 
     first = run_cmd(search_cmd, "fission", index="main")
@@ -207,16 +232,110 @@ def test_search_lexical_uses_candidate_loading(search_env, monkeypatch, tmp_path
                     "is_continuation": False,
                 }
             )
+            _IndexGenerations(db).bump("main")
 
     second = run_cmd(search_cmd, "reactor" if not mutate_index else "fission", index="main")
 
     assert second.success is True
-    assert call_count["count"] == 2
+    assert call_count == ({"postings": 1, "search_text": 1} if mutate_index else {"postings": 2, "search_text": 0})
+
+
+def test_search_lexical_reuses_cached_postings(search_env, monkeypatch):
+    _SEARCH_RUNTIME.reset()
+    requested: list[list[str]] = []
+    original_postings = _ChunkStore.postings
+
+    def recording_postings(self, index_name: str, terms: list[str]):
+        requested.append(list(terms))
+        return original_postings(self, index_name, terms)
+
+    monkeypatch.setattr(_ChunkStore, "postings", recording_postings)
+
+    assert run_cmd(search_cmd, "fission yield", index="main").success is True
+    assert run_cmd(search_cmd, "fission reactor", index="main").success is True
+
+    assert requested == [["fission", "yield"], ["reactor"]]
+
+
+def test_search_cache_validation_is_a_generation_lookup(search_env, monkeypatch):
+    _SEARCH_RUNTIME.reset()
+    counted: list[str] = []
+    original_count = _ChunkStore.count
+
+    def recording_count(self, index_name: str | None = None):
+        counted.append(str(index_name))
+        return original_count(self, index_name)
+
+    monkeypatch.setattr(_ChunkStore, "count", recording_count)
+
+    assert run_cmd(search_cmd, "fission", index="main").success is True
+    assert run_cmd(search_cmd, "reactor", index="main").success is True
+    assert counted == ["main"]
+
+    with Database(WKSConfig.load().database, "index") as db:
+        store = _ChunkStore(db)
+        before = store.generation("main")
+        store.replace_uri("main", store.uris("main")[0], "removed", [])
+        assert store.generation("main") == before + 1
+
+    third = run_cmd(search_cmd, "fission", index="main")
+
+    assert third.success is True
+    assert counted == ["main", "main"]
+
+
+def test_search_lexical_fallback_uses_trigrams_at_any_size(search_env, monkeypatch):
+    import wks.api.index._ChunkStore as chunk_store_mod
+
+    with Database(WKSConfig.load().database, "index") as db:
+        _PostingStore(db).clear("main")
+    monkeypatch.setattr(chunk_store_mod, "_FALLBACK_TEXT_SCAN_LIMIT", 1)
+
+    result = run_cmd(search_cmd, "fission", index="main")
+
+    assert result.success is True
+    assert "fission" in result.output["hits"][0]["text"].lower()
+
+
+def test_search_lexical_fallback_checks_trigram_coverage_once_per_generation(search_env, monkeypatch):
+    checked: list[str] = []
+    original_has_trigrams = _ChunkStore.has_trigrams
+
+    def recording_has_trigrams(self, index_name: str):
+        checked.append(index_name)
+        return original_has_trigrams(self, index_name)
+
+    with Database(WKSConfig.load().database, "index") as db:
+        _PostingStore(db).clear("main")
+    _SEARCH_RUNTIME.reset()
+    monkeypatch.setattr(_ChunkStore, "has_trigrams", recording_has_trigrams)
+
+    assert run_cmd(search_cmd, "fission", index="main").success is True
+    assert run_cmd(search_cmd, "reactor", index="main").success is True
+    assert run_cmd(search_cmd, "fision", index="main", fuzzy=True).success is True
+
+    assert checked == ["main"]
+
+
+def test_search_fuzzy_matches_misspelled_terms(search_env):
+    _SEARCH_RUNTIME.reset()
+
+    exact = run_cmd(search_cmd, "fision reactr", index="main")
+    fuzzy = run_cmd(search_cmd, "fision reactr", index="main", fuzzy=True)
+
+    assert exact.success is True
+    assert exact.output["hits"] == []
+    assert fuzzy.success is True
+    assert fuzzy.output["hits"][0]["uri"].endswith("fission.txt")
+    assert {hit["uri"].rsplit("/", 1)[-1] for hit in fuzzy.output["hits"]} == {"fission.txt", "coolant.txt"}
 
 
 def test_search_lexical_refuses_large_unindexed_fallback(search_env, monkeypatch):
     import wks.api.index._ChunkStore as chunk_store_mod
 
+    with Database(WKSConfig.load().database, "index") as db:
+        _PostingStore(db).clear("main")
+        db.update_many({"index_name": "main"}, {"$unset": {"trigrams": ""}})
     monkeypatch.setattr(chunk_store_mod, "_FALLBACK_TEXT_SCAN_LIMIT", 1)
 
     result = run_cmd(search_cmd, "fission", index="main")
@@ -225,6 +344,54 @@ def test_search_lexical_refuses_large_unindexed_fallback(search_env, monkeypatch
     assert "Run: wksc index optimize" in result.output["errors"][0]
 
 
+def test_optimize_rebuilds_missing_postings(search_env, monkeypatch):
+    import wks.api.index._ChunkStore as chunk_store_mod
+
+    with Database(WKSConfig.load().database, "index") as db:
+        _PostingStore(db).clear("main")
+    monkeypatch.setattr(chunk_store_mod, "_FALLBACK_TEXT_SCAN_LIMIT", 1)
+
+    optimized = run_cmd(cmd_optimize)
+    result = run_cmd(search_cmd, "fission", index="main")
+
+    assert optimized.output["rebuilt_postings"] == ["main"]
+    assert result.success is True
+    assert "fission" in result.output["hits"][0]["text"].lower()
+
+
+def test_optimize_rebuilds_missing_trigrams(search_env):
+    with Database(WKSConfig.load().database, "index") as db:
+        db.update_many({"index_name": "main"}, {"$unset": {"trigrams": ""}})
+        assert _ChunkStore(db).has_trigrams("main") is False
+
+    optimized = run_cmd(cmd_optimize)
+
+    assert optimized.output["rebuilt_postings"] == ["main"]
+    with Database(WKSConfig.load().database, "index") as db:
+        store = _ChunkStore(db)
+        assert store.has_trigrams("main") is True
+        chunks, scores = store.search_trigrams("main", "ssio", 5, min_similarity=1.0)
+    assert [chunk.uri.rsplit("/", 1)[-1] for chunk in chunks] == ["fission.txt"]
+    assert scores == [1.0]
+
+
+def test_search_text_fallback_confirms_trigram_candidates(search_env):
+    from wks.api.index._Chunk import _Chunk
+
+    texts = {"file:///decoy.txt": "alpha xpens pensio sion", "file:///pension.txt": "Pension"}
+    with Database(WKSConfig.load().database, "index") as db:
+        store = _ChunkStore(db)
+        for uri, text in texts.items():
+            store.replace_uri(
+                "main", uri, "checksum", [_Chunk(text=text, uri=uri, chunk_index=0, tokens=4, is_continuation=False)]
+            )
+        candidates, _ = store.search_trigrams("main", "pension", 5, min_similarity=1.0)
+        chunks = store.search_text("main", "pension", 5)
+
+    assert {chunk.uri for chunk in candidates} == set(texts)
+    assert [chunk.uri for chunk in chunks] == ["file:///pension.txt"]
+
+
 def test_search_no_config(tmp_path, monkeypatch):
     from tests.conftest import minimal_config_dict
 
@@ -260,13 +427,13 @@ def test_search_semantic_runtime_cache_behavior(search_env_semantic, monkeypatch
     embed_main_index(monkeypatch)
     _SEARCH_RUNTIME.reset()
     call_count = {"count": 0}
-    original_get_all = _EmbeddingStore.get_all
+    original_row_ids = _SearchRuntime_module._row_ids
 
-    def counting_get_all(self, index_name: str, embedding_model: str):
+    def counting_row_ids(rows):
         call_count["count"] += 1
-        return original_get_all(self, index_name=index_name, embedding_model=embedding_model)
+        return original_row_ids(rows)
 
-    monkeypatch.setattr(_EmbeddingStore, "get_all", counting_get_all)
+    monkeypatch.setattr(_SearchRuntime_module, "_row_ids", counting_row_ids)
 
     first = run_cmd(search_cmd, "fission", index="main")
     assert first.success is True
@@ -276,7 +443,7 @@ def test_search_semantic_runtime_cache_behavior(search_env_semantic, monkeypatch
         duplicate["uri"] = str(URI.from_any(duplicate["uri"]).path.with_name("fission-runtime-copy.txt"))
         duplicate["chunk_index"] = 4242
         with Database(WKSConfig.load().database, "index_embeddings") as db:
-            db.insert_one(duplicate)
+            _EmbeddingStore(db).replace_uri("main", "test-model", duplicate["uri"], [duplicate])
 
     second = run_cmd(search_cmd, "reactor" if not mutate_embeddings else "fission", index="main")
 
@@ -284,6 +451,154 @@ def test_search_semantic_runtime_cache_behavior(search_env_semantic, monkeypatch
     assert call_count["count"] == expected_calls
 
 
+def test_search_semantic_warm_start_memmaps_matrix_file(search_env_semantic, monkeypatch):
+    embed_main_index(monkeypatch)
+    _SEARCH_RUNTIME.reset()
+    matrix_loads: list[str] = []
+    hydrated: list[int] = []
+    original_get_all = _EmbeddingStore.get_all
+    original_get_chunks = _EmbeddingStore.get_chunks
+
+    def recording_get_all(self, index_name: str, embedding_model: str):
+        matrix_loads.append(index_name)
+        return original_get_all(self, index_name, embedding_model)
+
+    def recording_get_chunks(self, index_name: str, embedding_model: str, keys):
+        hydrated.append(len(keys))
+        return original_get_chunks(self, index_name, embedding_model, keys)
+
+    monkeypatch.setattr(_EmbeddingStore, "get_all", recording_get_all)
+    monkeypatch.setattr(_EmbeddingStore, "get_chunks", recording_get_chunks)
+
+    result = run_cmd(search_cmd, "fission", index="main", k=2)
+    state = _SEARCH_RUNTIME.get_semantic_index_state(WKSConfig.load(), "main", "test-model")
+
+    assert matrix_loads == []
+    assert len(hydrated) == 1
+    assert hydrated[0] <= 4
+    assert isinstance(state.matrix, np.memmap)
+    assert not hasattr(state, "docs")
+    assert result.success is True
+    assert "fission" in result.output["hits"][0]["text"].lower()
+
+
+def test_search_semantic_rebuilds_stale_matrix_file(search_env_semantic, monkeypatch):
+    embed_main_index(monkeypatch)
+    _SEARCH_RUNTIME.reset()
+    matrix_file = _EmbeddingMatrix("main", "test-model")
+    matrix_file.invalidate()
+
+    first = _SEARCH_RUNTIME.get_semantic_index_state(WKSConfig.load(), "main", "test-model")
+    rebuilt = matrix_file.load()
+    _SEARCH_RUNTIME.reset()
+    second = _SEARCH_RUNTIME.get_semantic_index_state(WKSConfig.load(), "main", "test-model")
+
+    assert rebuilt is not None
+    assert rebuilt.fingerprint == second.fingerprint
+    assert isinstance(second.matrix, np.memmap)
+    np.testing.assert_allclose(first.matrix, second.matrix)
+    assert [first.row_key(row) for row in range(first.row_count)] == [
+        second.row_key(row) for row in range(second.row_count)
+    ]
+
+
+def test_search_reset_index_drops_cached_lexical_state(search_env):
+    from wks.api.database.cmd_reset import cmd_reset
+
+    config = WKSConfig.load()
+    _SEARCH_RUNTIME.reset()
+    assert _SEARCH_RUNTIME.get_lexical_chunk_count(config, "main") > 0
+
+    assert run_cmd(cmd_reset, "index").success is True
+
+    assert _SEARCH_RUNTIME.get_lexical_chunk_count(config, "main") == 0
+
+
+def test_search_reset_index_embeddings_drops_cached_semantic_state(search_env_semantic, monkeypatch):
+    from wks.api.database.cmd_reset import cmd_reset
+
+    embed_main_index(monkeypatch)
+    config = WKSConfig.load()
+    _SEARCH_RUNTIME.reset()
+    assert _SEARCH_RUNTIME.get_semantic_index_state(config, "main", "test-model").row_count > 0
+
+    assert run_cmd(cmd_reset, "index_embeddings").success is True
+
+    assert _EmbeddingMatrix("main", "test-model").load() is None
+    assert _SEARCH_RUNTIME.get_semantic_index_state(config, "main", "test-model").row_count == 0
+
+
+def test_search_reset_all_keeps_generations_increasing(search_env_semantic, monkeypatch):
+    from wks.api.database.cmd_reset import cmd_reset
+
+    embed_main_index(monkeypatch)
+    config = WKSConfig.load()
+    _SEARCH_RUNTIME.reset()
+    cached = _SEARCH_RUNTIME.get_semantic_index_state(config, "main", "test-model")
+    with Database(config.database, "index") as db:
+        lexical_generation = _ChunkStore(db).generation("main")
+
+    assert run_cmd(cmd_reset, "all").success is True
+    assert run_cmd(cmd_reset, "index_generations").success is False
+
+    state = _SEARCH_RUNTIME.get_semantic_index_state(config, "main", "test-model")
+    with Database(config.database, "index") as db:
+        generations = _IndexGenerations(db)
+        assert generations.get("main") > lexical_generation
+        assert generations.get("main", "test-model") > cached.generation
+    assert state.row_count == 0
+    assert _SEARCH_RUNTIME.get_lexical_chunk_count(config, "main") == 0
+
+
+@pytest.mark.parametrize("quantization", ["float16", "int8"])
+def test_search_semantic_quantized_reranks_exactly(tmp_path, monkeypatch, quantization):
+    config_dict = setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={
+            "default_index": "main",
+            "indexes": {"main": {"engine": "textpass", "embedding_model": "test-model"}},
+        },
+    )
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+    write_and_index_search_docs(tmp_path)
+    exact = run_cmd(search_cmd, "fission reactor", k=3)
+
+    config_dict["index"]["indexes"]["main"]["quantization"] = quantization
+    WKSConfig.get_config_path().write_text(json.dumps(config_dict))
+    quantized = run_cmd(search_cmd, "fission reactor", k=3)
+    state = _SEARCH_RUNTIME.get_semantic_index_state(WKSConfig.load(), "main", "test-model", quantization)
+
+    assert quantized.success is True
+    assert state.compact is not None
+    assert state.compact.values.dtype == np.dtype(quantization)
+    assert [(hit["uri"], hit["score"]) for hit in quantized.output["hits"]] == [
+        (hit["uri"], hit["score"]) for hit in exact.output["hits"]
+    ]
+
+
+def test_search_semantic_uses_ann_above_switch(search_env_semantic, monkeypatch):
+    embed_main_index(monkeypatch)
+    exact = run_cmd(search_cmd, "fission", k=2)
+    optimized = run_cmd(cmd_optimize)
+    monkeypatch.setattr("wks.services._search_semantic.MAX_IMPLICIT_SEMANTIC_EMBEDDINGS", 1)
+    probes: list[int] = []
+    original_probe = _IvfLists.probe
+
+    def recording_probe(self, query, min_rows):
+        probes.append(min_rows)
+        return original_probe(self, query, min_rows)
+
+    monkeypatch.setattr(_IvfLists, "probe", recording_probe)
+
+    result = run_cmd(search_cmd, "fission", k=2)
+
+    assert optimized.output["built_ann"] == ["main"]
+    assert probes
+    assert result.success is True
+    assert result.output["hits"][0]["uri"] == exact.output["hits"][0]["uri"]
+
+
 def test_search_semantic_requires_embeddings(search_env_semantic):
     with Database(WKSConfig.load().database, "index_embeddings") as db:
         db.delete_many({"index_name": "main", "embedding_model": "test-model"})
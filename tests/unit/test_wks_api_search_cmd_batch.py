@@ -0,0 +1,34 @@
+from tests.conftest import run_cmd
+from tests.unit._search_test_helpers import setup_search_config, write_and_index_search_docs
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
+from wks.api.search.cmd_batch import cmd_batch
+
+
+def _setup(tmp_path, monkeypatch):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={"default_index": "main", "indexes": {"main": {"engine": "textpass"}}},
+    )
+    write_and_index_search_docs(tmp_path)
+
+
+def test_cmd_batch_returns_results_per_query(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+
+    result = run_cmd(cmd_batch, ["fission", "reactor"], k=2)
+
+    assert result.success is True
+    assert result.output["index_name"] == "main"
+    assert [item["query"] for item in result.output["results"]] == ["fission", "reactor"]
+    assert all(item["hits"] for item in result.output["results"])
+
+
+def test_cmd_batch_requires_queries(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+
+    result = run_cmd(cmd_batch, [])
+
+    assert result.success is False
+    assert result.output["errors"] == ["At least one query is required"]
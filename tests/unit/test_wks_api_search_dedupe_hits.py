@@ -0,0 +1,40 @@
+from hashlib import sha256
+
+import pytest
+
+from wks.api.search import _dedupe_hits as dedupe_module
+from wks.api.search._dedupe_hits import _dedupe_hits
+
+
+def _hit(uri: str, chunk_index: int, text: str, **keys) -> dict:
+    return {"uri": uri, "chunk_index": chunk_index, "score": 1.0, "tokens": 3, "text": text, **keys}
+
+
+def test_dedupe_hits_uses_precomputed_keys(monkeypatch):
+    def fail(uri, text):
+        pytest.fail("dedupe keys should not be recomputed")
+
+    monkeypatch.setattr(dedupe_module, "_chunk_dedupe_keys", fail)
+    hits = [
+        _hit("file://host/a.txt", 0, "alpha", canonical_uri="file://host/a.txt", text_hash="h1"),
+        _hit("/a.txt", 1, "beta", canonical_uri="file://host/a.txt", text_hash="h2"),
+        _hit("file://host/b.txt", 0, "alpha", canonical_uri="file://host/b.txt", text_hash="h1"),
+        _hit("file://host/c.txt", 0, "gamma", canonical_uri="file://host/c.txt", text_hash="h3"),
+    ]
+
+    deduped = _dedupe_hits(hits, 10)
+
+    assert [(hit["uri"], hit["chunk_index"]) for hit in deduped] == [("file://host/a.txt", 0), ("file://host/c.txt", 0)]
+    assert [hit["text_hash"] for hit in deduped] == ["h1", "h3"]
+
+
+def test_dedupe_hits_computes_keys_for_legacy_hits(tmp_path):
+    path = tmp_path / "doc.txt"
+    hits = [_hit(str(path), 0, "alpha"), _hit(str(path), 1, "beta"), _hit(str(tmp_path / "other.txt"), 0, "alpha")]
+
+    deduped = _dedupe_hits(hits, 10)
+
+    assert len(deduped) == 1
+    assert deduped[0]["uri"] == deduped[0]["canonical_uri"]
+    assert deduped[0]["uri"].startswith("file://")
+    assert deduped[0]["text_hash"] == sha256(b"alpha").hexdigest()
@@ -0,0 +1,48 @@
+import numpy as np
+
+from wks.api.search._QueryEmbeddingCache import _QueryEmbeddingCache
+from wks.api.search._SearchRuntime import _query_embedding_key
+
+
+def test_query_embedding_cache_evicts_least_recently_used_within_budget():
+    vector = np.ones(4, dtype=np.float32)
+    cache = _QueryEmbeddingCache(max_bytes=2 * vector.nbytes)
+
+    cache.put(("model", "a"), vector)
+    cache.put(("model", "b"), vector * 2)
+    assert cache.get(("model", "a")) is not None
+    cache.put(("model", "c"), vector * 3)
+
+    assert cache.get(("model", "b")) is None
+    np.testing.assert_array_equal(cache.get(("model", "c")), vector * 3)
+    assert cache.stats() == {"hits": 2, "misses": 1, "entries": 2, "bytes": 2 * vector.nbytes}
+
+
+def test_query_embedding_cache_drops_unconfigured_models():
+    cache = _QueryEmbeddingCache(max_bytes=1024)
+    cache.put(("old-model", "text"), np.zeros(2, dtype=np.float32))
+    cache.put(("new-model", "text"), np.zeros(2, dtype=np.float32))
+
+    cache.retain_models({"new-model"})
+
+    assert cache.get(("old-model", "text")) is None
+    assert cache.get(("new-model", "text")) is not None
+
+
+def test_query_embedding_key_normalizes_text_and_hashes_images(tmp_path):
+    image = tmp_path / "query.png"
+    image.write_bytes(b"first")
+    moved = tmp_path / "copy.png"
+    moved.write_bytes(b"first")
+
+    assert _query_embedding_key("m", "text", "  fission   yield ", "", None) == _query_embedding_key(
+        "m", "text", "fission yield", "", None
+    )
+    assert _query_embedding_key("m", "image_text_combo", "", str(image), 0.5) == _query_embedding_key(
+        "m", "image_text_combo", "", str(moved), 0.5
+    )
+    image.write_bytes(b"second")
+    assert _query_embedding_key("m", "image_text_combo", "", str(image), 0.5) != _query_embedding_key(
+        "m", "image_text_combo", "", str(moved), 0.5
+    )
+    assert _query_embedding_key("m", "image_text_combo", "", str(tmp_path / "missing.png"), 0.5) is None
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from tests.conftest import run_cmd
@@ -9,7 +11,9 @@ from tests.unit._search_test_helpers import (
 )
 from wks.api.index.cmd import cmd as index_cmd
 from wks.api.index.cmd_embed import cmd_embed
+from wks.api.index.cmd_optimize import cmd_optimize
 from wks.api.search._rrf import rrf_merge
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
 from wks.api.search.cmd import cmd as search_cmd
 
 
@@ -41,6 +45,71 @@ def search_env_strategy(tmp_path, monkeypatch):
     return {"docs": docs}
 
 
+@pytest.fixture
+def search_env_fanout(tmp_path, monkeypatch):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={
+            "default_index": "main",
+            "default_strategy": "wide",
+            "strategies": {
+                "wide": {"indexes": ["main", "semantic", "semantic_copy"], "merge": "rrf"},
+            },
+            "indexes": {
+                "main": {"engine": "textpass"},
+                "semantic": {"engine": "textpass", "embedding_model": "test-model"},
+                "semantic_copy": {"engine": "textpass", "embedding_model": "test-model"},
+            },
+        },
+    )
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+    write_and_index_search_docs(tmp_path)
+    for name in ("semantic", "semantic_copy"):
+        for doc_name in SEARCH_DOCS:
+            assert run_cmd(index_cmd, name, str(tmp_path / doc_name)).success is True
+        assert run_cmd(cmd_embed, name, batch_size=8).success is True
+
+
+def test_strategy_fans_out_indexes_concurrently(search_env_fanout, monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+    original_lexical = _SEARCH_RUNTIME.search_lexical_chunks
+    original_semantic = _SEARCH_RUNTIME.get_semantic_index_state
+
+    def lexical_after_barrier(*args, **kwargs):
+        barrier.wait()
+        return original_lexical(*args, **kwargs)
+
+    def semantic_after_barrier(*args, **kwargs):
+        barrier.wait()
+        return original_semantic(*args, **kwargs)
+
+    monkeypatch.setattr(_SEARCH_RUNTIME, "search_lexical_chunks", lexical_after_barrier)
+    monkeypatch.setattr(_SEARCH_RUNTIME, "get_semantic_index_state", semantic_after_barrier)
+
+    result = run_cmd(search_cmd, "fission")
+
+    assert result.success is True
+    assert result.output["warnings"] == []
+    assert result.output["hits"]
+
+
+def test_strategy_shares_query_embedding_per_model(search_env_fanout, monkeypatch):
+    embedded: list[list[str]] = []
+
+    def recording_embed_texts(texts, model_name, batch_size):
+        embedded.append(list(texts))
+        return fake_embed_texts(texts, model_name, batch_size)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", recording_embed_texts)
+
+    result = run_cmd(search_cmd, "fission")
+
+    assert result.success is True
+    assert embedded == [["fission"]]
+
+
 def test_strategy_search_combined(search_env_strategy):
     result = run_cmd(search_cmd, "fission", strategy="hybrid")
     assert result.success is True
@@ -58,7 +127,7 @@ def test_strategy_default_used(search_env_strategy):
 
 
 def test_implicit_strategy_skips_oversized_semantic_index(search_env_strategy, monkeypatch):
-    monkeypatch.setattr("wks.services.search.MAX_IMPLICIT_SEMANTIC_EMBEDDINGS", 1)
+    monkeypatch.setattr("wks.services._search_strategy.MAX_IMPLICIT_SEMANTIC_EMBEDDINGS", 1)
 
     result = run_cmd(search_cmd, "fission")
 
@@ -67,8 +136,19 @@ def test_implicit_strategy_skips_oversized_semantic_index(search_env_strategy, m
     assert "Skipping semantic index 'semantic'" in result.output["warnings"][0]
 
 
+def test_implicit_strategy_keeps_oversized_semantic_index_with_ann(search_env_strategy, monkeypatch):
+    assert run_cmd(cmd_optimize).output["built_ann"] == ["semantic"]
+    monkeypatch.setattr("wks.services._search_strategy.MAX_IMPLICIT_SEMANTIC_EMBEDDINGS", 1)
+
+    result = run_cmd(search_cmd, "fission")
+
+    assert result.success is True
+    assert result.output["hits"]
+    assert result.output["warnings"] == []
+
+
 def test_explicit_strategy_keeps_oversized_semantic_index(search_env_strategy, monkeypatch):
-    monkeypatch.setattr("wks.services.search.MAX_IMPLICIT_SEMANTIC_EMBEDDINGS", 1)
+    monkeypatch.setattr("wks.services._search_strategy.MAX_IMPLICIT_SEMANTIC_EMBEDDINGS", 1)
 
     result = run_cmd(search_cmd, "fission", strategy="hybrid")
 
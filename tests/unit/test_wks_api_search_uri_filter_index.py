@@ -0,0 +1,51 @@
+import numpy as np
+
+from wks.api.search._SearchFilter import _SearchFilter
+from wks.api.search._UriFilterIndex import _UriFilterIndex
+
+URIS = [
+    "file://host/home/u/projects/x/report.PDF",
+    "file://host/home/u/projects/x/notes/todo.md",
+    "file://host/home/u/projects/xylophone/readme.md",
+    "file://host/home/u/projects/y/paper.pdf",
+    "file://host/home/u/.bashrc",
+]
+
+
+def _index(row_ids=None):
+    uri_ids = np.array([0, 0, 1, 2, 3, 3, 4], dtype=np.int32)
+    return _UriFilterIndex(URIS, uri_ids, row_ids)
+
+
+def test_prefix_matches_path_components_only():
+    index = _index()
+
+    rows = index.rows(_SearchFilter(uri_prefix="file://host/home/u/projects/x"))
+
+    np.testing.assert_array_equal(rows, [0, 1, 2])
+    np.testing.assert_array_equal(index.rows(_SearchFilter(uri_prefix="file://host/home/u/projects/x/")), [0, 1, 2])
+    np.testing.assert_array_equal(
+        index.rows(_SearchFilter(uri_prefix="file://host/home/u/projects/x/report.PDF")), [0, 1]
+    )
+
+
+def test_extension_and_priority_filters_combine():
+    index = _index(row_ids=np.array([10, 11, 20, 30, 40, 41, 50], dtype=np.int64))
+    priorities = ("v1", {URIS[0]: 9.0, URIS[3]: 2.0, URIS[1]: 7.0})
+
+    pdf_rows = index.rows(_SearchFilter(extensions=("pdf",)))
+    important_pdf_rows = index.rows(_SearchFilter(extensions=("pdf",), min_priority=5.0), priorities)
+
+    np.testing.assert_array_equal(pdf_rows, [10, 11, 40, 41])
+    np.testing.assert_array_equal(important_pdf_rows, [10, 11])
+    assert len(index.rows(_SearchFilter(extensions=("docx",)))) == 0
+
+
+def test_search_filter_build_normalizes_inputs(tmp_path):
+    search_filter = _SearchFilter.build(str(tmp_path), [".PDF", "md", " ", "pdf"], None)
+
+    assert search_filter.uri_prefix.startswith("file://")
+    assert search_filter.uri_prefix.endswith(tmp_path.name)
+    assert search_filter.extensions == ("md", "pdf")
+    assert search_filter.active is True
+    assert _SearchFilter.build().active is False
@@ -7,7 +7,9 @@ from tests.conftest import run_cmd
 from wks.api.config.URI import URI
 from wks.api.config.WKSConfig import WKSConfig
 from wks.api.database.Database import Database
-from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
+from wks.api.index._collection_fingerprint import _CollectionFingerprint
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME, _row_ids, _segment_rows, _SemanticIndexState
+from wks.api.similar._similar_helpers import _collect_candidate_scores, _QueryDoc
 from wks.api.similar.cmd import cmd as similar_cmd
 
 
@@ -133,3 +135,65 @@ def test_similar_requires_semantic_index(tmp_path, monkeypatch):
 
     assert result.success is False
     assert "no index section in config" in result.output["errors"][0].lower()
+
+
+def test_similar_reports_timings_when_requested(tmp_path, monkeypatch):
+    write_semantic_config(tmp_path, monkeypatch)
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", fake_embed_texts)
+    _SEARCH_RUNTIME.reset()
+
+    query_file = tmp_path / "query.md"
+    query_file.write_text("reactor coolant\nfission yield\n")
+    copy_file = tmp_path / "copy.md"
+    copy_file.write_text(query_file.read_text())
+    with Database(WKSConfig.load().database, "index_embeddings") as db:
+        insert_embedding_doc(db, copy_file, 0, "reactor coolant", normalized([1.0, 0.0, 0.0, 0.0]))
+        insert_embedding_doc(db, copy_file, 1, "fission yield", normalized([0.0, 1.0, 0.0, 0.0]))
+
+    untimed = run_cmd(similar_cmd, str(query_file))
+    timed = run_cmd(similar_cmd, str(query_file), timings=True)
+
+    assert untimed.output["timings"] is None
+    assert timed.output["hits"] == untimed.output["hits"]
+    timings = timed.output["timings"]
+    assert {"config_load", "query_transform", "query_embedding", "index_state", "candidate_scoring", "hydrate"} <= set(
+        timings["phases"]
+    )
+    assert timings["total_ms"] >= max(timings["phases"].values())
+    assert timings["cache"] == {"config": True, "semantic_state:main": True}
+
+
+def test_similar_document_centroids_match_brute_force_candidates():
+    rng = np.random.default_rng(2)
+    centers = rng.normal(size=(200, 8))
+    uri_ids = np.repeat(np.arange(200), 3)
+    matrix = (centers[uri_ids] + 0.05 * rng.normal(size=(len(uri_ids), 8))).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    uris, row_uri_ids, chunk_indexes = _row_ids(
+        [(f"file://host/tmp/doc{uri_id}.md", i % 3) for i, uri_id in enumerate(uri_ids)]
+    )
+    state = _SemanticIndexState(
+        index_name="main",
+        embedding_model="test-model",
+        fingerprint=_CollectionFingerprint(count=len(matrix), newest_id=None),
+        generation=0,
+        uris=uris,
+        uri_ids=row_uri_ids,
+        chunk_indexes=chunk_indexes,
+        matrix=matrix,
+        segment_rows=_segment_rows(uris, row_uri_ids),
+    )
+    query_doc = _QueryDoc(
+        uri="file://host/tmp/query.md",
+        path=Path("/tmp/query.md"),
+        chunks=[],
+        embeddings=matrix[[0, 30, 300]],
+        checksum="",
+        path_segments=frozenset(),
+    )
+
+    brute = _collect_candidate_scores(query_doc, state, per_chunk=5, rrf_k=60.0)
+    staged = _collect_candidate_scores(query_doc, state, per_chunk=5, rrf_k=60.0, doc_candidates=20)
+
+    assert state.doc_centroids is not None
+    assert staged == brute
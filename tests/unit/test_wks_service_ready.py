@@ -0,0 +1,81 @@
+from tests.conftest import run_cmd
+from tests.unit._search_test_helpers import (
+    SEARCH_DOCS,
+    fake_embed_texts,
+    setup_search_config,
+    write_and_index_search_docs,
+)
+from wks.api.index.cmd import cmd as index_cmd
+from wks.api.index.cmd_embed import cmd_embed
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
+from wks.services import WKSService
+
+
+def test_warmup_loads_models_and_builds_index_states(tmp_path, monkeypatch):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={
+            "default_index": "main",
+            "indexes": {
+                "main": {"engine": "textpass"},
+                "semantic": {"engine": "textpass", "embedding_model": "test-model"},
+                "semantic_copy": {"engine": "textpass", "embedding_model": "test-model"},
+            },
+        },
+    )
+    embedded: list[list[str]] = []
+
+    def counting_embed_texts(texts, model_name, batch_size):
+        embedded.append(list(texts))
+        return fake_embed_texts(texts, model_name, batch_size)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", counting_embed_texts)
+    write_and_index_search_docs(tmp_path)
+    for name in SEARCH_DOCS:
+        assert run_cmd(index_cmd, "semantic", str(tmp_path / name)).success is True
+    assert run_cmd(cmd_embed, "semantic", batch_size=8).success is True
+    embedded.clear()
+    _SEARCH_RUNTIME.reset()
+
+    service = WKSService()
+    assert service.warmup() is True
+    response = service.ready(wait=30)
+
+    assert response.ready is True
+    assert response.state == "ready"
+    assert response.models == ["test-model"]
+    assert response.indexes == ["main", "semantic", "semantic_copy"]
+    assert response.errors == []
+    assert embedded == [["warmup"]]
+    assert set(_SEARCH_RUNTIME._lexical_states) == {"main"}
+    assert set(_SEARCH_RUNTIME._semantic_states) == {("semantic", "test-model"), ("semantic_copy", "test-model")}
+
+
+def test_warmup_records_model_failures_and_still_becomes_ready(tmp_path, monkeypatch):
+    _SEARCH_RUNTIME.reset()
+    setup_search_config(
+        tmp_path,
+        monkeypatch,
+        index_config={
+            "default_index": "main",
+            "indexes": {
+                "main": {"engine": "textpass"},
+                "semantic": {"engine": "textpass", "embedding_model": "missing-model"},
+            },
+        },
+    )
+
+    def failing_embed_texts(texts, model_name, batch_size):
+        raise RuntimeError(f"cannot load {model_name}")
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", failing_embed_texts)
+
+    service = WKSService()
+    service.warmup()
+    response = service.ready(wait=30)
+
+    assert response.ready is True
+    assert response.indexes == ["main"]
+    assert response.errors == ["semantic: cannot load missing-model"]
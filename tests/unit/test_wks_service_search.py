@@ -1,3 +1,6 @@
+from dataclasses import replace
+
+import numpy as np
 import pytest
 
 from tests.conftest import run_cmd
@@ -7,10 +10,26 @@ from tests.unit._search_test_helpers import (
     setup_search_config,
     write_and_index_search_docs,
 )
+from wks.api.config.URI import URI
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.database.Database import Database
+from wks.api.index._collection_fingerprint import _CollectionFingerprint
+from wks.api.index._embed_with_cache import _EMBEDDING_CACHE_FILE
+from wks.api.index._EmbeddingCache import _EmbeddingCache
+from wks.api.index._ShardedMatrix import _ShardedMatrix
 from wks.api.index.cmd import cmd as index_cmd
 from wks.api.index.cmd_embed import cmd_embed
-from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
-from wks.services.search import SearchRequest, search_documents
+from wks.api.search._dedupe_hits import _dedupe_hits
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME, _row_ids, _segment_rows, _SemanticIndexState
+from wks.services._search_filters import _prefilter_documents
+from wks.services._search_semantic import _rank_semantic_hits
+from wks.services.search import (
+    SearchBatchRequest,
+    SearchRequest,
+    search_documents,
+    search_many,
+    stream_search,
+)
 
 
 @pytest.fixture
@@ -86,3 +105,244 @@ def test_search_service_runs_strategy_search(search_service_strategy_env):
     assert response.index_name == "hybrid"
     assert response.search_mode == "combined"
     assert response.hits
+
+
+def test_search_many_matches_single_queries(search_service_strategy_env, monkeypatch):
+    queries = ["fission", "reactor yield", "agents"]
+    expected = [search_documents(SearchRequest(query=query, strategy="hybrid")) for query in queries]
+    _SEARCH_RUNTIME.reset()
+    embedded: list[list[str]] = []
+
+    def recording_embed_texts(texts, model_name, batch_size):
+        embedded.append(list(texts))
+        return fake_embed_texts(texts, model_name, batch_size)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", recording_embed_texts)
+
+    response = search_many(SearchBatchRequest(queries=queries, strategy="hybrid"))
+
+    assert response.success is True
+    assert response.index_name == "hybrid"
+    assert embedded == [queries]
+    assert [result.hits for result in response.results] == [single.hits for single in expected]
+
+
+def test_search_reuses_cached_query_embeddings(search_service_strategy_env, monkeypatch):
+    embedded: list[list[str]] = []
+
+    def recording_embed_texts(texts, model_name, batch_size):
+        embedded.append(list(texts))
+        return fake_embed_texts(texts, model_name, batch_size)
+
+    monkeypatch.setattr("wks.api.index._embedding_utils.embed_texts", recording_embed_texts)
+    disk_cache = _EmbeddingCache(WKSConfig.get_home_dir() / "index" / _EMBEDDING_CACHE_FILE, max_bytes=1)
+    disk_entries = disk_cache.stats()
+
+    first = search_documents(SearchRequest(query="fission  yield", strategy="hybrid"))
+    second = search_documents(SearchRequest(query="fission yield", strategy="hybrid"))
+    batch = search_many(SearchBatchRequest(queries=["fission yield", "reactor"], strategy="hybrid"))
+
+    assert embedded == [["fission  yield"], ["reactor"]]
+    assert first.embedding_cache["misses"] == 1
+    assert second.embedding_cache["hits"] == 1
+    assert batch.embedding_cache == {"hits": 2, "misses": 2, "entries": 2, "bytes": batch.embedding_cache["bytes"]}
+    assert second.hits == first.hits
+    assert disk_cache.stats() == disk_entries
+
+
+def test_search_many_reports_per_query_failures(search_service_env):
+    response = search_many(SearchBatchRequest(queries=["fission", "  "], index="main"))
+
+    assert response.success is True
+    assert response.results[0].success is True
+    assert response.results[0].hits
+    assert response.results[1].failure_kind == "validation"
+
+
+def test_search_many_fails_when_every_query_fails(search_service_env):
+    response = search_many(SearchBatchRequest(queries=["fission", "reactor"], index="missing"))
+
+    assert response.success is False
+    assert response.failure_kind == "not_found"
+    assert len(response.results) == 2
+
+
+def test_search_timings_are_opt_in_and_report_phases(search_service_strategy_env):
+    _SEARCH_RUNTIME.reset()
+
+    untimed = search_documents(SearchRequest(query="fission", strategy="hybrid"))
+    cold = search_documents(SearchRequest(query="reactor", strategy="hybrid", timings=True))
+    warm = search_documents(SearchRequest(query="reactor", strategy="hybrid", timings=True))
+
+    assert untimed.timings is None
+    assert cold.timings is not None
+    assert warm.timings is not None
+    assert {"config_load", "query_embedding", "scoring", "hydrate", "merge", "dedupe", "serialization"} <= set(
+        cold.timings.phases
+    )
+    assert all(duration >= 0.0 for duration in cold.timings.phases.values())
+    assert cold.timings.cache["query_embedding:test-model"] is False
+    assert warm.timings.cache == {
+        "config": True,
+        "lexical_state:main": True,
+        "semantic_state:semantic": True,
+        "query_embedding:test-model": True,
+    }
+    assert "state_build" not in warm.timings.phases
+    assert [hit.uri for hit in warm.hits] == [hit.uri for hit in cold.hits]
+
+
+def test_stream_search_emits_member_hits_then_merged_summary(search_service_strategy_env):
+    expected = search_documents(SearchRequest(query="fission", k=2, strategy="hybrid"))
+
+    events = list(stream_search(SearchRequest(query="fission", k=2, strategy="hybrid")))
+
+    assert [event.event for event in events] == ["hits", "hits", "summary"]
+    assert {event.index_name for event in events[:2]} == {"main", "semantic"}
+    assert all(0 < len(event.hits) <= 2 for event in events[:2])
+    summary = events[-1].summary
+    assert summary is not None
+    assert summary.model_dump(exclude={"embedding_cache"}) == expected.model_dump(exclude={"embedding_cache"})
+
+
+def test_stream_search_single_index_and_validation(search_service_env):
+    events = list(stream_search(SearchRequest(query="fission", k=2)))
+    invalid = list(stream_search(SearchRequest(query="fission", index="missing")))
+
+    assert [event.event for event in events] == ["hits", "summary"]
+    assert events[0].hits == events[1].summary.hits
+    assert [event.event for event in invalid] == ["summary"]
+    assert invalid[0].summary.failure_kind == "not_found"
+
+
+def _reference_state(rows: int = 2000):
+    rng = np.random.default_rng(5)
+    matrix = rng.normal(size=(rows, 16)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    docs = [
+        {
+            "uri": f"file://host/tmp/{'agents' if row % 7 == 0 else 'notes'}/doc{row // 4}.txt",
+            "chunk_index": row % 4,
+            "tokens": 5,
+            "text": f"chunk {row}",
+        }
+        for row in range(len(matrix))
+    ]
+    uris, uri_ids, chunk_indexes = _row_ids([(doc["uri"], doc["chunk_index"]) for doc in docs])
+    state = _SemanticIndexState(
+        index_name="main",
+        embedding_model="test-model",
+        fingerprint=_CollectionFingerprint(count=len(docs), newest_id=None),
+        generation=0,
+        uris=uris,
+        uri_ids=uri_ids,
+        chunk_indexes=chunk_indexes,
+        matrix=matrix,
+        segment_rows=_segment_rows(uris, uri_ids),
+    )
+    return state, docs
+
+
+def test_rank_semantic_hits_matches_full_sort_reference(monkeypatch):
+    state, docs = _reference_state()
+    matrix = state.matrix
+    hydrated: list[int] = []
+
+    def fake_get_semantic_chunks(config, state, rows):
+        hydrated.extend(rows)
+        return [docs[row] for row in rows]
+
+    monkeypatch.setattr(_SEARCH_RUNTIME, "get_semantic_chunks", fake_get_semantic_chunks)
+    query = matrix[42]
+
+    hits = _rank_semantic_hits(None, state, query, "agents report", 5)
+
+    scores = matrix @ query
+    boosted = [float(scores[row]) * (1.2 if row % 7 == 0 else 1.0) for row in range(len(docs))]
+    ranked = sorted(range(len(docs)), key=lambda row: boosted[row], reverse=True)
+    expected = _dedupe_hits(
+        [{**docs[row], "score": round(boosted[row], 4)} for row in ranked],
+        5,
+    )
+    assert [(hit["uri"], hit["chunk_index"], hit["score"]) for hit in hits] == [
+        (hit["uri"], hit["chunk_index"], hit["score"]) for hit in expected
+    ]
+    assert len(hydrated) <= 10
+
+
+def test_rank_semantic_hits_sharded_matches_unsharded(monkeypatch):
+    state, docs = _reference_state()
+    sharded = replace(state, shard_count=2, shards=_ShardedMatrix(state.matrix, 2))
+    monkeypatch.setattr(_SEARCH_RUNTIME, "get_semantic_chunks", lambda config, state, rows: [docs[row] for row in rows])
+    query = state.matrix[42]
+
+    for text in ["agents report", "unrelated"]:
+        assert _rank_semantic_hits(None, sharded, query, text, 5) == _rank_semantic_hits(None, state, query, text, 5)
+
+
+def test_document_prefilter_matches_brute_force_on_clustered_documents(monkeypatch):
+    state, docs = _reference_state()
+    rng = np.random.default_rng(11)
+    centers = rng.normal(size=(len(state.uris), 16))
+    matrix = (centers[state.uri_ids] + 0.05 * rng.normal(size=state.matrix.shape)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    state = replace(state, matrix=matrix)
+    monkeypatch.setattr(_SEARCH_RUNTIME, "get_semantic_chunks", lambda config, state, rows: [docs[row] for row in rows])
+    query = matrix[42]
+
+    allowed = _prefilter_documents(state, query, 10, None)
+
+    assert allowed is not None
+    assert len(np.unique(state.uri_ids[allowed])) == 10
+    assert _rank_semantic_hits(None, state, query, "notes", 5, allowed=allowed) == _rank_semantic_hits(
+        None, state, query, "notes", 5
+    )
+    assert _prefilter_documents(state, query, len(state.uris), None) is None
+    subset = np.arange(0, 400, dtype=np.int64)
+    restricted = _prefilter_documents(state, query, 10, subset)
+    assert restricted is not None
+    assert set(restricted.tolist()) <= set(subset.tolist())
+    assert len(np.unique(state.uri_ids[restricted])) == 10
+
+
+def test_semantic_index_state_shards_large_matrices(search_service_strategy_env, monkeypatch):
+    monkeypatch.setattr("wks.api.search._SearchRuntime._SHARD_MIN_ROWS", 0)
+    config = WKSConfig.load()
+
+    unsharded = _SEARCH_RUNTIME.get_semantic_index_state(config, "semantic", "test-model")
+    sharded = _SEARCH_RUNTIME.get_semantic_index_state(config, "semantic", "test-model", shard_count=2)
+
+    assert unsharded.shards is None
+    assert sharded.shards is not None
+    assert _SEARCH_RUNTIME.get_semantic_index_state(config, "semantic", "test-model", shard_count=2) is sharded
+    query = np.asarray(unsharded.matrix[0])
+    assert _rank_semantic_hits(config, sharded, query, "fission", 2) == _rank_semantic_hits(
+        config, unsharded, query, "fission", 2
+    )
+
+
+def test_search_filters_restrict_lexical_and_semantic_hits(search_service_strategy_env):
+    fission, _, coolant = search_service_strategy_env["docs"]
+    config = WKSConfig.load()
+    with Database(config.database, "nodes") as db:
+        db.insert_many(
+            [
+                {"local_uri": str(URI.from_path(fission)), "priority": 9.0},
+                {"local_uri": str(URI.from_path(coolant)), "priority": 1.0},
+            ]
+        )
+
+    for index in ["main", "semantic"]:
+        unfiltered = search_documents(SearchRequest(query="reactor", index=index))
+        under = search_documents(SearchRequest(query="reactor", index=index, uri_prefix=str(coolant)))
+        important = search_documents(SearchRequest(query="reactor", index=index, min_priority=5.0))
+        other_ext = search_documents(SearchRequest(query="reactor", index=index, extensions=["pdf"]))
+
+        assert {str(URI.from_path(fission)), str(URI.from_path(coolant))} <= {hit.uri for hit in unfiltered.hits}
+        assert [hit.uri for hit in under.hits] == [str(URI.from_path(coolant))]
+        assert [hit.uri for hit in important.hits] == [str(URI.from_path(fission))]
+        assert other_ext.success is True
+        assert other_ext.hits == []
+
+    combined = search_documents(SearchRequest(query="reactor", strategy="hybrid", extensions=[".TXT"], min_priority=5))
+    assert {hit.uri for hit in combined.hits} == {str(URI.from_path(fission))}
@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+
+@dataclass(frozen=True, slots=True)
+class BulkWriteOp:
+    kind: Literal["insert", "update", "delete"]
+    filter: dict[str, Any] = field(default_factory=dict)
+    document: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def insert(cls, document: dict[str, Any]) -> "BulkWriteOp":
+        return cls("insert", document=document)
+
+    @classmethod
+    def update(cls, filter: dict[str, Any], update: dict[str, Any]) -> "BulkWriteOp":
+        return cls("update", filter=filter, document=update)
+
+    @classmethod
+    def delete(cls, filter: dict[str, Any]) -> "BulkWriteOp":
+        return cls("delete", filter=filter)
@@ -1,6 +1,8 @@
 from typing import Any, Literal
 
 from ._AbstractBackend import _AbstractBackend
+from .BulkWriteCounts import BulkWriteCounts
+from .BulkWriteOp import BulkWriteOp
 from .DatabaseConfig import DatabaseConfig
 
 
@@ -60,6 +62,9 @@ class Database(_AbstractBackend):
     def delete_many(self, filter: dict[str, Any]) -> int:
         return self._backend.delete_many(filter)  # type: ignore[union-attr]
 
+    def bulk_write(self, operations: list[BulkWriteOp], ordered: bool = True) -> BulkWriteCounts:
+        return self._backend.bulk_write(operations, ordered)  # type: ignore[union-attr]
+
     def find(self, filter: dict[str, Any] | None = None, projection: dict[str, Any] | None = None) -> Any:
         return self._backend.find(filter, projection)  # type: ignore[union-attr]
 
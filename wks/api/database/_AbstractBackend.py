@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
+from .BulkWriteCounts import BulkWriteCounts
+from .BulkWriteOp import BulkWriteOp
+
 
 class _AbstractBackend(ABC):
     @abstractmethod
@@ -35,6 +38,10 @@ class _AbstractBackend(ABC):
     def delete_many(self, filter: dict[str, Any]) -> int:
         pass
 
+    @abstractmethod
+    def bulk_write(self, operations: list[BulkWriteOp], ordered: bool = True) -> BulkWriteCounts:
+        pass
+
     @abstractmethod
     def find(self, filter: dict[str, Any] | None = None, projection: dict[str, Any] | None = None) -> Any:
         pass
@@ -4,6 +4,9 @@ import mongomock
 from pymongo.collection import Collection
 
 from .._AbstractBackend import _AbstractBackend
+from .._pymongo_bulk_write import _pymongo_bulk_write
+from ..BulkWriteCounts import BulkWriteCounts
+from ..BulkWriteOp import BulkWriteOp
 from ..DatabaseConfig import DatabaseConfig
 from ._client import _get_mongomock_client
 from ._Data import _Data as _DatabaseConfigData
@@ -46,6 +49,9 @@ class _Backend(_AbstractBackend):
     def delete_many(self, filter: dict[str, Any]) -> int:
         return self._collection.delete_many(filter).deleted_count  # type: ignore[union-attr]
 
+    def bulk_write(self, operations: list[BulkWriteOp], ordered: bool = True) -> BulkWriteCounts:
+        return _pymongo_bulk_write(self._collection, operations, ordered)
+
     def find(self, filter: dict[str, Any] | None = None, projection: dict[str, Any] | None = None) -> Any:
         return self._collection.find(filter or {}, projection)  # type: ignore[union-attr]
 
@@ -0,0 +1,23 @@
+from typing import Any
+
+from pymongo import DeleteMany, InsertOne, UpdateMany
+
+from .BulkWriteCounts import BulkWriteCounts
+from .BulkWriteOp import BulkWriteOp
+
+
+def _pymongo_bulk_write(collection: Any, operations: list[BulkWriteOp], ordered: bool) -> BulkWriteCounts:
+    if not operations:
+        return BulkWriteCounts()
+    result = collection.bulk_write([_pymongo_operation(op) for op in operations], ordered=ordered)
+    return BulkWriteCounts(inserted=result.inserted_count, updated=result.modified_count, deleted=result.deleted_count)
+
+
+def _pymongo_operation(op: BulkWriteOp) -> Any:
+    if op.kind == "insert":
+        return InsertOne(op.document)
+    if op.kind == "update":
+        return UpdateMany(op.filter, op.document)
+    if op.kind == "delete":
+        return DeleteMany(op.filter)
+    raise ValueError(f"Unsupported bulk write operation: {op.kind!r}")
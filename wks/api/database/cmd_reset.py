@@ -1,9 +1,14 @@
 from collections.abc import Iterator
+from importlib import import_module
+from typing import Any
 
 from ..config.StageResult import StageResult
 from . import DatabaseResetOutput
 from .Database import Database
 
+# Index generation counters must only increase, or a reset could bring back a value a server has cached.
+_PRESERVED_DATABASES = frozenset({"index_generations"})
+
 
 def cmd_reset(database: str) -> StageResult:
     def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
@@ -12,25 +17,18 @@ def cmd_reset(database: str) -> StageResult:
         yield (0.2, "Loading configuration...")
         config = WKSConfig.load()
 
-        if database == "all":
-            targets = Database.list_databases(config.database)
-        else:
-            known = Database.list_databases(config.database)
-            prefix = config.database.prefix
-            short_names = [n[len(prefix) + 1 :] if n.startswith(f"{prefix}.") else n for n in known]
-            if database not in short_names:
-                yield (1.0, "Complete")
-                msg = f"Database '{database}' does not exist. Known databases: {', '.join(short_names)}"
-                result_obj.output = DatabaseResetOutput(
-                    errors=[msg],
-                    warnings=[],
-                    database=database,
-                    deleted_count=0,
-                ).model_dump(mode="python")
-                result_obj.result = f"Database '{database}' does not exist"
-                result_obj.success = False
-                return
-            targets = [database]
+        targets, error, summary = _resolve_targets(config, database)
+        if error is not None:
+            yield (1.0, "Complete")
+            result_obj.output = DatabaseResetOutput(
+                errors=[error],
+                warnings=[],
+                database=database,
+                deleted_count=0,
+            ).model_dump(mode="python")
+            result_obj.result = summary
+            result_obj.success = False
+            return
 
         total_deleted = 0
         deleted_details = []
@@ -47,15 +45,7 @@ def cmd_reset(database: str) -> StageResult:
                     count = database_obj.delete_many({})
                     total_deleted += count
                     deleted_details.append(f"{target_db}: {count}")
-
-                    try:
-                        from importlib import import_module
-
-                        hook_module = import_module(f"wks.api.{target_db}.post_reset")
-                        if hasattr(hook_module, "post_reset"):
-                            hook_module.post_reset(config)
-                    except ImportError:
-                        pass  # No hooks for this domain
+                    _run_post_reset(target_db, config)
 
             except Exception as e:
                 errors.append(f"Failed to reset {target_db}: {e}")
@@ -80,3 +70,28 @@ def cmd_reset(database: str) -> StageResult:
         announce=f"Resetting {database} database...",
         progress_callback=do_work,
     )
+
+
+def _resolve_targets(config: Any, database: str) -> tuple[list[str], str | None, str]:
+    if database == "all":
+        targets = [name for name in Database.list_databases(config.database) if name not in _PRESERVED_DATABASES]
+        return targets, None, ""
+    if database in _PRESERVED_DATABASES:
+        msg = f"Database '{database}' cannot be reset"
+        return [], msg, msg
+    known = Database.list_databases(config.database)
+    prefix = config.database.prefix
+    short_names = [n[len(prefix) + 1 :] if n.startswith(f"{prefix}.") else n for n in known]
+    if database not in short_names:
+        msg = f"Database '{database}' does not exist. Known databases: {', '.join(short_names)}"
+        return [], msg, f"Database '{database}' does not exist"
+    return [database], None, ""
+
+
+def _run_post_reset(target_db: str, config: Any) -> None:
+    try:
+        hook_module = import_module(f"wks.api.{target_db}.post_reset")
+        if hasattr(hook_module, "post_reset"):
+            hook_module.post_reset(config)
+    except ImportError:
+        pass  # No hooks for this domain
@@ -168,9 +168,9 @@ class SemanticDiffEngine(DiffEngine):
     def _embed_text_units(self, units: list[str], model_name: str) -> np.ndarray:
         if len(units) == 0:
             return np.zeros((0, 1), dtype=np.float32)
-        from wks.api.index._embedding_utils import embed_texts
+        from wks.api.index._embed_with_cache import embed_with_cache
 
-        return embed_texts(texts=units, model_name=model_name, batch_size=64)
+        return embed_with_cache(texts=units, model_name=model_name, batch_size=64)
 
     def _greedy_match(self, similarity: np.ndarray, modified_threshold: float) -> list[tuple[int, int, float]]:
         if similarity.ndim != 2:
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, model_validator
 
+from ._BackfillSpec import _BackfillSpec
 from ._IndexSpec import _IndexSpec
 from ._StrategySpec import _StrategySpec
 
@@ -9,6 +10,7 @@ class IndexConfig(BaseModel):
     default_strategy: str | None = None
     strategies: dict[str, _StrategySpec] = {}
     indexes: dict[str, _IndexSpec]
+    backfill: _BackfillSpec = _BackfillSpec()
 
     @model_validator(mode="after")
     def validate_strategies(self) -> "IndexConfig":
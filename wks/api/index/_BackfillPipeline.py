@@ -0,0 +1,421 @@
+import multiprocessing
+import queue
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache, partial
+from pathlib import Path
+from threading import BoundedSemaphore, Event, Lock, Thread
+from typing import Any
+
+from ..config.WKSConfig import WKSConfig
+from ..transform._resolve_engine_selection import ResolvedEngineSelection
+from ._BackfillSpec import _BackfillSpec
+from ._Chunk import _Chunk
+
+_IN_PROCESS_DATABASES = {"mongomock"}
+_IDLE_FLUSH_SECS = 0.05
+_EMBED_MAX_WAIT_SECS = 2.0
+_PROGRESS_SECS = 1.0
+_DONE = object()
+
+
+@dataclass(frozen=True, slots=True)
+class _BackfillJob:
+    uri: str
+    index_name: str
+    engine: str
+    file_path: Path
+
+
+@dataclass(slots=True)
+class _FileChunks:
+    job: _BackfillJob
+    checksum: str
+    chunks: list[_Chunk]
+    embedding_docs: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _BackfillProgress:
+    total_files: int
+    done_files: int = 0
+    indexed: int = 0
+    skipped: int = 0
+    chunks: int = 0
+    errors: list[str] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    def message(self, queued: tuple[int, int, int]) -> str:
+        return (
+            f"Processed {self.done_files}/{self.total_files} — indexed {self.indexed}, skipped {self.skipped} "
+            f"({self.done_files / self.elapsed:.1f} files/s, {self.chunks / self.elapsed:.0f} chunks/s; "
+            f"queued chunk={queued[0]} embed={queued[1]} write={queued[2]})"
+        )
+
+
+class _BackfillPipeline:
+    def __init__(self, config: WKSConfig, spec: _BackfillSpec, jobs: dict[str, list[_BackfillJob]]):
+        assert config.index is not None
+        self._config = config
+        self._index_config = config.index
+        self._spec = spec
+        self._jobs = jobs
+        self._remaining = {uri: len(uri_jobs) for uri, uri_jobs in jobs.items()}
+        self._succeeded: set[str] = set()
+        self._lock = Lock()
+        self._finished = Event()
+        self._error: Exception | None = None
+        self._in_flight = BoundedSemaphore(spec.queue_size)
+        self._chunk_queue: queue.Queue[Any] = queue.Queue(spec.queue_size)
+        self._embed_queue: queue.Queue[Any] = queue.Queue(spec.queue_size)
+        self._write_queue: queue.Queue[Any] = queue.Queue(spec.queue_size)
+        self.progress = _BackfillProgress(total_files=len(jobs))
+
+    def run(self) -> Iterator[_BackfillProgress]:
+        for uri in [uri for uri, count in self._remaining.items() if count == 0]:
+            self._finish_uri(uri)
+        threads = [Thread(target=self._feed, name="wks-backfill-transform", daemon=True)]
+        threads += [
+            Thread(target=self._chunk_stage, name=f"wks-backfill-chunk-{i}", daemon=True)
+            for i in range(self._spec.chunk_workers)
+        ]
+        threads += [
+            Thread(target=self._embed_stage, name="wks-backfill-embed", daemon=True),
+            Thread(target=self._write_stage, name="wks-backfill-write", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        while not self._finished.wait(_PROGRESS_SECS):
+            yield self.progress
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+        yield self.progress
+
+    def queued(self) -> tuple[int, int, int]:
+        return self._chunk_queue.qsize(), self._embed_queue.qsize(), self._write_queue.qsize()
+
+    def _feed(self) -> None:
+        try:
+            self._guarded(self._submit_transforms)
+        finally:
+            for _ in range(self._spec.chunk_workers):
+                self._chunk_queue.put(_DONE)
+
+    def _submit_transforms(self) -> None:
+        with self._executor() as executor:
+            futures: list[Future[tuple[str, str]]] = []
+            for job in (job for uri_jobs in self._jobs.values() for job in uri_jobs):
+                if self._error is not None:
+                    break
+                self._in_flight.acquire()
+                future = executor.submit(
+                    _transform_content, job.engine, job.file_path, None if self._uses_processes() else self._config
+                )
+                future.add_done_callback(partial(self._transformed, job))
+                futures.append(future)
+            for future in futures:
+                future.exception()
+
+    def _transformed(self, job: _BackfillJob, future: Future[tuple[str, str]]) -> None:
+        # Done callbacks run on the executor's result thread, which must never block. Each queued item
+        # keeps the _in_flight permit taken at submit until the chunk stage dequeues it, and the queue
+        # holds queue_size items, so there is always room.
+        self._guarded(self._enqueue_transformed, job, future)
+
+    def _enqueue_transformed(self, job: _BackfillJob, future: Future[tuple[str, str]]) -> None:
+        try:
+            self._chunk_queue.put_nowait((job, future))
+        except queue.Full:
+            raise RuntimeError(
+                f"Backfill chunk queue is full with {self._spec.queue_size} transforms in flight"
+            ) from None
+
+    def _chunk_stage(self) -> None:
+        try:
+            while (item := self._chunk_queue.get()) is not _DONE:
+                self._in_flight.release()
+                self._guarded(self._chunk, *item)
+        finally:
+            self._embed_queue.put(_DONE)
+
+    def _chunk(self, job: _BackfillJob, future: Future[tuple[str, str]]) -> None:
+        from ._SlidingWindowChunker import _SlidingWindowChunker
+
+        try:
+            checksum, content = future.result()
+            index_spec = self._index_config.indexes[job.index_name]
+            chunker = _SlidingWindowChunker(index_spec.max_tokens, index_spec.overlap_tokens)
+            self._embed_queue.put(_FileChunks(job, checksum, chunker.chunk(content, job.uri)))
+        except Exception as exc:
+            self._fail(job, f"Transform failed: {exc}")
+
+    def _embed_stage(self) -> None:
+        pending: dict[str, list[_FileChunks]] = {}
+        oldest = time.perf_counter()
+        remaining_chunkers = self._spec.chunk_workers
+        try:
+            while remaining_chunkers:
+                try:
+                    item = self._embed_queue.get(timeout=_IDLE_FLUSH_SECS)
+                except queue.Empty:
+                    item = None
+                if item is _DONE:
+                    remaining_chunkers -= 1
+                elif item is not None:
+                    if not pending:
+                        oldest = time.perf_counter()
+                    self._guarded(self._queue_embedding, pending, item)
+                force = time.perf_counter() - oldest >= _EMBED_MAX_WAIT_SECS
+                self._guarded(self._flush_embeddings, pending, force)
+            self._guarded(self._flush_embeddings, pending, True)
+        finally:
+            self._write_queue.put(_DONE)
+
+    def _queue_embedding(self, pending: dict[str, list[_FileChunks]], item: _FileChunks) -> None:
+        if self._index_config.indexes[item.job.index_name].embedding_model is None or not item.chunks:
+            self._write_queue.put(item)
+        else:
+            pending.setdefault(item.job.index_name, []).append(item)
+
+    def _flush_embeddings(self, pending: dict[str, list[_FileChunks]], force: bool) -> None:
+        from ._build_embedding_docs import build_embedding_docs
+        from ._build_semantic_embeddings import build_semantic_embeddings
+
+        for index_name in list(pending):
+            files = pending[index_name]
+            if not force and sum(len(item.chunks) for item in files) < self._spec.embed_batch_size:
+                continue
+            del pending[index_name]
+            index_spec = self._index_config.indexes[index_name]
+            assert index_spec.embedding_model is not None
+            try:
+                embeddings = build_semantic_embeddings(
+                    chunks=[chunk for item in files for chunk in item.chunks],
+                    embedding_model=index_spec.embedding_model,
+                    embedding_mode=index_spec.embedding_mode,
+                    image_text_weight=index_spec.image_text_weight,
+                    batch_size=self._spec.embed_batch_size,
+                )
+            except Exception as exc:
+                for item in files:
+                    self._fail(item.job, f"Embedding failed: {exc}")
+                continue
+            offset = 0
+            for item in files:
+                item.embedding_docs = build_embedding_docs(
+                    index_name=index_name,
+                    embedding_model=index_spec.embedding_model,
+                    embedding_mode=index_spec.embedding_mode,
+                    chunks=item.chunks,
+                    embeddings=embeddings[offset : offset + len(item.chunks)],
+                )
+                offset += len(item.chunks)
+                self._write_queue.put(item)
+
+    def _write_stage(self) -> None:
+        batch: list[_FileChunks] = []
+        try:
+            while (item := self._next_write()) is not _DONE:
+                if item is not None:
+                    batch.append(item)
+                if item is None or len(batch) >= self._spec.write_batch_files:
+                    self._guarded(self._write, batch)
+                    batch = []
+            self._guarded(self._write, batch)
+        finally:
+            self._finished.set()
+
+    def _next_write(self) -> Any:
+        try:
+            return self._write_queue.get(timeout=_IDLE_FLUSH_SECS)
+        except queue.Empty:
+            return None
+
+    def _guarded(self, step: Callable[..., None], *args: Any) -> None:
+        if self._error is not None:
+            return
+        try:
+            step(*args)
+        except Exception as exc:
+            with self._lock:
+                if self._error is None:
+                    self._error = exc
+
+    def _write(self, batch: list[_FileChunks]) -> None:
+        by_index: dict[str, list[_FileChunks]] = {}
+        for item in batch:
+            by_index.setdefault(item.job.index_name, []).append(item)
+        for index_name, items in by_index.items():
+            try:
+                self._write_index(index_name, items)
+            except Exception as exc:
+                for item in items:
+                    self._fail(item.job, f"Write failed: {exc}")
+                continue
+            for item in items:
+                self._complete(item.job, len(item.chunks))
+
+    def _write_index(self, index_name: str, items: list[_FileChunks]) -> None:
+        from ..database.Database import Database
+        from ._ChunkStore import _ChunkStore
+        from ._EmbeddingStore import _EmbeddingStore
+
+        index_spec = self._index_config.indexes[index_name]
+        with Database(self._config.database, "index") as db:
+            store = _ChunkStore(db)
+            spec_key = index_spec.content_key()
+            for item in items:
+                store.replace_uri(index_name, item.job.uri, item.checksum, item.chunks, spec_key)
+        if index_spec.embedding_model is not None:
+            with Database(self._config.database, "index_embeddings") as db:
+                _EmbeddingStore(db).replace_uris(
+                    index_name=index_name,
+                    embedding_model=index_spec.embedding_model,
+                    uris={item.job.uri for item in items},
+                    docs=[doc for item in items for doc in item.embedding_docs],
+                )
+
+    def _complete(self, job: _BackfillJob, chunk_count: int) -> None:
+        with self._lock:
+            self._succeeded.add(job.uri)
+            self.progress.chunks += chunk_count
+            self._remaining[job.uri] -= 1
+            if self._remaining[job.uri] == 0:
+                self._finish_uri(job.uri)
+
+    def _fail(self, job: _BackfillJob, message: str) -> None:
+        with self._lock:
+            self.progress.errors.append(f"{job.uri}: Index '{job.index_name}': {message}")
+            self._remaining[job.uri] -= 1
+            if self._remaining[job.uri] == 0:
+                self._finish_uri(job.uri)
+
+    def _finish_uri(self, uri: str) -> None:
+        self.progress.done_files += 1
+        if uri in self._succeeded:
+            self.progress.indexed += 1
+        else:
+            self.progress.skipped += 1
+
+    def _uses_processes(self) -> bool:
+        return self._spec.transform_workers > 1 and self._config.database.type not in _IN_PROCESS_DATABASES
+
+    def _executor(self) -> Executor:
+        if self._uses_processes():
+            return ProcessPoolExecutor(
+                max_workers=self._spec.transform_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return ThreadPoolExecutor(max_workers=self._spec.transform_workers, thread_name_prefix="wks-transform")
+
+
+def _transform_content(engine: str, file_path: Path, config: WKSConfig | None) -> tuple[str, str]:
+    from ..transform import MAX_GENERATOR_ITERATIONS
+    from ..transform._get_controller import _get_controller
+
+    with _get_controller(config or _worker_config()) as controller:
+        gen = controller.transform(file_path, engine, {}, None)
+        try:
+            for _ in range(MAX_GENERATOR_ITERATIONS):
+                next(gen)
+            next(gen)
+            raise RuntimeError("Transform generator exceeded MAX_GENERATOR_ITERATIONS")
+        except StopIteration as stop:
+            checksum, _ = stop.value
+        return checksum, controller.get_content(checksum)
+
+
+@cache
+def _worker_config() -> WKSConfig:
+    return WKSConfig.load()
+
+
+def _plan_jobs(
+    config: WKSConfig, uris: list[str], force: bool = False, workers: int = 1
+) -> tuple[dict[str, list[_BackfillJob]], list[str], list[str]]:
+    assert config.index is not None
+    jobs, files, missing = _collect_files(config, uris)
+    candidates = {file_uri: _file_candidates(config, file_path) for file_uri, file_path in files.items()}
+    stored = set() if force else _stored_pairs(config, files, candidates, workers)
+    unchanged: list[str] = []
+    for file_uri, file_candidates in candidates.items():
+        uri_jobs = [
+            _BackfillJob(file_uri, index_name, config.index.indexes[index_name].engine, files[file_uri])
+            for index_name, _ in file_candidates
+            if (file_uri, index_name) not in stored
+        ]
+        if uri_jobs or not file_candidates:
+            jobs[file_uri] = uri_jobs
+        else:
+            unchanged.append(file_uri)
+    return jobs, missing, unchanged
+
+
+def _collect_files(
+    config: WKSConfig, uris: list[str]
+) -> tuple[dict[str, list[_BackfillJob]], dict[str, Path], list[str]]:
+    from ..config.normalize_path import normalize_path
+    from ..config.URI import URI
+
+    cache_dir = normalize_path(config.transform.cache.base_dir)
+    jobs: dict[str, list[_BackfillJob]] = {}
+    files: dict[str, Path] = {}
+    missing: list[str] = []
+    for uri in uris:
+        file_path = URI.from_any(uri).path
+        if file_path == cache_dir or cache_dir in file_path.parents:
+            jobs[uri] = []
+        elif not file_path.exists():
+            missing.append(uri)
+        else:
+            files.setdefault(str(URI.from_path(file_path)), file_path)
+    return jobs, files, missing
+
+
+def _file_candidates(config: WKSConfig, file_path: Path) -> list[tuple[str, ResolvedEngineSelection]]:
+    from ..monitor.calculate_priority import calculate_priority
+    from ..transform._resolve_engine_selection import resolve_engine_selection
+
+    assert config.index is not None
+    priority = calculate_priority(file_path, config.monitor.priority.dirs, config.monitor.priority.weights.model_dump())
+    candidates: list[tuple[str, ResolvedEngineSelection]] = []
+    for index_name, spec in config.index.indexes.items():
+        if priority < spec.min_priority:
+            continue
+        try:
+            selection = resolve_engine_selection(config.transform.engines, spec.engine, file_path, {})
+        except ValueError:
+            continue
+        if selection.selected_type != "null":
+            candidates.append((index_name, selection))
+    return candidates
+
+
+def _stored_pairs(
+    config: WKSConfig,
+    files: dict[str, Path],
+    candidates: dict[str, list[tuple[str, ResolvedEngineSelection]]],
+    workers: int,
+) -> set[tuple[str, str]]:
+    from ..config.file_checksum import file_checksum
+    from ._stored_chunk_count import _expected_transform_key, _stored_chunk_counts
+
+    checked = [file_uri for file_uri, file_candidates in candidates.items() if file_candidates]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wks-checksum") as executor:
+        checksums = dict(zip(checked, executor.map(file_checksum, [files[uri] for uri in checked]), strict=True))
+    expected: dict[str, dict[str, str]] = {}
+    for file_uri in checked:
+        for index_name, selection in candidates[file_uri]:
+            expected.setdefault(index_name, {})[file_uri] = _expected_transform_key(checksums[file_uri], selection)
+    stored: set[tuple[str, str]] = set()
+    for index_name, expected_keys in expected.items():
+        counts = _stored_chunk_counts(config, index_name, expected_keys)
+        stored.update((file_uri, index_name) for file_uri, count in counts.items() if count is not None)
+    return stored
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, model_validator
+
+
+class _BackfillSpec(BaseModel):
+    transform_workers: int = 1
+    chunk_workers: int = 1
+    embed_batch_size: int = 256
+    write_batch_files: int = 32
+    queue_size: int = 64
+
+    @model_validator(mode="after")
+    def validate_sizes(self) -> "_BackfillSpec":
+        for field in ("transform_workers", "chunk_workers", "embed_batch_size", "write_batch_files", "queue_size"):
+            if getattr(self, field) < 1:
+                raise ValueError(f"index.backfill.{field} must be >= 1")
+        return self
@@ -0,0 +1,54 @@
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from ..database.BulkWriteCounts import BulkWriteCounts
+from ..database.BulkWriteOp import BulkWriteOp
+
+
+@dataclass(slots=True)
+class _BulkDelta:
+    inserts: list[dict[str, Any]]
+    updates: list[tuple[Any, dict[str, Any]]]
+    kept: list[dict[str, Any]]
+    deletes: list[dict[str, Any]]
+
+    @classmethod
+    def plan(
+        cls,
+        previous: list[dict[str, Any]],
+        docs: list[dict[str, Any]],
+        key: Callable[[dict[str, Any]], Hashable | None],
+    ) -> "_BulkDelta":
+        by_key: dict[Hashable, dict[str, Any]] = {}
+        deletes: list[dict[str, Any]] = []
+        for doc in previous:
+            doc_key = key(doc)
+            if doc_key is None or doc_key in by_key:
+                deletes.append(doc)
+            else:
+                by_key[doc_key] = doc
+        delta = cls(inserts=[], updates=[], kept=[], deletes=deletes)
+        for doc in docs:
+            stored = by_key.pop(key(doc), None)
+            if stored is None:
+                delta.inserts.append(doc)
+                continue
+            delta.kept.append(stored)
+            changed = {field: value for field, value in doc.items() if stored.get(field) != value}
+            if changed:
+                delta.updates.append((stored["_id"], changed))
+        delta.deletes.extend(by_key.values())
+        return delta
+
+    def apply(self, db: Any) -> BulkWriteCounts:
+        grouped: dict[str, tuple[dict[str, Any], list[Any]]] = {}
+        for doc_id, changed in self.updates:
+            grouped.setdefault(repr(sorted(changed.items())), (changed, []))[1].append(doc_id)
+        operations = [BulkWriteOp.insert(doc) for doc in self.inserts]
+        operations += [
+            BulkWriteOp.update({"_id": {"$in": ids}}, {"$set": changed}) for changed, ids in grouped.values()
+        ]
+        if self.deletes:
+            operations.append(BulkWriteOp.delete({"_id": {"$in": [doc["_id"] for doc in self.deletes]}}))
+        return db.bulk_write(operations, ordered=False)
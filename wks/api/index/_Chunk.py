@@ -8,3 +8,5 @@ class _Chunk:
     chunk_index: int
     tokens: int
     is_continuation: bool
+    canonical_uri: str | None = None
+    text_hash: str | None = None
@@ -1,55 +1,159 @@
 import re
 from typing import Any
 
+import numpy as np
+
+from ..database.BulkWriteCounts import BulkWriteCounts
+from ..database.BulkWriteOp import BulkWriteOp
+from ._BulkDelta import _BulkDelta
 from ._Chunk import _Chunk
+from ._chunk_dedupe_keys import _chunk_dedupe_keys
+from ._EmptyUris import _EmptyUris
+from ._IndexGenerations import _IndexGenerations
+from ._PostingStore import _PostingStats, _PostingStore
+from ._tokenize import tokenize
+from ._TrigramStore import _TrigramStore
 
 _SEARCH_INDEX_NAME = "wks_chunk_text_search"
-_TERM_RE = re.compile(r"[A-Za-z0-9_]+")
 _FALLBACK_TEXT_SCAN_LIMIT = 10_000
+_FUZZY_MIN_SIMILARITY = 0.6
+_REBUILD_BATCH_SIZE = 1000
 
 
 class _ChunkStore:
     def __init__(self, db: Any):
         self._db = db
+        self._postings = _PostingStore(db)
+        self._trigrams = _TrigramStore(db)
+        self._empty_uris = _EmptyUris(db)
+        self._generations = _IndexGenerations(db)
 
-    def replace_uri(self, index_name: str, uri: str, checksum: str, chunks: list[_Chunk]) -> int:
-        self._db.delete_many({"index_name": index_name, "uri": uri})
-        if not chunks:
-            return 0
-        docs = [
-            {
-                "index_name": index_name,
-                "uri": c.uri,
-                "checksum": checksum,
-                "chunk_index": c.chunk_index,
-                "text": c.text,
-                "tokens": c.tokens,
-                "is_continuation": c.is_continuation,
-            }
-            for c in chunks
-        ]
-        self._db.insert_many(docs)
-        return len(docs)
+    def replace_uri(
+        self, index_name: str, uri: str, checksum: str, chunks: list[_Chunk], spec_key: str = ""
+    ) -> BulkWriteCounts:
+        previous = list(self._db.find({"index_name": index_name, "uri": uri}))
+        if chunks:
+            self._empty_uris.unmark(index_name, uri)
+        else:
+            self._empty_uris.mark(index_name, uri, checksum, spec_key)
+        chunk_terms = [tokenize(c.text) for c in chunks]
+        docs = _chunk_docs(index_name, checksum, spec_key, chunks, chunk_terms)
+        terms_by_index = {c.chunk_index: terms for c, terms in zip(chunks, chunk_terms, strict=True)}
+        delta = _BulkDelta.plan(previous, docs, _chunk_key)
+        if delta.inserts:
+            first_id = self._postings.allocate_chunk_ids(index_name, len(delta.inserts))
+            for i, doc in enumerate(delta.inserts):
+                doc["chunk_id"] = first_id + i
+        counts = delta.apply(self._db)
+        if not counts.changed:
+            return counts
+        self._postings.remove(index_name, delta.deletes)
+        self._postings.add(index_name, delta.inserts, [terms_by_index[doc["chunk_index"]] for doc in delta.inserts])
+        if delta.inserts or delta.deletes:
+            self._trigrams.replace_uri(index_name, uri, delta.kept + delta.inserts)
+        self._generations.bump(index_name)
+        return counts
+
+    def current_chunk_counts(self, index_name: str, checksums: dict[str, str], spec_key: str) -> dict[str, int | None]:
+        counts: dict[str, int] = {}
+        stale: set[str] = set()
+        docs = self._db.find(
+            {"index_name": index_name, "uri": {"$in": sorted(checksums)}},
+            {"_id": 0, "uri": 1, "checksum": 1, "spec_key": 1},
+        )
+        for doc in docs:
+            uri = doc["uri"]
+            counts[uri] = counts.get(uri, 0) + 1
+            if doc.get("checksum") != checksums[uri] or doc.get("spec_key") != spec_key:
+                stale.add(uri)
+        unindexed = {uri: checksum for uri, checksum in checksums.items() if uri not in counts}
+        empty = self._empty_uris.matching(index_name, unindexed, spec_key)
+        return {
+            uri: (None if uri in stale else counts[uri]) if uri in counts else (0 if uri in empty else None)
+            for uri in checksums
+        }
 
     def ensure_search_indexes(self) -> str:
         try:
+            self._db.create_index([("index_name", 1), ("chunk_id", 1)], name="wks_chunk_id")
+            self._postings.ensure_indexes()
+            self._trigrams.ensure_indexes()
+            self._empty_uris.ensure_indexes()
+            self._generations.ensure_indexes()
             return str(self._db.create_index([("text", "text")], name=_SEARCH_INDEX_NAME))
         except Exception as exc:
             raise RuntimeError(f"Failed to create text search index {_SEARCH_INDEX_NAME}: {exc}") from exc
 
-    def get_all(self, index_name: str) -> list[_Chunk]:
-        return [
-            _Chunk(
-                text=doc["text"],
-                uri=doc["uri"],
-                chunk_index=doc["chunk_index"],
-                tokens=doc["tokens"],
-                is_continuation=doc["is_continuation"],
+    def generation(self, index_name: str) -> int:
+        return self._generations.get(index_name)
+
+    def posting_stats(self, index_name: str) -> _PostingStats | None:
+        return self._postings.stats(index_name)
+
+    def postings(self, index_name: str, terms: list[str]) -> dict[str, list[tuple[int, int, int]]]:
+        return self._postings.postings(index_name, terms)
+
+    def has_postings(self, index_name: str) -> bool:
+        stats = self._postings.stats(index_name)
+        return stats is not None and stats.chunk_count == self.count(index_name)
+
+    def has_trigrams(self, index_name: str) -> bool:
+        return self._db.count_documents({"index_name": index_name, "trigrams": {"$ne": True}}) == 0
+
+    def rebuild_postings(self, index_name: str) -> int:
+        self._postings.clear(index_name)
+        self._trigrams.clear(index_name)
+        docs = list(self._db.find({"index_name": index_name}, {"_id": 1, "uri": 1, "text": 1}))
+        self._generations.bump(index_name)
+        if not docs:
+            return 0
+        chunk_terms = [tokenize(doc["text"]) for doc in docs]
+        first_id = self._postings.allocate_chunk_ids(index_name, len(docs))
+        batch: list[BulkWriteOp] = []
+        for i, doc in enumerate(docs):
+            doc["chunk_id"] = first_id + i
+            doc["length"] = len(chunk_terms[i])
+            batch.append(
+                BulkWriteOp.update(
+                    {"_id": doc["_id"]},
+                    {"$set": {"chunk_id": doc["chunk_id"], "length": doc["length"], "trigrams": True}},
+                )
             )
-            for doc in self._db.find({"index_name": index_name}, {"_id": 0})
+            if len(batch) >= _REBUILD_BATCH_SIZE:
+                self._db.bulk_write(batch, ordered=False)
+                batch = []
+        self._db.bulk_write(batch, ordered=False)
+        self._postings.add(index_name, docs, chunk_terms)
+        self._trigrams.add(index_name, docs)
+        return len(docs)
+
+    def get_by_ids(self, index_name: str, chunk_ids: list[int]) -> dict[int, _Chunk]:
+        if not chunk_ids:
+            return {}
+        docs = self._db.find({"index_name": index_name, "chunk_id": {"$in": chunk_ids}}, {"_id": 0})
+        return {int(doc["chunk_id"]): _chunk_from_doc(doc) for doc in docs}
+
+    def search_trigrams(
+        self,
+        index_name: str,
+        query: str,
+        limit: int,
+        min_similarity: float = _FUZZY_MIN_SIMILARITY,
+        allowed_ids: np.ndarray | None = None,
+    ) -> tuple[list[_Chunk], list[float]]:
+        chunk_ids, scores = self._trigrams.search(index_name, query, limit, min_similarity, allowed_ids)
+        by_id = self.get_by_ids(index_name, chunk_ids.tolist())
+        ranked = [
+            (by_id[chunk_id], score)
+            for chunk_id, score in zip(chunk_ids.tolist(), scores.tolist(), strict=True)
+            if chunk_id in by_id
         ]
+        return [chunk for chunk, _ in ranked], [score for _, score in ranked]
 
-    def search_text(self, index_name: str, query: str, limit: int) -> list[_Chunk]:
+    def get_all(self, index_name: str) -> list[_Chunk]:
+        return [_chunk_from_doc(doc) for doc in self._db.find({"index_name": index_name}, {"_id": 0})]
+
+    def search_text(self, index_name: str, query: str, limit: int, has_trigrams: bool | None = None) -> list[_Chunk]:
         if limit <= 0:
             return []
         try:
@@ -62,13 +166,17 @@ class _ChunkStore:
                     "text": 1,
                     "tokens": 1,
                     "is_continuation": 1,
+                    "canonical_uri": 1,
+                    "text_hash": 1,
                     "score": {"$meta": "textScore"},
                 },
             )
             docs = list(cursor.sort([("score", {"$meta": "textScore"})]).limit(limit))
             return [_chunk_from_doc(doc) for doc in docs]
         except Exception as exc:
-            return self._search_text_fallback(index_name, query, limit, exc)
+            if has_trigrams is None:
+                has_trigrams = self.has_trigrams(index_name)
+            return self._search_text_fallback(index_name, query, limit, has_trigrams, exc)
 
     def count(self, index_name: str | None = None) -> int:
         filt = {"index_name": index_name} if index_name else None
@@ -77,6 +185,15 @@ class _ChunkStore:
     def document_count(self, index_name: str) -> int:
         return len(self._db.distinct("uri", {"index_name": index_name}))
 
+    def chunk_uris(self, index_name: str) -> list[tuple[str, int]]:
+        docs = self._db.find(
+            {"index_name": index_name, "chunk_id": {"$exists": True}},
+            {"_id": 0, "uri": 1, "canonical_uri": 1, "chunk_id": 1},
+        )
+        return sorted(
+            ((doc.get("canonical_uri") or doc["uri"], int(doc["chunk_id"])) for doc in docs), key=lambda row: row[1]
+        )
+
     def uris(self, index_name: str, limit: int | None = None) -> list[str]:
         seen: set[str] = set()
         for doc in self._db.find({"index_name": index_name}, {"uri": 1, "_id": 0}):
@@ -87,9 +204,20 @@ class _ChunkStore:
 
     def clear(self, index_name: str | None = None) -> int:
         filt = {"index_name": index_name} if index_name else {}
-        return self._db.delete_many(filt)
+        index_names = [index_name] if index_name else list(self._db.distinct("index_name", filt))
+        self._postings.clear(index_name)
+        self._trigrams.clear(index_name)
+        self._empty_uris.clear(index_name)
+        deleted = self._db.delete_many(filt)
+        for name in index_names:
+            self._generations.bump(name)
+        return deleted
 
-    def _search_text_fallback(self, index_name: str, query: str, limit: int, search_error: Exception) -> list[_Chunk]:
+    def _search_text_fallback(
+        self, index_name: str, query: str, limit: int, has_trigrams: bool, search_error: Exception
+    ) -> list[_Chunk]:
+        if has_trigrams:
+            return self._search_trigram_substrings(index_name, query, limit)
         total_chunks = self.count(index_name)
         if total_chunks > _FALLBACK_TEXT_SCAN_LIMIT:
             raise RuntimeError(
@@ -97,7 +225,7 @@ class _ChunkStore:
                 f"({total_chunks} chunks exceeds fallback scan limit {_FALLBACK_TEXT_SCAN_LIMIT}). "
                 "Run: wksc index optimize"
             ) from search_error
-        terms = _query_terms(query)
+        terms = tokenize(query)
         if not terms:
             return []
         pattern = "|".join(re.escape(term) for term in terms)
@@ -107,9 +235,47 @@ class _ChunkStore:
         ).limit(limit)
         return [_chunk_from_doc(doc) for doc in docs]
 
+    def _search_trigram_substrings(self, index_name: str, query: str, limit: int) -> list[_Chunk]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+        candidate_limit = limit
+        while True:
+            candidates = self.search_trigrams(index_name, query, candidate_limit, min_similarity=1.0)[0]
+            matches = [chunk for chunk in candidates if pattern.search(chunk.text)]
+            if len(matches) >= limit or len(candidates) < candidate_limit:
+                return matches[:limit]
+            candidate_limit *= 4
+
+
+def _chunk_docs(
+    index_name: str, checksum: str, spec_key: str, chunks: list[_Chunk], chunk_terms: list[list[str]]
+) -> list[dict[str, Any]]:
+    dedupe_keys = [_chunk_dedupe_keys(c.uri, c.text) for c in chunks]
+    return [
+        {
+            "index_name": index_name,
+            "uri": c.uri,
+            "checksum": checksum,
+            "spec_key": spec_key,
+            "chunk_index": c.chunk_index,
+            "length": len(chunk_terms[i]),
+            "text": c.text,
+            "tokens": c.tokens,
+            "is_continuation": c.is_continuation,
+            "canonical_uri": dedupe_keys[i][0],
+            "text_hash": dedupe_keys[i][1],
+            "trigrams": True,
+        }
+        for i, c in enumerate(chunks)
+    ]
+
 
-def _query_terms(query: str) -> list[str]:
-    return [term.lower() for term in _TERM_RE.findall(query) if term]
+def _chunk_key(doc: dict[str, Any]) -> tuple[str, int, str] | None:
+    if "_id" in doc and ("chunk_id" not in doc or "text_hash" not in doc):
+        return None
+    return (doc["uri"], int(doc["chunk_index"]), doc["text_hash"])
 
 
 def _chunk_from_doc(doc: dict[str, Any]) -> _Chunk:
@@ -119,4 +285,6 @@ def _chunk_from_doc(doc: dict[str, Any]) -> _Chunk:
         chunk_index=doc["chunk_index"],
         tokens=doc["tokens"],
         is_continuation=doc.get("is_continuation", False),
+        canonical_uri=doc.get("canonical_uri"),
+        text_hash=doc.get("text_hash"),
     )
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+_CENTROID_GROUP_ROWS = 16
+_CENTROID_BLOCK_ROWS = 65536
+
+
+@dataclass(frozen=True, slots=True)
+class _DocumentCentroids:
+    vectors: np.ndarray
+    doc_starts: np.ndarray
+    doc_uris: np.ndarray
+    order: np.ndarray
+    offsets: np.ndarray
+
+    @property
+    def document_count(self) -> int:
+        return len(self.doc_uris)
+
+    def top_documents(
+        self,
+        query: np.ndarray,
+        count: int,
+        allowed_uris: np.ndarray | None = None,
+    ) -> np.ndarray:
+        if not self.document_count:
+            return np.empty(0, dtype=np.int64)
+        group_scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        doc_scores = np.maximum.reduceat(group_scores, self.doc_starts).astype(np.float64)
+        if allowed_uris is not None:
+            doc_scores[~np.isin(self.doc_uris, allowed_uris)] = -np.inf
+        count = min(count, int(np.count_nonzero(np.isfinite(doc_scores))))
+        if count <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-doc_scores, count - 1)[:count] if count < len(doc_scores) else np.arange(count)
+        return self.doc_uris[top[np.lexsort((top, -doc_scores[top]))]]
+
+    def rows(self, uri_ids: np.ndarray) -> np.ndarray:
+        if not len(uri_ids):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(
+            np.concatenate([self.order[self.offsets[uri_id] : self.offsets[uri_id + 1]] for uri_id in uri_ids.tolist()])
+        )
+
+
+def _build_document_centroids(
+    matrix: np.ndarray,
+    uri_ids: np.ndarray,
+    chunk_indexes: np.ndarray,
+    uri_count: int,
+    live_rows: np.ndarray | None = None,
+) -> _DocumentCentroids:
+    row_count = len(uri_ids)
+    order = np.lexsort((chunk_indexes, uri_ids))
+    sorted_uris = uri_ids[order]
+    offsets = np.searchsorted(sorted_uris, np.arange(uri_count + 1))
+    position = np.arange(row_count) - offsets[sorted_uris]
+    group_starts = np.flatnonzero(position % _CENTROID_GROUP_ROWS == 0)
+    bounds = np.append(group_starts, row_count)
+    vectors = np.empty((len(group_starts), matrix.shape[1]), dtype=np.float32)
+    group = 0
+    while group < len(group_starts):
+        end = int(np.searchsorted(group_starts, group_starts[group] + _CENTROID_BLOCK_ROWS, side="right"))
+        end = max(end, group + 1)
+        block_rows = order[bounds[group] : bounds[end]]
+        block = np.asarray(matrix[block_rows if live_rows is None else live_rows[block_rows]], dtype=np.float32)
+        vectors[group:end] = np.add.reduceat(block, bounds[group:end] - bounds[group], axis=0)
+        group = end
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    vectors /= norms
+    group_uris = sorted_uris[group_starts]
+    doc_starts = np.flatnonzero(np.diff(group_uris, prepend=-1) != 0)
+    return _DocumentCentroids(
+        vectors=vectors,
+        doc_starts=doc_starts,
+        doc_uris=group_uris[doc_starts].astype(np.int64),
+        order=order,
+        offsets=offsets,
+    )
@@ -0,0 +1,106 @@
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+import numpy as np
+
+_SQL_BATCH = 500
+_EVICT_TARGET_FRACTION = 0.9
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, mode, text_hash)
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO stats (id, total_bytes) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS embeddings_added AFTER INSERT ON embeddings BEGIN
+    UPDATE stats SET total_bytes = total_bytes + length(NEW.vector) WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_removed AFTER DELETE ON embeddings BEGIN
+    UPDATE stats SET total_bytes = total_bytes - length(OLD.vector) WHERE id = 0;
+END;
+"""
+_READY_PATHS: set[Path] = set()
+
+
+class _EmbeddingCache:
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def get_many(self, model_name: str, mode: str, text_hashes: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        if not text_hashes:
+            return found
+        with self._connect() as conn:
+            for start in range(0, len(text_hashes), _SQL_BATCH):
+                batch = text_hashes[start : start + _SQL_BATCH]
+                rows = conn.execute(
+                    "SELECT text_hash, vector FROM embeddings WHERE model = ? AND mode = ? "
+                    f"AND text_hash IN ({', '.join('?' * len(batch))})",
+                    (model_name, mode, *batch),
+                )
+                found.update((text_hash, np.frombuffer(vector, dtype="<f4")) for text_hash, vector in rows)
+            if found:
+                now = time.time_ns()
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND mode = ? AND text_hash = ?",
+                    [(now, model_name, mode, text_hash) for text_hash in found],
+                )
+        return found
+
+    def put_many(self, model_name: str, mode: str, vectors: dict[str, np.ndarray]) -> None:
+        if not vectors:
+            return
+        now = time.time_ns()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, mode, text_hash, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (model_name, mode, text_hash, np.ascontiguousarray(vector, dtype="<f4").tobytes(), now)
+                    for text_hash, vector in vectors.items()
+                ],
+            )
+            self._evict(conn)
+
+    def stats(self) -> dict[str, int]:
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total_bytes = conn.execute("SELECT total_bytes FROM stats WHERE id = 0").fetchone()[0]
+        return {"entries": int(entries), "bytes": int(total_bytes)}
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT total_bytes FROM stats WHERE id = 0").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * _EVICT_TARGET_FRACTION)
+        while total > target:
+            count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count == 0:
+                return
+            average = max(total // count, 1)
+            conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (max((total - target) // average, 1),),
+            )
+            total = conn.execute("SELECT total_bytes FROM stats WHERE id = 0").fetchone()[0]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _READY_PATHS.discard(self.path)
+        with closing(sqlite3.connect(self.path, timeout=30.0)) as conn:
+            if self.path not in _READY_PATHS:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                _READY_PATHS.add(self.path)
+            with conn:
+                yield conn
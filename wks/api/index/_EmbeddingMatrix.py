@@ -0,0 +1,336 @@
+import fcntl
+import json
+import re
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import numpy as np
+
+from ..config.WKSConfig import WKSConfig
+from ._collection_fingerprint import _CollectionFingerprint
+from ._IvfLists import _assign_lists
+
+_META_FILE = "meta.json"
+_ROWS_PREFIX = "rows-"
+_ROWS_SUFFIX = ".jsonl"
+_MATRIX_PREFIX = "matrix-"
+_MATRIX_SUFFIX = ".f32"
+_CENTROIDS_PREFIX = "centroids-"
+_CENTROIDS_SUFFIX = ".npy"
+_LOCK_FILE = ".lock"
+_WRITE_BLOCK_ROWS = 65536
+_COMPACT_DEAD_FRACTION = 0.25
+_SLUG_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass(frozen=True, slots=True)
+class _MatrixSnapshot:
+    fingerprint: _CollectionFingerprint
+    rows: list[tuple[str, int]]
+    matrix: np.ndarray
+    version: int | None
+    centroids: np.ndarray | None = None
+    lists: np.ndarray | None = None
+    live_rows: np.ndarray | None = None
+
+
+class _EmbeddingMatrix:
+    def __init__(self, index_name: str, embedding_model: str, home_dir: Path | None = None):
+        root = home_dir if home_dir is not None else WKSConfig.get_home_dir()
+        self.directory = root / "index" / _slug(index_name) / _slug(embedding_model)
+
+    def version(self) -> int | None:
+        try:
+            return (self.directory / _META_FILE).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def fingerprint(self) -> _CollectionFingerprint | None:
+        meta = self._read_meta()
+        return _CollectionFingerprint(**meta["fingerprint"]) if meta is not None else None
+
+    def has_centroids(self) -> bool:
+        meta = self._read_meta()
+        return meta is not None and self._read_centroids(meta) is not None
+
+    def load(self) -> _MatrixSnapshot | None:
+        version = self.version()
+        meta = self._read_meta()
+        if meta is None or version is None:
+            return None
+        rows = self._read_rows(meta)
+        if rows is None:
+            return None
+        live = [i for i, row in enumerate(rows) if row is not None]
+        centroids, lists = _live_lists(rows, live, self._read_centroids(meta))
+        matrix = self._open_matrix(meta, len(rows))
+        if matrix is None:
+            return None
+        return _MatrixSnapshot(
+            fingerprint=_CollectionFingerprint(**meta["fingerprint"]),
+            rows=[(str(rows[i][0]), int(rows[i][1])) for i in live],
+            matrix=matrix,
+            version=version,
+            centroids=centroids,
+            lists=lists,
+            live_rows=np.asarray(live, dtype=np.int64) if len(live) != len(rows) else None,
+        )
+
+    def write(
+        self,
+        fingerprint: _CollectionFingerprint,
+        rows: list[tuple[str, int]],
+        matrix: np.ndarray,
+        centroids: np.ndarray | None = None,
+        live_rows: np.ndarray | None = None,
+    ) -> None:
+        selected = matrix.shape[0] if live_rows is None else len(live_rows)
+        if matrix.ndim != 2 or selected != len(rows):
+            raise ValueError(f"matrix rows must match row keys (shape={matrix.shape}, rows={len(rows)})")
+        with self._lock():
+            self._write(fingerprint, rows, matrix, centroids, live_rows)
+
+    def write_centroids(self, centroids: np.ndarray) -> bool:
+        with self._lock():
+            snapshot = self.load()
+            if snapshot is None:
+                return False
+            self._write(snapshot.fingerprint, snapshot.rows, snapshot.matrix, centroids, snapshot.live_rows)
+        return True
+
+    def replace_uri(
+        self,
+        previous: _CollectionFingerprint,
+        fingerprint: _CollectionFingerprint,
+        uri: str,
+        rows: list[tuple[str, int]],
+        matrix: np.ndarray,
+    ) -> None:
+        self.replace_uris(previous, fingerprint, {uri}, rows, matrix)
+
+    def replace_uris(
+        self,
+        previous: _CollectionFingerprint,
+        fingerprint: _CollectionFingerprint,
+        uris: set[str],
+        rows: list[tuple[str, int]],
+        matrix: np.ndarray,
+    ) -> None:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        with self._lock():
+            meta = self._read_meta()
+            if meta is None or meta["fingerprint"] != asdict(previous) or not _fits(meta, rows, matrix):
+                self._invalidate()
+                return
+            try:
+                self._append(meta, fingerprint, uris, rows, matrix)
+            except OSError:
+                self._invalidate()
+                return
+            if _dead_fraction(int(meta["row_count"]), fingerprint.count) > _COMPACT_DEAD_FRACTION:
+                self._compact()
+
+    def invalidate(self) -> None:
+        if not self.directory.is_dir():
+            return
+        with self._lock():
+            self._invalidate()
+
+    def _write(
+        self,
+        fingerprint: _CollectionFingerprint,
+        rows: list[tuple[str, int]],
+        matrix: np.ndarray,
+        centroids: np.ndarray | None,
+        live_rows: np.ndarray | None,
+    ) -> None:
+        centroids, centroids_name = self._resolve_centroids(centroids, bool(rows), int(matrix.shape[1]))
+        matrix_name = f"{_MATRIX_PREFIX}{uuid4().hex}{_MATRIX_SUFFIX}"
+        with (self.directory / matrix_name).open("wb") as handle:
+            for block in _blocks(matrix, live_rows):
+                block.tofile(handle)
+        row_entries: list[list[Any]] = [[uri, chunk_index] for uri, chunk_index in rows]
+        if centroids is not None:
+            if centroids_name is None:
+                centroids_name = f"{_CENTROIDS_PREFIX}{uuid4().hex}{_CENTROIDS_SUFFIX}"
+                np.save(self.directory / centroids_name, np.asarray(centroids, dtype=np.float32))
+            lists = np.concatenate([_assign_lists(block, centroids) for block in _blocks(matrix, live_rows)])
+            _append_list_ids(row_entries, lists)
+        rows_name = f"{_ROWS_PREFIX}{uuid4().hex}{_ROWS_SUFFIX}"
+        with (self.directory / rows_name).open("wb") as handle:
+            for start in range(0, len(row_entries), _WRITE_BLOCK_ROWS):
+                handle.write(_log_line(set(), row_entries[start : start + _WRITE_BLOCK_ROWS]))
+            log_size = handle.tell()
+        self._write_meta(
+            {
+                "fingerprint": asdict(fingerprint),
+                "dim": int(matrix.shape[1]),
+                "matrix": matrix_name,
+                "centroids": centroids_name,
+                "rows": rows_name,
+                "row_count": len(row_entries),
+                "log_size": log_size,
+            }
+        )
+        self._remove_stale_files(_MATRIX_PREFIX, _MATRIX_SUFFIX, keep=matrix_name)
+        self._remove_stale_files(_CENTROIDS_PREFIX, _CENTROIDS_SUFFIX, keep=centroids_name)
+        self._remove_stale_files(_ROWS_PREFIX, _ROWS_SUFFIX, keep=rows_name)
+
+    def _resolve_centroids(
+        self, centroids: np.ndarray | None, has_rows: bool, dim: int
+    ) -> tuple[np.ndarray | None, str | None]:
+        centroids_name = None
+        previous = self._read_meta()
+        if centroids is None and previous is not None:
+            centroids = self._read_centroids(previous)
+            centroids_name = previous.get("centroids") if centroids is not None else None
+        if centroids is not None and (not has_rows or centroids.shape[1] != dim):
+            return None, None
+        return centroids, centroids_name
+
+    def _append(
+        self,
+        meta: dict[str, Any],
+        fingerprint: _CollectionFingerprint,
+        uris: set[str],
+        rows: list[tuple[str, int]],
+        matrix: np.ndarray,
+    ) -> None:
+        row_count = int(meta["row_count"])
+        with (self.directory / meta["matrix"]).open("r+b") as handle:
+            handle.seek(row_count * int(meta["dim"]) * np.dtype(np.float32).itemsize)
+            if rows:
+                handle.write(matrix.tobytes())
+            handle.truncate()
+        new_entries: list[list[Any]] = [[row_uri, chunk_index] for row_uri, chunk_index in rows]
+        centroids = self._read_centroids(meta)
+        if centroids is not None and rows:
+            _append_list_ids(new_entries, _assign_lists(matrix, centroids))
+        line = _log_line(uris, new_entries)
+        with (self.directory / meta["rows"]).open("r+b") as handle:
+            handle.seek(int(meta["log_size"]))
+            handle.write(line)
+            handle.truncate()
+        meta["fingerprint"] = asdict(fingerprint)
+        meta["row_count"] = row_count + len(new_entries)
+        meta["log_size"] = int(meta["log_size"]) + len(line)
+        self._write_meta(meta)
+
+    def _compact(self) -> None:
+        snapshot = self.load()
+        if snapshot is None:
+            self._invalidate()
+            return
+        self._write(snapshot.fingerprint, snapshot.rows, snapshot.matrix, None, snapshot.live_rows)
+
+    def _invalidate(self) -> None:
+        (self.directory / _META_FILE).unlink(missing_ok=True)
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with (self.directory / _LOCK_FILE).open("a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> dict[str, Any] | None:
+        try:
+            return json.loads((self.directory / _META_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _read_rows(self, meta: dict[str, Any]) -> list[Any] | None:
+        try:
+            with (self.directory / meta["rows"]).open("rb") as handle:
+                data = handle.read(int(meta["log_size"]))
+            rows = _replay_log(data)
+        except (OSError, ValueError):
+            return None
+        return rows if len(rows) == int(meta["row_count"]) else None
+
+    def _read_centroids(self, meta: dict[str, Any]) -> np.ndarray | None:
+        name = meta.get("centroids")
+        if name is None:
+            return None
+        try:
+            return np.load(self.directory / name)
+        except (OSError, ValueError):
+            return None
+
+    def _open_matrix(self, meta: dict[str, Any], row_count: int) -> np.ndarray | None:
+        dim = int(meta["dim"])
+        if not row_count:
+            return np.empty((0, dim), dtype=np.float32)
+        try:
+            return np.memmap(self.directory / meta["matrix"], dtype=np.float32, mode="r", shape=(row_count, dim))
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        tmp_path = self.directory / f".{_META_FILE}.{uuid4().hex}"
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        tmp_path.replace(self.directory / _META_FILE)
+
+    def _remove_stale_files(self, prefix: str, suffix: str, keep: str | None) -> None:
+        for path in self.directory.glob(f"{prefix}*{suffix}"):
+            if path.name != keep:
+                path.unlink(missing_ok=True)
+
+
+def _live_lists(
+    rows: list[Any], live: list[int], centroids: np.ndarray | None
+) -> tuple[np.ndarray | None, np.ndarray | None]:
+    if centroids is None or not all(len(rows[i]) > 2 for i in live):
+        return None, None
+    return centroids, np.asarray([rows[i][2] for i in live], dtype=np.int32)
+
+
+def _append_list_ids(entries: list[list[Any]], lists: np.ndarray) -> None:
+    for entry, list_id in zip(entries, lists.tolist(), strict=True):
+        entry.append(list_id)
+
+
+def _fits(meta: dict[str, Any], rows: list[tuple[str, int]], matrix: np.ndarray) -> bool:
+    return not rows or (matrix.ndim == 2 and matrix.shape[1] == int(meta["dim"]))
+
+
+def _dead_fraction(row_count: int, live_count: int) -> float:
+    return (row_count - live_count) / row_count if row_count else 0.0
+
+
+def _log_line(dropped_uris: set[str], entries: list[list[Any]]) -> bytes:
+    return (json.dumps({"drop": sorted(dropped_uris), "add": entries}) + "\n").encode("utf-8")
+
+
+def _replay_log(data: bytes) -> list[Any]:
+    rows: list[Any] = []
+    positions: dict[str, list[int]] = defaultdict(list)
+    for line in data.splitlines():
+        entry = json.loads(line)
+        for uri in entry["drop"]:
+            for position in positions.pop(uri, ()):
+                rows[position] = None
+        for row in entry["add"]:
+            positions[row[0]].append(len(rows))
+            rows.append(row)
+    return rows
+
+
+def _blocks(matrix: np.ndarray, live_rows: np.ndarray | None) -> Iterator[np.ndarray]:
+    count = matrix.shape[0] if live_rows is None else len(live_rows)
+    for start in range(0, count, _WRITE_BLOCK_ROWS):
+        stop = start + _WRITE_BLOCK_ROWS
+        selected = matrix[start:stop] if live_rows is None else matrix[live_rows[start:stop]]
+        yield np.ascontiguousarray(selected, dtype=np.float32)
+
+
+def _slug(value: str) -> str:
+    return _SLUG_RE.sub("_", value) or "_"
@@ -1,16 +1,38 @@
+from collections import Counter, defaultdict
 from typing import Any
 
+import numpy as np
+
+from ..database.BulkWriteCounts import BulkWriteCounts
+from ..database.BulkWriteOp import BulkWriteOp
+from ._BulkDelta import _BulkDelta
+from ._chunk_dedupe_keys import _chunk_dedupe_keys
+from ._collection_fingerprint import _advance_fingerprint, _collection_fingerprint, _CollectionFingerprint
+from ._embedding_codec import _decode_embeddings, _encode_embedding
+from ._EmbeddingMatrix import _EmbeddingMatrix
+from ._IndexGenerations import _IndexGenerations
+
+_PACK_BATCH_SIZE = 1000
+_CHUNK_KEY_INDEX_NAME = "wks_embeddings_chunk_key"
+_NEWEST_INDEX_NAME = "wks_embeddings_newest"
+
 
 class _EmbeddingStore:
     def __init__(self, db: Any):
         self._db = db
+        self._generations = _IndexGenerations(db)
 
-    def replace_index_model(self, index_name: str, embedding_model: str, docs: list[dict[str, Any]]) -> int:
-        self._db.delete_many({"index_name": index_name, "embedding_model": embedding_model})
-        if not docs:
-            return 0
-        self._db.insert_many(docs)
-        return len(docs)
+    def generation(self, index_name: str, embedding_model: str) -> int:
+        return self._generations.get(index_name, embedding_model)
+
+    def ensure_indexes(self) -> str:
+        self._db.create_index([("index_name", 1), ("embedding_model", 1), ("_id", -1)], name=_NEWEST_INDEX_NAME)
+        return str(
+            self._db.create_index(
+                [("index_name", 1), ("embedding_model", 1), ("uri", 1), ("chunk_index", 1)],
+                name=_CHUNK_KEY_INDEX_NAME,
+            )
+        )
 
     def replace_uri(
         self,
@@ -18,17 +40,189 @@ class _EmbeddingStore:
         embedding_model: str,
         uri: str,
         docs: list[dict[str, Any]],
-    ) -> int:
-        self._db.delete_many({"index_name": index_name, "embedding_model": embedding_model, "uri": uri})
+    ) -> BulkWriteCounts:
+        return self.replace_uris(index_name, embedding_model, {uri}, docs)
+
+    def replace_uris(
+        self,
+        index_name: str,
+        embedding_model: str,
+        uris: set[str],
+        docs: list[dict[str, Any]],
+    ) -> BulkWriteCounts:
+        collection_filter = _model_filter(index_name, embedding_model)
+        previous = _collection_fingerprint(self._db, collection_filter)
+        stored = list(self._db.find({**collection_filter, "uri": {"$in": sorted(uris)}}))
+        delta = _BulkDelta.plan(stored, docs, _embedding_key)
+        counts = delta.apply(self._db)
+        if not counts.changed:
+            return counts
+        if counts.inserted or counts.deleted or any("embedding" in changed for _, changed in delta.updates):
+            fingerprint = _advance_fingerprint(
+                self._db,
+                collection_filter,
+                previous,
+                [doc["_id"] for doc in delta.inserts],
+                [doc["_id"] for doc in delta.deletes],
+            )
+            _replace_matrix_rows(_EmbeddingMatrix(index_name, embedding_model), previous, fingerprint, uris, docs)
+        self._generations.bump(index_name, embedding_model)
+        return counts
+
+    def update_index_model(
+        self,
+        index_name: str,
+        embedding_model: str,
+        removed_ids: list[Any],
+        docs: list[dict[str, Any]],
+    ) -> None:
+        collection_filter = _model_filter(index_name, embedding_model)
+        previous = _collection_fingerprint(self._db, collection_filter)
+        matrix_file = _EmbeddingMatrix(index_name, embedding_model)
+        incremental = matrix_file.fingerprint() == previous
+        if incremental and not removed_ids and not docs:
+            return
+        uris = self._write_model_docs(removed_ids, docs)
+        fingerprint = _advance_fingerprint(
+            self._db, collection_filter, previous, [doc["_id"] for doc in docs], removed_ids
+        )
+        try:
+            if incremental:
+                uri_docs = list(
+                    self._db.find(
+                        {**collection_filter, "uri": {"$in": sorted(uris)}},
+                        {
+                            "_id": 0,
+                            "uri": 1,
+                            "chunk_index": 1,
+                            "embedding": 1,
+                            "embedding_dtype": 1,
+                            "embedding_dim": 1,
+                        },
+                    )
+                )
+                matrix_file.replace_uris(previous, fingerprint, uris, _row_keys(uri_docs), _decode_embeddings(uri_docs))
+            else:
+                all_docs, matrix = self.get_all(index_name, embedding_model)
+                matrix_file.write(fingerprint, _row_keys(all_docs), matrix)
+        except OSError:
+            matrix_file.invalidate()
+        self._generations.bump(index_name, embedding_model)
+
+    def _write_model_docs(self, removed_ids: list[Any], docs: list[dict[str, Any]]) -> set[str]:
+        uris = {str(doc["uri"]) for doc in docs}
+        if removed_ids:
+            uris.update(str(doc["uri"]) for doc in self._db.find({"_id": {"$in": removed_ids}}, {"_id": 0, "uri": 1}))
+            self._db.delete_many({"_id": {"$in": removed_ids}})
+        if docs:
+            self._db.insert_many(docs)
+        return uris
+
+    def count_uris(self, index_name: str, embedding_model: str, uris: list[str]) -> dict[str, int]:
+        docs = self._db.find({**_model_filter(index_name, embedding_model), "uri": {"$in": uris}}, {"_id": 0, "uri": 1})
+        return dict(Counter(str(doc["uri"]) for doc in docs))
+
+    def get_chunk_hashes(self, index_name: str, embedding_model: str) -> list[dict[str, Any]]:
+        collection_filter = _model_filter(index_name, embedding_model)
+        projection = {"_id": 1, "uri": 1, "chunk_index": 1, "embedding_mode": 1, "text_hash": 1}
+        docs = list(self._db.find({**collection_filter, "text_hash": {"$ne": None}}, projection))
+        for doc in self._db.find({**collection_filter, "text_hash": None}, {**projection, "text": 1}):
+            doc["text_hash"] = _chunk_dedupe_keys(str(doc["uri"]), str(doc.pop("text", "")))[1]
+            docs.append(doc)
+        return docs
+
+    def get_embeddings(self, doc_ids: list[Any]) -> dict[Any, np.ndarray]:
+        if not doc_ids:
+            return {}
+        docs = list(
+            self._db.find(
+                {"_id": {"$in": doc_ids}}, {"_id": 1, "embedding": 1, "embedding_dtype": 1, "embedding_dim": 1}
+            )
+        )
         if not docs:
-            return 0
-        self._db.insert_many(docs)
-        return len(docs)
+            return {}
+        return dict(zip([doc["_id"] for doc in docs], _decode_embeddings(docs), strict=True))
+
+    def get_chunks(
+        self,
+        index_name: str,
+        embedding_model: str,
+        keys: list[tuple[str, int]],
+    ) -> dict[tuple[str, int], dict[str, Any]]:
+        if not keys:
+            return {}
+        chunk_indexes: dict[str, set[int]] = defaultdict(set)
+        for uri, chunk_index in keys:
+            chunk_indexes[uri].add(chunk_index)
+        docs = self._db.find(
+            {
+                **_model_filter(index_name, embedding_model),
+                "$or": [
+                    {"uri": uri, "chunk_index": {"$in": sorted(indexes)}}
+                    for uri, indexes in sorted(chunk_indexes.items())
+                ],
+            },
+            {"_id": 0, "uri": 1, "chunk_index": 1, "tokens": 1, "text": 1, "canonical_uri": 1, "text_hash": 1},
+        )
+        return {(str(doc["uri"]), int(doc["chunk_index"])): doc for doc in docs}
 
-    def get_all(self, index_name: str, embedding_model: str) -> list[dict[str, Any]]:
-        return list(
+    def get_all(self, index_name: str, embedding_model: str) -> tuple[list[dict[str, Any]], np.ndarray]:
+        docs = list(
             self._db.find(
-                {"index_name": index_name, "embedding_model": embedding_model},
-                {"_id": 0},
+                _model_filter(index_name, embedding_model),
+                {"_id": 0, "uri": 1, "chunk_index": 1, "embedding": 1, "embedding_dtype": 1, "embedding_dim": 1},
             )
         )
+        matrix = _decode_embeddings(docs)
+        for doc in docs:
+            for field in ("embedding", "embedding_dtype", "embedding_dim"):
+                doc.pop(field, None)
+        return docs, matrix
+
+    def pack_legacy_embeddings(self) -> dict[str, int]:
+        legacy = self._db.find(
+            {"embedding_dtype": {"$exists": False}},
+            {"_id": 1, "index_name": 1, "embedding_model": 1, "embedding": 1},
+        )
+        converted: dict[str, int] = {}
+        batch: list[BulkWriteOp] = []
+        for doc in legacy:
+            vector = np.asarray(doc["embedding"], dtype=np.float32)
+            batch.append(BulkWriteOp.update({"_id": doc["_id"]}, {"$set": _encode_embedding(vector)}))
+            key = f"{doc['index_name']}:{doc['embedding_model']}"
+            converted[key] = converted.get(key, 0) + 1
+            if len(batch) >= _PACK_BATCH_SIZE:
+                self._db.bulk_write(batch, ordered=False)
+                batch = []
+        self._db.bulk_write(batch, ordered=False)
+        return converted
+
+
+def _model_filter(index_name: str, embedding_model: str) -> dict[str, Any]:
+    return {"index_name": index_name, "embedding_model": embedding_model}
+
+
+def _replace_matrix_rows(
+    matrix_file: _EmbeddingMatrix,
+    previous: _CollectionFingerprint,
+    fingerprint: _CollectionFingerprint,
+    uris: set[str],
+    docs: list[dict[str, Any]],
+) -> None:
+    try:
+        if previous.count == 0 and docs:
+            matrix_file.write(fingerprint, _row_keys(docs), _decode_embeddings(docs))
+        else:
+            matrix_file.replace_uris(previous, fingerprint, uris, _row_keys(docs), _decode_embeddings(docs))
+    except OSError:
+        matrix_file.invalidate()
+
+
+def _embedding_key(doc: dict[str, Any]) -> tuple[str, int, str, str | None] | None:
+    if "text_hash" not in doc or not isinstance(doc.get("embedding"), bytes):
+        return None
+    return (str(doc["uri"]), int(doc["chunk_index"]), doc["text_hash"], doc.get("embedding_mode"))
+
+
+def _row_keys(docs: list[dict[str, Any]]) -> list[tuple[str, int]]:
+    return [(str(doc["uri"]), int(doc["chunk_index"])) for doc in docs]
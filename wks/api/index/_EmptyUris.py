@@ -0,0 +1,33 @@
+from typing import Any
+
+_EMPTY_URIS_COLLECTION = "index_empty_uris"
+
+
+class _EmptyUris:
+    def __init__(self, db: Any):
+        self._empty = db.get_database()[_EMPTY_URIS_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        self._empty.create_index([("index_name", 1), ("uri", 1)], name="wks_empty_uri", unique=True)
+
+    def matching(self, index_name: str, checksums: dict[str, str], spec_key: str) -> set[str]:
+        if not checksums:
+            return set()
+        docs = self._empty.find(
+            {"index_name": index_name, "uri": {"$in": sorted(checksums)}},
+            {"_id": 0, "uri": 1, "checksum": 1, "spec_key": 1},
+        )
+        return {doc["uri"] for doc in docs if doc["checksum"] == checksums[doc["uri"]] and doc["spec_key"] == spec_key}
+
+    def mark(self, index_name: str, uri: str, checksum: str, spec_key: str) -> None:
+        self._empty.update_one(
+            {"index_name": index_name, "uri": uri},
+            {"$set": {"checksum": checksum, "spec_key": spec_key}},
+            upsert=True,
+        )
+
+    def unmark(self, index_name: str, uri: str) -> None:
+        self._empty.delete_many({"index_name": index_name, "uri": uri})
+
+    def clear(self, index_name: str | None = None) -> None:
+        self._empty.delete_many({"index_name": index_name} if index_name else {})
@@ -0,0 +1,32 @@
+from typing import Any
+
+from pymongo import ReturnDocument
+
+_GENERATIONS_COLLECTION = "index_generations"
+
+
+class _IndexGenerations:
+    def __init__(self, db: Any):
+        self._generations = db.get_database()[_GENERATIONS_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        self._generations.create_index(
+            [("index_name", 1), ("embedding_model", 1)], name="wks_index_generation", unique=True
+        )
+
+    def get(self, index_name: str, embedding_model: str = "") -> int:
+        doc = self._generations.find_one(_key(index_name, embedding_model), {"_id": 0, "generation": 1})
+        return int(doc["generation"]) if doc is not None else 0
+
+    def bump(self, index_name: str, embedding_model: str = "") -> int:
+        doc = self._generations.find_one_and_update(
+            _key(index_name, embedding_model),
+            {"$inc": {"generation": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return int(doc["generation"])
+
+
+def _key(index_name: str, embedding_model: str) -> dict[str, str]:
+    return {"index_name": index_name, "embedding_model": embedding_model}
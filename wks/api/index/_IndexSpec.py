@@ -1,3 +1,4 @@
+import hashlib
 from typing import Literal
 
 from pydantic import BaseModel, model_validator
@@ -11,6 +12,9 @@ class _IndexSpec(BaseModel):
     embedding_model: str | None = None
     embedding_mode: Literal["text", "image_text_combo"] = "text"
     image_text_weight: float | None = None
+    quantization: Literal["none", "float16", "int8"] = "none"
+    scoring_shards: int = 1
+    doc_candidates: int = 0
 
     @model_validator(mode="after")
     def validate_embedding_model(self) -> "_IndexSpec":
@@ -26,3 +30,35 @@ class _IndexSpec(BaseModel):
         elif self.image_text_weight is not None:
             raise ValueError("index.image_text_weight is only valid when embedding_mode is 'image_text_combo'")
         return self
+
+    @model_validator(mode="after")
+    def validate_quantization(self) -> "_IndexSpec":
+        if self.quantization != "none" and self.embedding_model is None:
+            raise ValueError("index.quantization requires embedding_model")
+        return self
+
+    @model_validator(mode="after")
+    def validate_scoring_shards(self) -> "_IndexSpec":
+        if self.scoring_shards < 1:
+            raise ValueError("index.scoring_shards must be >= 1")
+        if self.scoring_shards > 1 and self.embedding_model is None:
+            raise ValueError("index.scoring_shards requires embedding_model")
+        return self
+
+    @model_validator(mode="after")
+    def validate_doc_candidates(self) -> "_IndexSpec":
+        if self.doc_candidates < 0:
+            raise ValueError("index.doc_candidates must be >= 0")
+        if self.doc_candidates > 0 and self.embedding_model is None:
+            raise ValueError("index.doc_candidates requires embedding_model")
+        return self
+
+    def content_key(self) -> str:
+        fields = (
+            self.max_tokens,
+            self.overlap_tokens,
+            self.embedding_model,
+            self.embedding_mode,
+            self.image_text_weight,
+        )
+        return hashlib.sha256(repr(fields).encode()).hexdigest()[:16]
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+_ANN_MIN_ROWS = 100_000
+_ASSIGN_BLOCK_ROWS = 65536
+_TRAIN_ITERATIONS = 10
+_TRAIN_SAMPLE_PER_LIST = 64
+_MAX_LISTS = 4096
+_PROBE_FRACTION = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class _IvfLists:
+    centroids: np.ndarray
+    order: np.ndarray
+    offsets: np.ndarray
+
+    def probe(self, query: np.ndarray, min_rows: int) -> np.ndarray:
+        centroid_scores = self.centroids @ np.asarray(query, dtype=np.float32)
+        ranked_lists = np.argsort(-centroid_scores, kind="stable")
+        sizes = np.diff(self.offsets)[ranked_lists]
+        min_lists = max(1, int(np.ceil(len(ranked_lists) * _PROBE_FRACTION)))
+        covered = int(np.searchsorted(np.cumsum(sizes), min_rows)) + 1
+        selected = ranked_lists[: max(min_lists, covered)]
+        rows = [self.order[self.offsets[list_id] : self.offsets[list_id + 1]] for list_id in selected.tolist()]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(rows))
+
+
+def _build_ivf_lists(centroids: np.ndarray, assignments: np.ndarray) -> _IvfLists:
+    order = np.argsort(assignments, kind="stable")
+    offsets = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+    return _IvfLists(centroids=np.asarray(centroids, dtype=np.float32), order=order, offsets=offsets)
+
+
+def _list_count(row_count: int) -> int:
+    return int(min(_MAX_LISTS, max(1, round(4 * np.sqrt(row_count))), max(row_count, 1)))
+
+
+def _train_centroids(matrix: np.ndarray, list_count: int, seed: int = 0, rows: np.ndarray | None = None) -> np.ndarray:
+    row_count = matrix.shape[0] if rows is None else len(rows)
+    if matrix.ndim != 2 or row_count == 0:
+        raise ValueError(f"matrix must be 2D and non-empty (found shape={matrix.shape})")
+    rng = np.random.default_rng(seed)
+    list_count = min(list_count, row_count)
+    sample_size = min(row_count, list_count * _TRAIN_SAMPLE_PER_LIST)
+    sample_rows = np.sort(rng.choice(row_count, size=sample_size, replace=False))
+    sample = np.asarray(matrix[sample_rows if rows is None else rows[sample_rows]], dtype=np.float32)
+    centroids = sample[rng.choice(sample_size, size=list_count, replace=False)].copy()
+    for _ in range(_TRAIN_ITERATIONS):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=list_count)
+        empty = counts == 0
+        if np.any(empty):
+            sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+def _assign_lists(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], _ASSIGN_BLOCK_ROWS):
+        block = np.asarray(matrix[start : start + _ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
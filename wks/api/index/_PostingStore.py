@@ -0,0 +1,103 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from pymongo import ReturnDocument
+
+_POSTINGS_COLLECTION = "index_postings"
+_STATS_COLLECTION = "index_stats"
+
+
+@dataclass(frozen=True, slots=True)
+class _PostingStats:
+    chunk_count: int
+    total_length: int
+    next_chunk_id: int
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.chunk_count if self.chunk_count > 0 else 0.0
+
+
+class _PostingStore:
+    def __init__(self, db: Any):
+        database = db.get_database()
+        self._postings = database[_POSTINGS_COLLECTION]
+        self._stats = database[_STATS_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        self._postings.create_index([("index_name", 1), ("term", 1)], name="wks_postings_term")
+        self._postings.create_index([("index_name", 1), ("chunk_id", 1)], name="wks_postings_chunk")
+        self._stats.create_index([("index_name", 1)], name="wks_postings_stats", unique=True)
+
+    def allocate_chunk_ids(self, index_name: str, count: int) -> int:
+        doc = self._stats.find_one_and_update(
+            {"index_name": index_name},
+            {"$inc": {"next_chunk_id": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return int(doc["next_chunk_id"]) - count
+
+    def add(self, index_name: str, chunk_docs: list[dict[str, Any]], chunk_terms: list[list[str]]) -> int:
+        if not chunk_docs:
+            return 0
+        postings = [
+            {
+                "index_name": index_name,
+                "term": term,
+                "chunk_id": doc["chunk_id"],
+                "tf": tf,
+                "length": doc["length"],
+            }
+            for doc, terms in zip(chunk_docs, chunk_terms, strict=True)
+            for term, tf in Counter(terms).items()
+        ]
+        if postings:
+            self._postings.insert_many(postings)
+        self._stats.update_one(
+            {"index_name": index_name},
+            {"$inc": {"chunk_count": len(chunk_docs), "total_length": sum(doc["length"] for doc in chunk_docs)}},
+            upsert=True,
+        )
+        return len(postings)
+
+    def remove(self, index_name: str, chunk_docs: list[dict[str, Any]]) -> int:
+        tracked = [doc for doc in chunk_docs if "chunk_id" in doc]
+        if not tracked:
+            return 0
+        deleted = self._postings.delete_many(
+            {"index_name": index_name, "chunk_id": {"$in": [doc["chunk_id"] for doc in tracked]}}
+        ).deleted_count
+        self._stats.update_one(
+            {"index_name": index_name},
+            {"$inc": {"chunk_count": -len(tracked), "total_length": -sum(doc["length"] for doc in tracked)}},
+        )
+        return deleted
+
+    def clear(self, index_name: str | None = None) -> None:
+        filt = {"index_name": index_name} if index_name else {}
+        self._postings.delete_many(filt)
+        self._stats.delete_many(filt)
+
+    def stats(self, index_name: str) -> _PostingStats | None:
+        doc = self._stats.find_one({"index_name": index_name}, {"_id": 0})
+        if doc is None:
+            return None
+        return _PostingStats(
+            chunk_count=int(doc.get("chunk_count", 0)),
+            total_length=int(doc.get("total_length", 0)),
+            next_chunk_id=int(doc.get("next_chunk_id", 0)),
+        )
+
+    def postings(self, index_name: str, terms: list[str]) -> dict[str, list[tuple[int, int, int]]]:
+        result: dict[str, list[tuple[int, int, int]]] = {term: [] for term in terms}
+        if not terms:
+            return result
+        cursor = self._postings.find(
+            {"index_name": index_name, "term": {"$in": terms}},
+            {"_id": 0, "term": 1, "chunk_id": 1, "tf": 1, "length": 1},
+        )
+        for doc in cursor:
+            result[doc["term"]].append((int(doc["chunk_id"]), int(doc["tf"]), int(doc["length"])))
+        return result
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+_QUANTIZE_BLOCK_ROWS = 65536
+_RERANK_CANDIDATES = 300
+
+
+@dataclass(frozen=True, slots=True)
+class _QuantizedMatrix:
+    mode: str
+    values: np.ndarray
+    scales: np.ndarray | None
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+
+def _quantize_matrix(matrix: np.ndarray, mode: str, live_rows: np.ndarray | None = None) -> _QuantizedMatrix:
+    if matrix.ndim != 2:
+        raise ValueError(f"matrix must be 2D (found ndim={matrix.ndim})")
+    shape = (matrix.shape[0] if live_rows is None else len(live_rows), matrix.shape[1])
+    if mode == "float16":
+        values = np.empty(shape, dtype=np.float16)
+        for start in range(0, shape[0], _QUANTIZE_BLOCK_ROWS):
+            values[start : start + _QUANTIZE_BLOCK_ROWS] = _block(matrix, live_rows, start)
+        return _QuantizedMatrix(mode=mode, values=values, scales=None)
+    if mode == "int8":
+        values = np.empty(shape, dtype=np.int8)
+        scales = np.empty(shape[0], dtype=np.float32)
+        for start in range(0, shape[0], _QUANTIZE_BLOCK_ROWS):
+            block = _block(matrix, live_rows, start)
+            block_scales = np.abs(block).max(axis=1, initial=0.0) / 127.0
+            block_scales[block_scales == 0.0] = 1.0
+            values[start : start + len(block)] = np.rint(block / block_scales[:, np.newaxis])
+            scales[start : start + len(block)] = block_scales
+        return _QuantizedMatrix(mode=mode, values=values, scales=scales)
+    raise ValueError(f"Unsupported quantization: {mode}")
+
+
+def _block(matrix: np.ndarray, live_rows: np.ndarray | None, start: int) -> np.ndarray:
+    stop = start + _QUANTIZE_BLOCK_ROWS
+    return np.asarray(matrix[start:stop] if live_rows is None else matrix[live_rows[start:stop]], dtype=np.float32)
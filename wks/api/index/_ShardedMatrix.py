@@ -0,0 +1,162 @@
+import heapq
+import multiprocessing
+import os
+import tempfile
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice, pairwise
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+_SHARD_MIN_ROWS = 1_000_000
+_SPILL_DIR = Path("/dev/shm")
+_WORKER_CACHE_SIZE = 4
+
+_POOLS: dict[int, ProcessPoolExecutor] = {}
+_POOLS_LOCK = Lock()
+_WORKER_MATRICES: dict["_MatrixSource", np.memmap] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class _MatrixSource:
+    path: str
+    offset: int
+    rows: int
+    dim: int
+
+
+class _ShardedMatrix:
+    def __init__(self, matrix: np.ndarray, shard_count: int, live_rows: np.ndarray | None = None):
+        if matrix.ndim != 2:
+            raise ValueError(f"matrix must be 2D (found ndim={matrix.ndim})")
+        if shard_count < 2:
+            raise ValueError(f"shard_count must be at least 2 (found {shard_count})")
+        self.shard_count = shard_count
+        self.source, self.matrix = _shared_source(matrix)
+        if self.matrix is not matrix:
+            weakref.finalize(self, _remove_spill, self.source.path)
+        edges = np.linspace(0, self.source.rows, shard_count + 1).astype(np.int64).tolist()
+        self.bounds = [(start, stop) for start, stop in pairwise(edges) if stop > start]
+        self.live_rows = live_rows
+        self.dead_rows = None if live_rows is None else np.setdiff1d(np.arange(self.source.rows), live_rows)
+
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        boost_rows: np.ndarray | None = None,
+        boost_factors: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        query = np.asarray(query, dtype=np.float32)
+        if boost_rows is not None and self.live_rows is not None:
+            boost_rows = self.live_rows[boost_rows]
+        pool = _pool(self.shard_count)
+        futures = [
+            pool.submit(
+                _score_shard,
+                self.source,
+                start,
+                stop,
+                query,
+                k,
+                *_shard_boosts(boost_rows, boost_factors, start, stop),
+                _shard_rows(self.dead_rows, start, stop),
+            )
+            for start, stop in self.bounds
+        ]
+        rows, scores = _merge_shard_hits([future.result() for future in futures], k)
+        if self.live_rows is None:
+            return rows, scores
+        keep = np.isfinite(scores)
+        return np.searchsorted(self.live_rows, rows[keep]), scores[keep]
+
+
+def _shard_rows(rows: np.ndarray | None, start: int, stop: int) -> np.ndarray | None:
+    if rows is None:
+        return None
+    return rows[(rows >= start) & (rows < stop)] - start
+
+
+def _shard_boosts(
+    boost_rows: np.ndarray | None, boost_factors: np.ndarray | None, start: int, stop: int
+) -> tuple[np.ndarray | None, np.ndarray | None]:
+    if boost_rows is None or boost_factors is None:
+        return None, None
+    in_shard = (boost_rows >= start) & (boost_rows < stop)
+    return boost_rows[in_shard] - start, boost_factors[in_shard]
+
+
+def _merge_shard_hits(shard_hits: list[tuple[np.ndarray, np.ndarray]], k: int) -> tuple[np.ndarray, np.ndarray]:
+    merged = list(
+        islice(heapq.merge(*(zip((-scores).tolist(), rows.tolist(), strict=True) for rows, scores in shard_hits)), k)
+    )
+    rows = np.fromiter((row for _, row in merged), dtype=np.int64, count=len(merged))
+    scores = np.fromiter((-score for score, _ in merged), dtype=np.float64, count=len(merged))
+    return rows, scores
+
+
+def _shared_source(matrix: np.ndarray) -> tuple[_MatrixSource, np.ndarray]:
+    rows, dim = matrix.shape
+    if (
+        isinstance(matrix, np.memmap)
+        and matrix.filename is not None
+        and matrix.dtype == np.float32
+        and matrix.flags.c_contiguous
+    ):
+        return _MatrixSource(path=str(matrix.filename), offset=int(matrix.offset), rows=rows, dim=dim), matrix
+    spill_dir = _SPILL_DIR if _SPILL_DIR.is_dir() else None
+    handle, path = tempfile.mkstemp(prefix="wks-shard-", suffix=".f32", dir=spill_dir)
+    with os.fdopen(handle, "wb") as spill:
+        np.ascontiguousarray(matrix, dtype=np.float32).tofile(spill)
+    source = _MatrixSource(path=path, offset=0, rows=rows, dim=dim)
+    if rows == 0:
+        return source, np.empty((0, dim), dtype=np.float32)
+    return source, np.memmap(path, dtype=np.float32, mode="r", shape=(rows, dim))
+
+
+def _remove_spill(path: str) -> None:
+    Path(path).unlink(missing_ok=True)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOLS[workers] = pool
+        return pool
+
+
+def _attach(source: _MatrixSource) -> np.memmap:
+    matrix = _WORKER_MATRICES.pop(source, None)
+    if matrix is None:
+        matrix = np.memmap(
+            source.path, dtype=np.float32, mode="r", offset=source.offset, shape=(source.rows, source.dim)
+        )
+        while len(_WORKER_MATRICES) >= _WORKER_CACHE_SIZE:
+            del _WORKER_MATRICES[next(iter(_WORKER_MATRICES))]
+    _WORKER_MATRICES[source] = matrix
+    return matrix
+
+
+def _score_shard(
+    source: _MatrixSource,
+    start: int,
+    stop: int,
+    query: np.ndarray,
+    k: int,
+    boost_rows: np.ndarray | None,
+    boost_factors: np.ndarray | None,
+    dead_rows: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    scores = (_attach(source)[start:stop] @ query).astype(np.float64)
+    if boost_rows is not None and boost_factors is not None and len(boost_rows):
+        scores[boost_rows] *= boost_factors
+    if dead_rows is not None and len(dead_rows):
+        scores[dead_rows] = -np.inf
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    top = top[np.lexsort((top, -scores[top]))]
+    return top + start, scores[top]
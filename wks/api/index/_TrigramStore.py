@@ -0,0 +1,127 @@
+from collections import defaultdict
+from typing import Any
+
+import numpy as np
+
+from ..database._pymongo_bulk_write import _pymongo_bulk_write
+from ..database.BulkWriteOp import BulkWriteOp
+from ._tokenize import tokenize
+
+_TRIGRAMS_COLLECTION = "index_trigrams"
+_GRAM_SIZE = 3
+
+
+class _TrigramStore:
+    def __init__(self, db: Any):
+        self._trigrams = db.get_database()[_TRIGRAMS_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        self._trigrams.create_index([("index_name", 1), ("gram", 1)], name="wks_trigrams_gram")
+        self._trigrams.create_index([("index_name", 1), ("uri", 1)], name="wks_trigrams_uri")
+
+    def add(self, index_name: str, chunk_docs: list[dict[str, Any]]) -> int:
+        chunk_ids = _gram_chunk_ids(chunk_docs)
+        if chunk_ids:
+            self._trigrams.insert_many(
+                [
+                    {"index_name": index_name, "uri": uri, "gram": gram, "chunk_ids": ids}
+                    for (uri, gram), ids in chunk_ids.items()
+                ]
+            )
+        return len(chunk_ids)
+
+    def replace_uri(self, index_name: str, uri: str, chunk_docs: list[dict[str, Any]]) -> int:
+        desired = {gram: ids for (_, gram), ids in _gram_chunk_ids(chunk_docs).items()}
+        stored = {
+            doc["gram"]: doc
+            for doc in self._trigrams.find({"index_name": index_name, "uri": uri}, {"gram": 1, "chunk_ids": 1})
+        }
+        stale = [doc["_id"] for gram, doc in stored.items() if gram not in desired]
+        operations = [BulkWriteOp.delete({"_id": {"$in": stale}})] if stale else []
+        for gram, ids in desired.items():
+            doc = stored.get(gram)
+            if doc is None:
+                operations.append(
+                    BulkWriteOp.insert({"index_name": index_name, "uri": uri, "gram": gram, "chunk_ids": ids})
+                )
+            elif doc["chunk_ids"] != ids:
+                operations.append(BulkWriteOp.update({"_id": doc["_id"]}, {"$set": {"chunk_ids": ids}}))
+        _pymongo_bulk_write(self._trigrams, operations, ordered=False)
+        return len(operations)
+
+    def clear(self, index_name: str | None = None) -> None:
+        self._trigrams.delete_many({"index_name": index_name} if index_name else {})
+
+    def search(
+        self,
+        index_name: str,
+        query: str,
+        limit: int,
+        min_similarity: float,
+        allowed_ids: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        term_grams = [_term_grams(term) for term in dict.fromkeys(tokenize(query))]
+        if not term_grams or limit <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        matched = self._matched_grams(index_name, term_grams)
+        term_ids, term_scores = _term_matches(term_grams, matched)
+        if not term_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        all_ids = np.concatenate(term_ids)
+        all_scores = np.concatenate(term_scores)
+        chunk_ids, inverse = np.unique(all_ids, return_inverse=True)
+        best = np.zeros(len(chunk_ids), dtype=np.float64)
+        np.maximum.at(best, inverse, all_scores)
+        keep = best >= min_similarity
+        if allowed_ids is not None:
+            keep &= np.isin(chunk_ids, allowed_ids)
+        chunk_ids = chunk_ids[keep]
+        scores = (np.bincount(inverse, weights=all_scores, minlength=len(keep)) / len(term_grams))[keep]
+        order = np.lexsort((chunk_ids, -scores))[:limit]
+        return chunk_ids[order], scores[order]
+
+    def _matched_grams(self, index_name: str, term_grams: list[set[str]]) -> dict[str, list[int]]:
+        matched: dict[str, list[int]] = defaultdict(list)
+        cursor = self._trigrams.find(
+            {"index_name": index_name, "gram": {"$in": sorted(set().union(*term_grams))}},
+            {"_id": 0, "gram": 1, "chunk_ids": 1},
+        )
+        for doc in cursor:
+            matched[doc["gram"]].extend(doc["chunk_ids"])
+        return matched
+
+
+def _term_matches(
+    term_grams: list[set[str]], matched: dict[str, list[int]]
+) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    term_ids: list[np.ndarray] = []
+    term_scores: list[np.ndarray] = []
+    for grams in term_grams:
+        ids = [np.unique(np.asarray(matched[gram], dtype=np.int64)) for gram in grams if gram in matched]
+        if not ids:
+            continue
+        chunk_ids, counts = np.unique(np.concatenate(ids), return_counts=True)
+        term_ids.append(chunk_ids)
+        term_scores.append(counts / len(grams))
+    return term_ids, term_scores
+
+
+def _gram_chunk_ids(chunk_docs: list[dict[str, Any]]) -> dict[tuple[str, str], list[int]]:
+    chunk_ids: dict[tuple[str, str], list[int]] = defaultdict(list)
+    for doc in sorted(chunk_docs, key=lambda doc: int(doc["chunk_id"])):
+        for gram in _text_grams(doc["text"]):
+            chunk_ids[(doc["uri"], gram)].append(int(doc["chunk_id"]))
+    return chunk_ids
+
+
+def _text_grams(text: str) -> set[str]:
+    grams: set[str] = set()
+    for term in set(tokenize(text)):
+        grams.update(_term_grams(term))
+    return grams
+
+
+def _term_grams(term: str) -> set[str]:
+    if len(term) <= _GRAM_SIZE:
+        return {term}
+    return {term[i : i + _GRAM_SIZE] for i in range(len(term) - _GRAM_SIZE + 1)}
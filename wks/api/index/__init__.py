@@ -1,9 +1,30 @@
 from wks.api.config.output_models import output_model
 
-IndexOutput = output_model("IndexOutput", "index_name", "uri", "chunk_count", "checksum")
+IndexOutput = output_model("IndexOutput", "index_name", "uri", "chunk_count", "checksum", "unchanged")
 IndexStatusOutput = output_model("IndexStatusOutput", "indexes")
 IndexAutoOutput = output_model("IndexAutoOutput", "uri", "priority", "indexed", "skipped")
-IndexEmbedOutput = output_model("IndexEmbedOutput", "index_name", "embedding_model", "chunk_count", "dimensions")
-IndexOptimizeOutput = output_model("IndexOptimizeOutput", "search_index")
+IndexEmbedOutput = output_model(
+    "IndexEmbedOutput",
+    "index_name",
+    "embedding_model",
+    "chunk_count",
+    "dimensions",
+    "embedded_count",
+    "reused_count",
+    "removed_count",
+)
+IndexMigrateOutput = output_model("IndexMigrateOutput", "converted", "total_converted")
+IndexQuantizationOutput = output_model(
+    "IndexQuantizationOutput", "index_name", "embedding_model", "chunk_count", "k", "query_count", "modes"
+)
+IndexOptimizeOutput = output_model("IndexOptimizeOutput", "search_index", "rebuilt_postings", "built_ann")
 
-__all__ = ["IndexAutoOutput", "IndexEmbedOutput", "IndexOptimizeOutput", "IndexOutput", "IndexStatusOutput"]
+__all__ = [
+    "IndexAutoOutput",
+    "IndexEmbedOutput",
+    "IndexMigrateOutput",
+    "IndexOptimizeOutput",
+    "IndexOutput",
+    "IndexQuantizationOutput",
+    "IndexStatusOutput",
+]
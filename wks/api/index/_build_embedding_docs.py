@@ -3,6 +3,8 @@ from typing import Any
 import numpy as np
 
 from ._Chunk import _Chunk
+from ._chunk_dedupe_keys import _chunk_dedupe_keys
+from ._embedding_codec import _encode_embedding
 
 
 def build_embedding_docs(
@@ -25,7 +27,15 @@ def build_embedding_docs(
             "chunk_index": chunk.chunk_index,
             "tokens": chunk.tokens,
             "text": chunk.text,
-            "embedding": embeddings[i].tolist(),
+            **_dedupe_fields(chunk),
+            **_encode_embedding(embeddings[i]),
         }
         for i, chunk in enumerate(chunks)
     ]
+
+
+def _dedupe_fields(chunk: _Chunk) -> dict[str, str]:
+    if chunk.canonical_uri is not None and chunk.text_hash is not None:
+        return {"canonical_uri": chunk.canonical_uri, "text_hash": chunk.text_hash}
+    canonical_uri, text_hash = _chunk_dedupe_keys(chunk.uri, chunk.text)
+    return {"canonical_uri": canonical_uri, "text_hash": text_hash}
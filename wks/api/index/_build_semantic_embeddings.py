@@ -5,6 +5,7 @@ import numpy as np
 from ..config.URI import URI
 from . import _embedding_utils
 from ._Chunk import _Chunk
+from ._embed_with_cache import embed_with_cache
 
 
 def build_semantic_embeddings(
@@ -18,7 +19,7 @@ def build_semantic_embeddings(
     if len(chunks) == 0:
         raise ValueError("chunks cannot be empty")
     if embedding_mode == "text":
-        return _embedding_utils.embed_texts(
+        return embed_with_cache(
             texts=[chunk.text for chunk in chunks],
             model_name=embedding_model,
             batch_size=batch_size,
@@ -28,10 +29,11 @@ def build_semantic_embeddings(
     if image_text_weight is None:
         raise ValueError("image_text_weight is required for embedding_mode 'image_text_combo'")
 
-    text_embeddings = _embedding_utils.embed_clip_texts(
+    text_embeddings = embed_with_cache(
         texts=[chunk.text for chunk in chunks],
         model_name=embedding_model,
         batch_size=batch_size,
+        mode="clip_text",
     )
 
     if source_image_path is not None:
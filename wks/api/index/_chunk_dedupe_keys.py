@@ -0,0 +1,7 @@
+from hashlib import sha256
+
+from ..config.URI import URI
+
+
+def _chunk_dedupe_keys(uri: str, text: str) -> tuple[str, str]:
+    return str(URI.from_any(uri)), sha256(text.encode("utf-8")).hexdigest()
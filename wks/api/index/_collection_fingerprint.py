@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class _CollectionFingerprint:
+    count: int
+    newest_id: str | None
+
+
+def _collection_fingerprint(db: Any, filter_doc: dict[str, Any]) -> _CollectionFingerprint:
+    collection = db.get_database()[db.name]
+    count = collection.count_documents(filter_doc)
+    return _CollectionFingerprint(count=count, newest_id=_newest_id(collection, filter_doc))
+
+
+def _advance_fingerprint(
+    db: Any,
+    filter_doc: dict[str, Any],
+    previous: _CollectionFingerprint,
+    inserted_ids: list[Any],
+    deleted_ids: list[Any],
+) -> _CollectionFingerprint:
+    count = previous.count + len(inserted_ids) - len(deleted_ids)
+    inserted_newest = str(max(inserted_ids)) if inserted_ids else None
+    kept_newest = previous.newest_id if previous.newest_id not in {str(doc_id) for doc_id in deleted_ids} else None
+    if previous.newest_id is not None and kept_newest is None and (inserted_newest or "") < previous.newest_id:
+        return _CollectionFingerprint(count=count, newest_id=_newest_id(db.get_database()[db.name], filter_doc))
+    newest_id = max((doc_id for doc_id in (kept_newest, inserted_newest) if doc_id is not None), default=None)
+    return _CollectionFingerprint(count=count, newest_id=newest_id)
+
+
+def _newest_id(collection: Any, filter_doc: dict[str, Any]) -> str | None:
+    newest_doc = collection.find_one(filter_doc, {"_id": 1}, sort=[("_id", -1)])
+    return str(newest_doc["_id"]) if newest_doc is not None else None
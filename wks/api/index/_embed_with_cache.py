@@ -0,0 +1,65 @@
+import logging
+import sqlite3
+from hashlib import sha256
+from typing import Literal
+
+import numpy as np
+
+from ..config.WKSConfig import WKSConfig
+from . import _embedding_utils
+from ._EmbeddingCache import _EmbeddingCache
+
+_EMBEDDING_CACHE_FILE = "embedding_cache.sqlite3"
+_EMBEDDING_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+log = logging.getLogger("wks.api.index.embed_with_cache")
+
+
+def embed_with_cache(
+    texts: list[str],
+    model_name: str,
+    batch_size: int,
+    mode: Literal["text", "clip_text"] = "text",
+) -> np.ndarray:
+    embed = _embedding_utils.embed_texts if mode == "text" else _embedding_utils.embed_clip_texts
+    if len(texts) == 0:
+        return embed(texts=texts, model_name=model_name, batch_size=batch_size)
+    hashes = [sha256(text.encode("utf-8")).hexdigest() for text in texts]
+    cache = _EmbeddingCache(WKSConfig.get_home_dir() / "index" / _EMBEDDING_CACHE_FILE, _EMBEDDING_CACHE_MAX_BYTES)
+    cached = _read_cache(cache, model_name, mode, list(dict.fromkeys(hashes)))
+    vectors = dict(cached or {})
+    missing = {text_hash: text for text_hash, text in zip(hashes, texts, strict=True) if text_hash not in vectors}
+    if missing:
+        computed = embed(texts=list(missing.values()), model_name=model_name, batch_size=batch_size)
+        fresh = dict(zip(missing, computed, strict=True))
+        if cached is not None:
+            _write_cache(cache, model_name, mode, fresh)
+        vectors.update(fresh)
+    _check_shapes(cache, model_name, vectors)
+    return np.asarray([vectors[text_hash] for text_hash in hashes], dtype=np.float32)
+
+
+def _check_shapes(cache: _EmbeddingCache, model_name: str, vectors: dict[str, np.ndarray]) -> None:
+    shapes = {vector.shape for vector in vectors.values()}
+    if len(shapes) > 1:
+        raise RuntimeError(
+            f"Embedding cache {cache.path} holds vectors of different shapes {sorted(shapes)} for model "
+            f"'{model_name}'. Delete the cache file to rebuild it."
+        )
+
+
+def _read_cache(
+    cache: _EmbeddingCache, model_name: str, mode: str, text_hashes: list[str]
+) -> dict[str, np.ndarray] | None:
+    try:
+        return cache.get_many(model_name, mode, text_hashes)
+    except (OSError, sqlite3.Error) as exc:
+        log.warning("Embedding cache %s is unavailable; embedding without it: %s", cache.path, exc)
+        return None
+
+
+def _write_cache(cache: _EmbeddingCache, model_name: str, mode: str, vectors: dict[str, np.ndarray]) -> None:
+    try:
+        cache.put_many(model_name, mode, vectors)
+    except (OSError, sqlite3.Error) as exc:
+        log.warning("Embedding cache %s is unavailable; not storing new embeddings: %s", cache.path, exc)
@@ -0,0 +1,39 @@
+from typing import Any
+
+import numpy as np
+
+_EMBEDDING_DTYPE = "float32"
+_EMBEDDING_WIRE_DTYPE = np.dtype("<f4")
+
+
+def _encode_embedding(vector: np.ndarray) -> dict[str, Any]:
+    packed = np.ascontiguousarray(vector, dtype=_EMBEDDING_WIRE_DTYPE)
+    if packed.ndim != 1:
+        raise ValueError(f"embedding must be 1D (found ndim={packed.ndim})")
+    return {"embedding": packed.tobytes(), "embedding_dtype": _EMBEDDING_DTYPE, "embedding_dim": int(packed.shape[0])}
+
+
+def _decode_embeddings(docs: list[dict[str, Any]]) -> np.ndarray:
+    if not docs:
+        return np.empty((0, 0), dtype=np.float32)
+    dim = _embedding_dim(docs[0])
+    matrix = np.empty((len(docs), dim), dtype=np.float32)
+    for row, doc in enumerate(docs):
+        value = doc["embedding"]
+        if _embedding_dim(doc) != dim:
+            raise ValueError(f"embedding dimensions differ (expected={dim}, found={_embedding_dim(doc)}, row={row})")
+        if isinstance(value, list):
+            matrix[row] = value
+        else:
+            matrix[row] = np.frombuffer(value, dtype=_EMBEDDING_WIRE_DTYPE)
+    return matrix
+
+
+def _embedding_dim(doc: dict[str, Any]) -> int:
+    value = doc["embedding"]
+    if isinstance(value, list):
+        return len(value)
+    dtype = doc.get("embedding_dtype")
+    if dtype != _EMBEDDING_DTYPE:
+        raise ValueError(f"Unsupported embedding_dtype: {dtype}")
+    return int(doc["embedding_dim"])
@@ -4,6 +4,7 @@ from pathlib import Path
 import numpy as np
 
 IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff", ".webp"}
+_SCORE_BLOCK_ROWS = 65536
 
 
 @lru_cache(maxsize=4)
@@ -149,13 +150,21 @@ def combine_modal_embeddings(
     return (combined / norms).astype(np.float32)
 
 
-def cosine_scores(query_embedding: np.ndarray, matrix: np.ndarray) -> np.ndarray:
-    if query_embedding.ndim != 1:
-        raise ValueError(f"query_embedding must be 1D (found ndim={query_embedding.ndim})")
+def cosine_scores(query_embedding: np.ndarray, matrix: np.ndarray, scales: np.ndarray | None = None) -> np.ndarray:
+    if query_embedding.ndim not in (1, 2):
+        raise ValueError(f"query_embedding must be 1D or 2D (found ndim={query_embedding.ndim})")
     if matrix.ndim != 2:
         raise ValueError(f"matrix must be 2D (found ndim={matrix.ndim})")
-    if matrix.shape[1] != query_embedding.shape[0]:
+    if matrix.shape[1] != query_embedding.shape[-1]:
         raise ValueError(
-            f"embedding dimensions do not match (matrix_dim={matrix.shape[1]}, query_dim={query_embedding.shape[0]})"
+            f"embedding dimensions do not match (matrix_dim={matrix.shape[1]}, query_dim={query_embedding.shape[-1]})"
         )
-    return matrix @ query_embedding
+    if matrix.dtype == np.float32 and scales is None:
+        return matrix @ query_embedding.T
+    query = np.asarray(query_embedding, dtype=np.float32).T
+    scores = np.empty((matrix.shape[0], *query.shape[1:]), dtype=np.float32)
+    for start in range(0, matrix.shape[0], _SCORE_BLOCK_ROWS):
+        scores[start : start + _SCORE_BLOCK_ROWS] = matrix[start : start + _SCORE_BLOCK_ROWS].astype(np.float32) @ query
+    if scales is not None:
+        scores *= scales.reshape(-1, *([1] * (scores.ndim - 1)))
+    return scores
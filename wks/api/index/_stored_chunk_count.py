@@ -0,0 +1,48 @@
+from ..config.WKSConfig import WKSConfig
+from ..database.Database import Database
+from ..transform._resolve_engine_selection import ResolvedEngineSelection
+from ..transform._transform_cache_key import transform_cache_key
+
+_URI_BATCH_SIZE = 1000
+
+
+def _stored_chunk_count(
+    config: WKSConfig, name: str, uri: str, file_checksum: str, selection: ResolvedEngineSelection
+) -> tuple[str, int | None]:
+    expected_key = _expected_transform_key(file_checksum, selection)
+    return expected_key, _stored_chunk_counts(config, name, {uri: expected_key})[uri]
+
+
+def _expected_transform_key(file_checksum: str, selection: ResolvedEngineSelection) -> str:
+    return transform_cache_key(
+        file_checksum,
+        selection.cache_engine_name,
+        selection.engine.compute_options_hash(selection.options),
+    )
+
+
+def _stored_chunk_counts(config: WKSConfig, name: str, expected_keys: dict[str, str]) -> dict[str, int | None]:
+    from ._ChunkStore import _ChunkStore
+    from ._EmbeddingStore import _EmbeddingStore
+
+    assert config.index is not None
+    spec = config.index.indexes[name]
+    spec_key = spec.content_key()
+    uris = sorted(expected_keys)
+    counts: dict[str, int | None] = {}
+    with Database(config.database, "index") as db:
+        store = _ChunkStore(db)
+        for batch in _batches(uris):
+            counts.update(store.current_chunk_counts(name, {uri: expected_keys[uri] for uri in batch}, spec_key))
+    if spec.embedding_model is None:
+        return counts
+    embedded: dict[str, int] = {}
+    with Database(config.database, "index_embeddings") as db:
+        embeddings = _EmbeddingStore(db)
+        for batch in _batches([uri for uri, count in counts.items() if count is not None]):
+            embedded.update(embeddings.count_uris(name, spec.embedding_model, batch))
+    return {uri: count if count is None or embedded.get(uri, 0) == count else None for uri, count in counts.items()}
+
+
+def _batches(uris: list[str]) -> list[list[str]]:
+    return [uris[start : start + _URI_BATCH_SIZE] for start in range(0, len(uris), _URI_BATCH_SIZE)]
@@ -0,0 +1,7 @@
+import re
+
+_TERM_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return [term.lower() for term in _TERM_RE.findall(text) if term]
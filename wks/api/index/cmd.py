@@ -7,7 +7,7 @@ from ..transform._resolve_engine_selection import resolve_engine_selection
 from . import IndexOutput
 
 
-def cmd(name: str, uri: str) -> StageResult:
+def cmd(name: str, uri: str, force: bool = False) -> StageResult:
     uri = str(uri)
 
     def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
@@ -24,6 +24,7 @@ def cmd(name: str, uri: str) -> StageResult:
                 uri=uri,
                 chunk_count=0,
                 checksum="",
+                unchanged=False,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -38,6 +39,7 @@ def cmd(name: str, uri: str) -> StageResult:
                 uri=uri,
                 chunk_count=0,
                 checksum="",
+                unchanged=False,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -57,6 +59,7 @@ def cmd(name: str, uri: str) -> StageResult:
                 uri=uri,
                 chunk_count=0,
                 checksum="",
+                unchanged=False,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -72,13 +75,38 @@ def cmd(name: str, uri: str) -> StageResult:
                 uri=uri,
                 chunk_count=0,
                 checksum="",
+                unchanged=False,
             ).model_dump(mode="python")
             result_obj.success = False
             return
 
+        file_uri = URI.from_path(file_path)
+        spec_key = spec.content_key()
+        if not force:
+            yield (0.08, "Checking stored checksum...")
+            from ..config.file_checksum import file_checksum
+            from ._stored_chunk_count import _stored_chunk_count
+
+            expected_key, stored_count = _stored_chunk_count(
+                config, name, str(file_uri), file_checksum(file_path), selection
+            )
+            if stored_count is not None:
+                yield (1.0, "Complete")
+                result_obj.result = f"Unchanged {file_path.name} in '{name}' ({stored_count} chunks)"
+                result_obj.output = IndexOutput(
+                    errors=[],
+                    warnings=[],
+                    index_name=name,
+                    uri=str(file_uri),
+                    chunk_count=stored_count,
+                    checksum=expected_key,
+                    unchanged=True,
+                ).model_dump(mode="python")
+                result_obj.success = True
+                return
+
         from ..transform.cmd_engine import cmd_engine
 
-        file_uri = URI.from_path(file_path)
         yield (0.1, f"Transforming with {spec.engine}...")
 
         res = cmd_engine(spec.engine, file_uri, {})
@@ -95,6 +123,7 @@ def cmd(name: str, uri: str) -> StageResult:
                 uri=uri,
                 chunk_count=0,
                 checksum="",
+                unchanged=False,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -116,29 +145,31 @@ def cmd(name: str, uri: str) -> StageResult:
         yield (0.85, "Storing chunks...")
         with Database(config.database, "index") as db:
             store = _ChunkStore(db)
-            store.replace_uri(name, str(file_uri), cache_key, chunks)
+            store.replace_uri(name, str(file_uri), cache_key, chunks, spec_key)
 
-        if spec.embedding_model is not None and len(chunks) > 0:
+        if spec.embedding_model is not None:
             yield (0.92, f"Embedding chunks with {spec.embedding_model}...")
             from ._build_embedding_docs import build_embedding_docs
             from ._build_semantic_embeddings import build_semantic_embeddings
             from ._EmbeddingStore import _EmbeddingStore
 
-            embeddings = build_semantic_embeddings(
-                chunks=chunks,
-                embedding_model=spec.embedding_model,
-                embedding_mode=spec.embedding_mode,
-                image_text_weight=spec.image_text_weight,
-                batch_size=64,
-                source_image_path=file_path,
-            )
-            embedding_docs = build_embedding_docs(
-                index_name=name,
-                embedding_model=spec.embedding_model,
-                embedding_mode=spec.embedding_mode,
-                chunks=chunks,
-                embeddings=embeddings,
-            )
+            embedding_docs = []
+            if chunks:
+                embeddings = build_semantic_embeddings(
+                    chunks=chunks,
+                    embedding_model=spec.embedding_model,
+                    embedding_mode=spec.embedding_mode,
+                    image_text_weight=spec.image_text_weight,
+                    batch_size=64,
+                    source_image_path=file_path,
+                )
+                embedding_docs = build_embedding_docs(
+                    index_name=name,
+                    embedding_model=spec.embedding_model,
+                    embedding_mode=spec.embedding_mode,
+                    chunks=chunks,
+                    embeddings=embeddings,
+                )
             with Database(config.database, "index_embeddings") as db:
                 _EmbeddingStore(db).replace_uri(
                     index_name=name,
@@ -156,6 +187,7 @@ def cmd(name: str, uri: str) -> StageResult:
             uri=str(file_uri),
             chunk_count=len(chunks),
             checksum=cache_key,
+            unchanged=False,
         ).model_dump(mode="python")
         result_obj.success = True
 
@@ -3,7 +3,7 @@ from collections.abc import Iterator
 from ..config.StageResult import StageResult
 
 
-def cmd_backfill(name: str = "") -> StageResult:
+def cmd_backfill(name: str = "", force: bool = False) -> StageResult:
     def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
         yield (0.05, "Loading configuration...")
         from ..config.WKSConfig import WKSConfig
@@ -49,35 +49,34 @@ def cmd_backfill(name: str = "") -> StageResult:
             yield (1.0, "Complete")
             return
 
-        from ..index.cmd_auto import cmd_auto
-
-        indexed = 0
-        skipped = 0
-        errors: list[str] = []
-
-        for i, uri in enumerate(uris):
-            progress = 0.15 + (i / total) * 0.8
-            try:
-                res = cmd_auto(uri)
-                list(res.progress_callback(res))
-                if res.success:
-                    out = res.output
-                    if out.get("indexed"):
-                        indexed += 1
-                    else:
-                        skipped += 1
-                else:
-                    skipped += 1
-            except Exception as exc:
-                errors.append(f"{uri}: {exc}")
-                skipped += 1
-
-            if i % 50 == 0 or i == total - 1:
-                yield (progress, f"Processed {i + 1}/{total} — indexed {indexed}, skipped {skipped}...")
-
-        result_obj.result = f"Backfill '{index_name}': {indexed} indexed, {skipped} skipped"
+        yield (0.15, f"Planning {total} candidate files...")
+        from ._BackfillPipeline import _BackfillPipeline, _plan_jobs
+
+        jobs, missing, unchanged = _plan_jobs(
+            config, uris, force=force, workers=config.index.backfill.transform_workers
+        )
+        pipeline = _BackfillPipeline(config, config.index.backfill, jobs)
+        for snapshot in pipeline.run():
+            fraction = snapshot.done_files / max(snapshot.total_files, 1)
+            yield (0.15 + fraction * 0.8, snapshot.message(pipeline.queued()))
+
+        progress = pipeline.progress
+        indexed = progress.indexed
+        skipped = progress.skipped + len(missing)
+        errors = progress.errors
+        result_obj.result = (
+            f"Backfill '{index_name}': {indexed} indexed, {len(unchanged)} unchanged, {skipped} skipped "
+            f"({progress.done_files / progress.elapsed:.1f} files/s, {progress.chunks} chunks)"
+        )
         result_obj.success = True
-        result_obj.output = {"errors": errors, "indexed": indexed, "skipped": skipped}
+        result_obj.output = {
+            "errors": errors,
+            "indexed": indexed,
+            "skipped": skipped,
+            "unchanged": len(unchanged),
+            "chunk_count": progress.chunks,
+            "elapsed_secs": round(progress.elapsed, 3),
+        }
         yield (1.0, "Complete")
 
     return StageResult(
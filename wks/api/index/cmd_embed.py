@@ -1,9 +1,28 @@
 from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
 
 from ..config.StageResult import StageResult
 from ..config.WKSConfig import WKSConfig
 from ..database.Database import Database
 from . import IndexEmbedOutput
+from ._Chunk import _Chunk
+from ._chunk_dedupe_keys import _chunk_dedupe_keys
+from ._IndexSpec import _IndexSpec
+
+
+@dataclass
+class _EmbeddingPlan:
+    embed: list[_Chunk] = field(default_factory=list)
+    copies: list[tuple[_Chunk, Any]] = field(default_factory=list)
+    kept_ids: list[Any] = field(default_factory=list)
+    removed_ids: list[Any] = field(default_factory=list)
+
+    @property
+    def reused_count(self) -> int:
+        return len(self.copies) + len(self.kept_ids)
 
 
 def cmd_embed(
@@ -13,16 +32,7 @@ def cmd_embed(
     def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
         if batch_size <= 0:
             yield (1.0, "Complete")
-            result_obj.result = "Invalid batch size"
-            result_obj.output = IndexEmbedOutput(
-                errors=[f"batch_size must be > 0 (found: {batch_size})"],
-                warnings=[],
-                index_name="",
-                embedding_model="",
-                chunk_count=0,
-                dimensions=0,
-            ).model_dump(mode="python")
-            result_obj.success = False
+            _fail(result_obj, "Invalid batch size", f"batch_size must be > 0 (found: {batch_size})")
             return
 
         yield (0.1, "Loading configuration...")
@@ -30,50 +40,31 @@ def cmd_embed(
 
         if config.index is None:
             yield (1.0, "Complete")
-            result_obj.result = "Index not configured"
-            result_obj.output = IndexEmbedOutput(
-                errors=["No index section in config"],
-                warnings=[],
-                index_name="",
-                embedding_model="",
-                chunk_count=0,
-                dimensions=0,
-            ).model_dump(mode="python")
-            result_obj.success = False
+            _fail(result_obj, "Index not configured", "No index section in config")
             return
 
         index_name = name if name else config.index.default_index
         if index_name not in config.index.indexes:
             yield (1.0, "Complete")
-            result_obj.result = f"Unknown index: {index_name}"
-            result_obj.output = IndexEmbedOutput(
-                errors=[f"Index '{index_name}' not defined in config (available: {list(config.index.indexes.keys())})"],
-                warnings=[],
-                index_name=index_name,
-                embedding_model="",
-                chunk_count=0,
-                dimensions=0,
-            ).model_dump(mode="python")
-            result_obj.success = False
+            _fail(
+                result_obj,
+                f"Unknown index: {index_name}",
+                f"Index '{index_name}' not defined in config (available: {list(config.index.indexes.keys())})",
+                index_name,
+            )
             return
         spec = config.index.indexes[index_name]
         embedding_model = spec.embedding_model
         embedding_mode = spec.embedding_mode
         if embedding_model is None:
             yield (1.0, "Complete")
-            result_obj.result = f"Index '{index_name}' has no embedding_model"
-            result_obj.output = IndexEmbedOutput(
-                errors=[
-                    f"Index '{index_name}' has no embedding_model configured. "
-                    "Set index.indexes.<name>.embedding_model in config."
-                ],
-                warnings=[],
-                index_name=index_name,
-                embedding_model="",
-                chunk_count=0,
-                dimensions=0,
-            ).model_dump(mode="python")
-            result_obj.success = False
+            _fail(
+                result_obj,
+                f"Index '{index_name}' has no embedding_model",
+                f"Index '{index_name}' has no embedding_model configured. "
+                "Set index.indexes.<name>.embedding_model in config.",
+                index_name,
+            )
             return
 
         yield (0.25, "Loading chunks...")
@@ -84,53 +75,40 @@ def cmd_embed(
 
         if not chunks:
             yield (1.0, "Complete")
-            result_obj.result = f"Index '{index_name}' is empty"
-            result_obj.output = IndexEmbedOutput(
-                errors=[f"Index '{index_name}' is empty"],
-                warnings=[],
-                index_name=index_name,
-                embedding_model=embedding_model,
-                chunk_count=0,
-                dimensions=0,
-            ).model_dump(mode="python")
-            result_obj.success = False
+            _fail(
+                result_obj,
+                f"Index '{index_name}' is empty",
+                f"Index '{index_name}' is empty",
+                index_name,
+                embedding_model,
+            )
             return
 
-        yield (0.45, f"Embedding {len(chunks)} chunks...")
-        from ._build_semantic_embeddings import build_semantic_embeddings
+        yield (0.35, "Comparing chunk hashes...")
+        plan, copied = _load_plan(config, index_name, embedding_model, embedding_mode, chunks)
 
-        embeddings = build_semantic_embeddings(
-            chunks=chunks,
-            embedding_model=embedding_model,
-            embedding_mode=embedding_mode,
-            image_text_weight=spec.image_text_weight,
-            batch_size=batch_size,
-        )
+        yield (0.45, f"Embedding {len(plan.embed)} changed chunks ({plan.reused_count} reused)...")
+        vectors = _plan_vectors(plan, copied, spec, embedding_model, batch_size)
+        dimensions = int(vectors.shape[1]) if len(vectors) else int(next(iter(copied.values())).shape[0])
 
         yield (0.8, "Storing embeddings...")
-        from ._build_embedding_docs import build_embedding_docs
-        from ._EmbeddingStore import _EmbeddingStore
-
-        docs = build_embedding_docs(
-            index_name=index_name,
-            embedding_model=embedding_model,
-            embedding_mode=embedding_mode,
-            chunks=chunks,
-            embeddings=embeddings,
-        )
-
-        with Database(config.database, "index_embeddings") as db:
-            _EmbeddingStore(db).replace_index_model(index_name=index_name, embedding_model=embedding_model, docs=docs)
+        _store_plan(config, index_name, embedding_model, embedding_mode, plan, vectors)
 
         yield (1.0, "Complete")
-        result_obj.result = f"Embedded index '{index_name}' ({len(chunks)} chunks)"
+        result_obj.result = (
+            f"Embedded index '{index_name}' ({len(chunks)} chunks: {len(plan.embed)} embedded, "
+            f"{plan.reused_count} reused, {len(plan.removed_ids)} removed)"
+        )
         result_obj.output = IndexEmbedOutput(
             errors=[],
             warnings=[],
             index_name=index_name,
             embedding_model=embedding_model,
             chunk_count=len(chunks),
-            dimensions=int(embeddings.shape[1]),
+            dimensions=dimensions,
+            embedded_count=len(plan.embed),
+            reused_count=plan.reused_count,
+            removed_count=len(plan.removed_ids),
         ).model_dump(mode="python")
         result_obj.success = True
 
@@ -138,3 +116,130 @@ def cmd_embed(
         announce=f"Building embeddings for index '{name or '(default)'}'...",
         progress_callback=do_work,
     )
+
+
+def _fail(result_obj: StageResult, result: str, error: str, index_name: str = "", embedding_model: str = "") -> None:
+    result_obj.result = result
+    result_obj.output = IndexEmbedOutput(
+        errors=[error],
+        warnings=[],
+        index_name=index_name,
+        embedding_model=embedding_model,
+        chunk_count=0,
+        dimensions=0,
+        embedded_count=0,
+        reused_count=0,
+        removed_count=0,
+    ).model_dump(mode="python")
+    result_obj.success = False
+
+
+def _load_plan(
+    config: WKSConfig, index_name: str, embedding_model: str, embedding_mode: str, chunks: list[_Chunk]
+) -> tuple[_EmbeddingPlan, dict[Any, np.ndarray]]:
+    from ._EmbeddingStore import _EmbeddingStore
+
+    with Database(config.database, "index_embeddings") as db:
+        store = _EmbeddingStore(db)
+        plan = _plan_embedding_updates(chunks, store.get_chunk_hashes(index_name, embedding_model), embedding_mode)
+        copied = store.get_embeddings(list({doc_id: None for _, doc_id in plan.copies}))
+        if not plan.embed and not copied and plan.kept_ids:
+            copied = store.get_embeddings(plan.kept_ids[:1])
+    return plan, copied
+
+
+def _plan_vectors(
+    plan: _EmbeddingPlan, copied: dict[Any, np.ndarray], spec: _IndexSpec, embedding_model: str, batch_size: int
+) -> np.ndarray:
+    from ._build_semantic_embeddings import build_semantic_embeddings
+
+    vectors = []
+    if plan.embed:
+        vectors.append(
+            build_semantic_embeddings(
+                chunks=plan.embed,
+                embedding_model=embedding_model,
+                embedding_mode=spec.embedding_mode,
+                image_text_weight=spec.image_text_weight,
+                batch_size=batch_size,
+            )
+        )
+    if plan.copies:
+        vectors.append(np.asarray([copied[doc_id] for _, doc_id in plan.copies], dtype=np.float32))
+    return np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+
+def _store_plan(
+    config: WKSConfig,
+    index_name: str,
+    embedding_model: str,
+    embedding_mode: str,
+    plan: _EmbeddingPlan,
+    vectors: np.ndarray,
+) -> None:
+    from ._build_embedding_docs import build_embedding_docs
+    from ._EmbeddingStore import _EmbeddingStore
+
+    new_chunks = plan.embed + [chunk for chunk, _ in plan.copies]
+    docs = (
+        build_embedding_docs(
+            index_name=index_name,
+            embedding_model=embedding_model,
+            embedding_mode=embedding_mode,
+            chunks=new_chunks,
+            embeddings=vectors,
+        )
+        if new_chunks
+        else []
+    )
+    with Database(config.database, "index_embeddings") as db:
+        _EmbeddingStore(db).update_index_model(
+            index_name=index_name,
+            embedding_model=embedding_model,
+            removed_ids=plan.removed_ids,
+            docs=docs,
+        )
+
+
+def _plan_embedding_updates(
+    chunks: list[_Chunk], existing: list[dict[str, Any]], embedding_mode: str
+) -> _EmbeddingPlan:
+    by_position, by_content = _existing_lookups(existing, embedding_mode)
+    plan = _EmbeddingPlan()
+    kept: set[Any] = set()
+    for chunk in chunks:
+        text_hash = chunk.text_hash or _chunk_dedupe_keys(chunk.uri, chunk.text)[1]
+        current = by_position.get((chunk.uri, chunk.chunk_index))
+        if current is not None and current["_id"] not in kept and _is_current(current, text_hash, embedding_mode):
+            kept.add(current["_id"])
+            plan.kept_ids.append(current["_id"])
+            continue
+        source_id = by_content.get(_reuse_key(chunk.uri, text_hash, embedding_mode))
+        if source_id is None:
+            plan.embed.append(chunk)
+        else:
+            plan.copies.append((chunk, source_id))
+    plan.removed_ids = [doc["_id"] for doc in existing if doc["_id"] not in kept]
+    return plan
+
+
+def _existing_lookups(
+    existing: list[dict[str, Any]], embedding_mode: str
+) -> tuple[dict[tuple[str, int], dict[str, Any]], dict[tuple[str, ...], Any]]:
+    by_position: dict[tuple[str, int], dict[str, Any]] = {}
+    by_content: dict[tuple[str, ...], Any] = {}
+    for doc in existing:
+        by_position.setdefault((str(doc["uri"]), int(doc["chunk_index"])), doc)
+        if doc.get("embedding_mode", "text") == embedding_mode:
+            by_content.setdefault(_reuse_key(str(doc["uri"]), str(doc["text_hash"]), embedding_mode), doc["_id"])
+    return by_position, by_content
+
+
+def _is_current(doc: dict[str, Any], text_hash: str, embedding_mode: str) -> bool:
+    return doc.get("embedding_mode", "text") == embedding_mode and doc["text_hash"] == text_hash
+
+
+def _reuse_key(uri: str, text_hash: str, embedding_mode: str) -> tuple[str, ...]:
+    if embedding_mode == "text":
+        return (embedding_mode, text_hash)
+    return (embedding_mode, uri, text_hash)
@@ -0,0 +1,34 @@
+from collections.abc import Iterator
+
+from ..config.StageResult import StageResult
+from ..config.WKSConfig import WKSConfig
+from ..database.Database import Database
+from . import IndexMigrateOutput
+
+
+def cmd_migrate() -> StageResult:
+    def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
+        yield (0.1, "Loading configuration...")
+        config = WKSConfig.load()
+
+        yield (0.3, "Packing legacy embeddings...")
+        from ._EmbeddingStore import _EmbeddingStore
+
+        with Database(config.database, "index_embeddings") as db:
+            converted = _EmbeddingStore(db).pack_legacy_embeddings()
+
+        total_converted = sum(converted.values())
+        yield (1.0, "Complete")
+        result_obj.result = f"Packed {total_converted} embeddings"
+        result_obj.output = IndexMigrateOutput(
+            errors=[],
+            warnings=[],
+            converted=converted,
+            total_converted=total_converted,
+        ).model_dump(mode="python")
+        result_obj.success = True
+
+    return StageResult(
+        announce="Migrating stored embeddings...",
+        progress_callback=do_work,
+    )
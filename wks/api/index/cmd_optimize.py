@@ -18,15 +18,51 @@ def cmd_optimize() -> StageResult:
                 errors=["No index section in config"],
                 warnings=[],
                 search_index="",
+                rebuilt_postings=[],
+                built_ann=[],
             ).model_dump(mode="python")
             result_obj.success = False
             return
 
-        yield (0.5, "Creating search indexes...")
+        yield (0.3, "Creating search indexes...")
         from ._ChunkStore import _ChunkStore
+        from ._EmbeddingStore import _EmbeddingStore
 
+        with Database(config.database, "index_embeddings") as db:
+            _EmbeddingStore(db).ensure_indexes()
+
+        rebuilt_postings: list[str] = []
         with Database(config.database, "index") as db:
-            search_index = _ChunkStore(db).ensure_search_indexes()
+            store = _ChunkStore(db)
+            search_index = store.ensure_search_indexes()
+            for index_name in config.index.indexes:
+                if store.has_postings(index_name) and store.has_trigrams(index_name):
+                    continue
+                yield (0.6, f"Rebuilding postings for '{index_name}'...")
+                store.rebuild_postings(index_name)
+                rebuilt_postings.append(index_name)
+
+        from ..search._SearchRuntime import _SEARCH_RUNTIME
+        from ._EmbeddingMatrix import _EmbeddingMatrix
+        from ._IvfLists import _list_count, _train_centroids
+
+        built_ann: list[str] = []
+        for index_name, spec in config.index.indexes.items():
+            if spec.embedding_model is None:
+                continue
+            yield (0.8, f"Building ANN lists for '{index_name}'...")
+            state = _SEARCH_RUNTIME.get_semantic_index_state(
+                config,
+                index_name,
+                spec.embedding_model,
+                quantization=spec.quantization,
+                shard_count=spec.scoring_shards,
+            )
+            if not state.row_count:
+                continue
+            centroids = _train_centroids(state.matrix, _list_count(state.row_count), rows=state.live_rows)
+            if _EmbeddingMatrix(index_name, spec.embedding_model).write_centroids(centroids):
+                built_ann.append(index_name)
 
         yield (1.0, "Complete")
         result_obj.result = f"Search index ready: {search_index}"
@@ -34,6 +70,8 @@ def cmd_optimize() -> StageResult:
             errors=[],
             warnings=[],
             search_index=search_index,
+            rebuilt_postings=rebuilt_postings,
+            built_ann=built_ann,
         ).model_dump(mode="python")
         result_obj.success = True
 
@@ -0,0 +1,163 @@
+from collections.abc import Callable, Iterator
+from functools import partial
+from time import perf_counter
+
+import numpy as np
+
+from ..config.StageResult import StageResult
+from ..config.WKSConfig import WKSConfig
+from . import IndexQuantizationOutput
+from ._embedding_utils import cosine_scores
+from ._QuantizedMatrix import _RERANK_CANDIDATES, _quantize_matrix, _QuantizedMatrix
+
+_QUANTIZATION_MODES = ("float16", "int8")
+
+
+def cmd_quantization(
+    name: str = "",
+    k: int = 10,
+    queries: int = 50,
+) -> StageResult:
+    def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
+        fail = partial(_fail, result_obj, k)
+
+        if k <= 0 or queries <= 0:
+            yield (1.0, "Complete")
+            fail("Invalid report size", f"k and queries must be > 0 (found: k={k}, queries={queries})")
+            return
+
+        yield (0.1, "Loading configuration...")
+        config = WKSConfig.load()
+        if config.index is None:
+            yield (1.0, "Complete")
+            fail("Index not configured", "No index section in config")
+            return
+
+        index_name = name if name else config.index.default_index
+        if index_name not in config.index.indexes:
+            yield (1.0, "Complete")
+            fail(
+                f"Unknown index: {index_name}",
+                f"Index '{index_name}' not defined in config (available: {list(config.index.indexes.keys())})",
+                index_name,
+            )
+            return
+        spec = config.index.indexes[index_name]
+        embedding_model = spec.embedding_model
+        if embedding_model is None:
+            yield (1.0, "Complete")
+            fail(
+                f"Index '{index_name}' has no embedding_model",
+                f"Index '{index_name}' has no embedding_model configured.",
+                index_name,
+            )
+            return
+
+        yield (0.3, f"Loading semantic index '{index_name}'...")
+        from ..search._SearchRuntime import _SEARCH_RUNTIME
+
+        state = _SEARCH_RUNTIME.get_semantic_index_state(
+            config, index_name, embedding_model, quantization=spec.quantization, shard_count=spec.scoring_shards
+        )
+        if not state.row_count:
+            yield (1.0, "Complete")
+            fail(
+                f"No embeddings for index '{index_name}'",
+                f"No embeddings found for index '{index_name}'. Run: wksc index embed {index_name}",
+                index_name,
+                embedding_model,
+            )
+            return
+
+        matrix = state.vectors(np.arange(state.row_count))
+        top_k = min(k, matrix.shape[0])
+        query_vectors = _sample_queries(matrix, queries)
+
+        yield (0.5, f"Scoring {len(query_vectors)} queries exactly...")
+        exact_ms, exact_top = _measure(query_vectors, partial(_exact_top_k, matrix=matrix, k=top_k))
+        modes = [
+            {"mode": "none", "bytes": int(matrix.nbytes), "recall": 1.0, "mean_ms": exact_ms},
+        ]
+        for position, mode in enumerate(_QUANTIZATION_MODES):
+            yield (0.6 + 0.3 * position / len(_QUANTIZATION_MODES), f"Scoring {mode} with exact re-rank...")
+            compact = _quantize_matrix(matrix, mode)
+            mean_ms, approx_top = _measure(
+                query_vectors, partial(_reranked_top_k, compact=compact, matrix=matrix, k=top_k)
+            )
+            recall = _recall(approx_top, exact_top, top_k)
+            modes.append({"mode": mode, "bytes": compact.nbytes, "recall": round(recall, 4), "mean_ms": mean_ms})
+
+        yield (1.0, "Complete")
+        result_obj.result = f"Quantization report for '{index_name}' ({len(query_vectors)} queries, k={top_k})"
+        result_obj.output = IndexQuantizationOutput(
+            errors=[],
+            warnings=[],
+            index_name=index_name,
+            embedding_model=embedding_model,
+            chunk_count=int(matrix.shape[0]),
+            k=top_k,
+            query_count=len(query_vectors),
+            modes=modes,
+        ).model_dump(mode="python")
+        result_obj.success = True
+
+    return StageResult(
+        announce=f"Measuring quantization for index '{name or '(default)'}'...",
+        progress_callback=do_work,
+    )
+
+
+def _fail(
+    result_obj: StageResult, k: int, result: str, error: str, index_name: str = "", embedding_model: str = ""
+) -> None:
+    result_obj.result = result
+    result_obj.output = IndexQuantizationOutput(
+        errors=[error],
+        warnings=[],
+        index_name=index_name,
+        embedding_model=embedding_model,
+        chunk_count=0,
+        k=k,
+        query_count=0,
+        modes=[],
+    ).model_dump(mode="python")
+    result_obj.success = False
+
+
+def _sample_queries(matrix: np.ndarray, queries: int) -> np.ndarray:
+    sample = np.random.default_rng(0).choice(matrix.shape[0], size=min(queries, matrix.shape[0]), replace=False)
+    return np.asarray(matrix[np.sort(sample)], dtype=np.float32)
+
+
+def _measure(
+    query_vectors: np.ndarray,
+    top_k: Callable[[np.ndarray], list[int]],
+) -> tuple[float, list[list[int]]]:
+    results: list[list[int]] = []
+    start = perf_counter()
+    for query in query_vectors:
+        results.append(top_k(query))
+    elapsed_ms = (perf_counter() - start) * 1000.0 / max(len(query_vectors), 1)
+    return round(elapsed_ms, 3), results
+
+
+def _recall(found: list[list[int]], expected: list[list[int]], k: int) -> float:
+    overlaps = [len(set(hits) & set(truth)) / k for hits, truth in zip(found, expected, strict=True)]
+    return float(np.mean(overlaps))
+
+
+def _exact_top_k(query: np.ndarray, matrix: np.ndarray, k: int) -> list[int]:
+    return _top_indices(cosine_scores(query, matrix), k).tolist()
+
+
+def _reranked_top_k(query: np.ndarray, compact: _QuantizedMatrix, matrix: np.ndarray, k: int) -> list[int]:
+    approx = cosine_scores(query, compact.values, compact.scales)
+    candidates = np.sort(_top_indices(approx, max(_RERANK_CANDIDATES, k)))
+    exact = cosine_scores(query, np.asarray(matrix[candidates]))
+    return candidates[_top_indices(exact, k)].tolist()
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
@@ -0,0 +1,21 @@
+from typing import Any
+
+
+def post_reset(config: Any) -> None:
+    from ..database.Database import Database
+    from ._EmptyUris import _EmptyUris
+    from ._IndexGenerations import _IndexGenerations
+    from ._PostingStore import _PostingStore
+    from ._TrigramStore import _TrigramStore
+
+    with Database(config.database, "index") as db:
+        _PostingStore(db).clear()
+        _TrigramStore(db).clear()
+        _EmptyUris(db).clear()
+        if config.index is None:
+            return
+        generations = _IndexGenerations(db)
+        for index_name, spec in config.index.indexes.items():
+            generations.bump(index_name)
+            if spec.embedding_model is not None:
+                generations.bump(index_name, spec.embedding_model)
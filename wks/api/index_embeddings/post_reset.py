@@ -0,0 +1,17 @@
+from typing import Any
+
+
+def post_reset(config: Any) -> None:
+    from ..database.Database import Database
+    from ..index._EmbeddingMatrix import _EmbeddingMatrix
+    from ..index._IndexGenerations import _IndexGenerations
+
+    if config.index is None:
+        return
+    with Database(config.database, "index_embeddings") as db:
+        generations = _IndexGenerations(db)
+        for index_name, spec in config.index.indexes.items():
+            if spec.embedding_model is None:
+                continue
+            _EmbeddingMatrix(index_name, spec.embedding_model).invalidate()
+            generations.bump(index_name, spec.embedding_model)
@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+from ..config.URI import URI
+
+
+@dataclass(frozen=True, slots=True)
+class _SearchFilter:
+    uri_prefix: str = ""
+    extensions: tuple[str, ...] = ()
+    min_priority: float | None = None
+
+    @classmethod
+    def build(
+        cls, uri_prefix: str = "", extensions: list[str] | None = None, min_priority: float | None = None
+    ) -> "_SearchFilter":
+        prefix = str(URI.from_any(uri_prefix.strip())) if uri_prefix.strip() else ""
+        normalized = sorted({ext.strip().lstrip(".").lower() for ext in extensions or [] if ext.strip().lstrip(".")})
+        return cls(uri_prefix=prefix, extensions=tuple(normalized), min_priority=min_priority)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.uri_prefix or self.extensions or self.min_priority is not None)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections.abc import Hashable
+from threading import RLock
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..config.WKSConfig import WKSConfig
+from ..database.Database import Database
+from ..index._Chunk import _Chunk
+from ..index._ChunkStore import _ChunkStore
+from ..index._collection_fingerprint import _collection_fingerprint
+from ._row_ids import _row_ids
+from ._SearchFilter import _SearchFilter
+from ._SearchTimings import _mark_cache, _timed
+from ._UriFilterIndex import _UriFilterIndex
+
+if TYPE_CHECKING:
+    from ._SearchRuntime import _LexicalIndexState, _SemanticIndexState
+
+
+class _SearchFilterResolver:
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._node_priorities: tuple[Hashable, dict[str, float]] | None = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._node_priorities = None
+
+    def semantic_rows(self, config: WKSConfig, state: _SemanticIndexState, search_filter: _SearchFilter) -> np.ndarray:
+        with self._lock:
+            filters = state.filters
+        if filters is None:
+            with _timed("filter_build"):
+                filters = _UriFilterIndex(state.uris, state.uri_ids)
+            with self._lock:
+                state.filters = filters
+        return filters.rows(search_filter, self._priorities_for(config, search_filter))
+
+    def lexical_ids(
+        self,
+        config: WKSConfig,
+        store: _ChunkStore,
+        index_name: str,
+        state: _LexicalIndexState,
+        search_filter: _SearchFilter,
+    ) -> np.ndarray:
+        with self._lock:
+            filters = state.filters
+        if filters is None:
+            with _timed("filter_build"):
+                rows = store.chunk_uris(index_name)
+                uris, uri_ids, _ = _row_ids(rows)
+                chunk_ids = np.fromiter((chunk_id for _, chunk_id in rows), dtype=np.int64, count=len(rows))
+                filters = _UriFilterIndex(uris, uri_ids, chunk_ids)
+            with self._lock:
+                state.filters = filters
+        return filters.rows(search_filter, self._priorities_for(config, search_filter))
+
+    def filter_chunks(self, config: WKSConfig, chunks: list[_Chunk], search_filter: _SearchFilter) -> list[_Chunk]:
+        uris, uri_ids, _ = _row_ids([(chunk.canonical_uri or chunk.uri, 0) for chunk in chunks])
+        rows = _UriFilterIndex(uris, uri_ids).rows(search_filter, self._priorities_for(config, search_filter))
+        return [chunks[row] for row in rows.tolist()]
+
+    def _priorities_for(
+        self, config: WKSConfig, search_filter: _SearchFilter
+    ) -> tuple[Hashable, dict[str, float]] | None:
+        if search_filter.min_priority is None:
+            return None
+        node_filter = {"local_uri": {"$exists": True}}
+        with Database(config.database, "nodes") as db:
+            meta = db.find_one({"_id": "__meta__"}, {"_id": 0, "last_sync": 1})
+            version = (meta.get("last_sync") if meta else None, _collection_fingerprint(db, node_filter))
+            with self._lock:
+                cached = self._node_priorities
+                if cached is not None and cached[0] == version:
+                    _mark_cache("node_priorities", True)
+                    return cached
+            _mark_cache("node_priorities", False)
+            priorities = {
+                str(doc["local_uri"]): float(doc.get("priority", 0.0))
+                for doc in db.find(node_filter, {"_id": 0, "local_uri": 1, "priority": 1})
+            }
+        entry: tuple[Hashable, dict[str, float]] = (version, priorities)
+        with self._lock:
+            self._node_priorities = entry
+        return entry
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import re
+from collections import defaultdict
 from dataclasses import dataclass
+from hashlib import sha256
 from threading import RLock
 from typing import Any
 
@@ -11,29 +14,85 @@ from ..config.WKSConfig import WKSConfig
 from ..database.Database import Database
 from ..index._Chunk import _Chunk
 from ..index._ChunkStore import _ChunkStore
+from ..index._collection_fingerprint import _collection_fingerprint, _CollectionFingerprint
+from ..index._DocumentCentroids import _build_document_centroids, _DocumentCentroids
+from ..index._EmbeddingMatrix import _EmbeddingMatrix, _MatrixSnapshot
 from ..index._EmbeddingStore import _EmbeddingStore
+from ..index._IvfLists import _build_ivf_lists, _IvfLists
+from ..index._PostingStore import _PostingStats
+from ..index._QuantizedMatrix import _quantize_matrix, _QuantizedMatrix
+from ..index._ShardedMatrix import _SHARD_MIN_ROWS, _ShardedMatrix
+from ..index._tokenize import tokenize
+from ._bm25 import _build_term_postings, _restrict_postings, _TermPostings, _top_k_postings
+from ._QueryEmbeddingCache import _QueryEmbeddingCache
+from ._row_ids import _row_ids
+from ._SearchFilter import _SearchFilter
+from ._SearchFilterResolver import _SearchFilterResolver
+from ._SearchTimings import _mark_cache, _timed
+from ._UriFilterIndex import _UriFilterIndex
 
-
-@dataclass(frozen=True, slots=True)
-class _CollectionFingerprint:
-    count: int
-    newest_id: str | None
+_MAX_CACHED_TERMS = 4096
+_QUERY_EMBEDDING_CACHE_BYTES = 16 * 1024 * 1024
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
 @dataclass(slots=True)
 class _LexicalIndexState:
-    fingerprint: _CollectionFingerprint
+    generation: int
+    total_chunks: int
+    stats: _PostingStats | None
+    postings: dict[str, _TermPostings]
+    filters: _UriFilterIndex | None = None
+    has_trigrams: bool | None = None
+
+
+@dataclass(slots=True)
+class _LexicalSearchResult:
+    total_chunks: int
     chunks: list[_Chunk]
-    corpus: list[list[str]]
-    bm25: Any | None
+    scores: list[float] | None
 
 
 @dataclass(slots=True)
 class _SemanticIndexState:
+    index_name: str
+    embedding_model: str
     fingerprint: _CollectionFingerprint
-    docs: list[dict[str, Any]]
+    generation: int
+    uris: list[str]
+    uri_ids: np.ndarray
+    chunk_indexes: np.ndarray
     matrix: np.ndarray
-    path_segments: list[frozenset[str]]
+    segment_rows: dict[str, np.ndarray]
+    quantization: str = "none"
+    compact: _QuantizedMatrix | None = None
+    ivf: _IvfLists | None = None
+    matrix_version: int | None = None
+    shard_count: int = 1
+    shards: _ShardedMatrix | None = None
+    filters: _UriFilterIndex | None = None
+    doc_centroids: _DocumentCentroids | None = None
+    live_rows: np.ndarray | None = None
+
+    @property
+    def row_count(self) -> int:
+        return len(self.uri_ids)
+
+    def vectors(self, rows: np.ndarray | list[int]) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        return np.asarray(self.matrix[rows if self.live_rows is None else self.live_rows[rows]])
+
+    def scores(self, query_embedding: np.ndarray) -> np.ndarray:
+        from ..index._embedding_utils import cosine_scores
+
+        scores = cosine_scores(query_embedding, self.matrix)
+        return scores if self.live_rows is None else scores[self.live_rows]
+
+    def row_uri(self, row: int) -> str:
+        return self.uris[int(self.uri_ids[row])]
+
+    def row_key(self, row: int) -> tuple[str, int]:
+        return self.row_uri(row), int(self.chunk_indexes[row])
 
 
 class _SearchRuntime:
@@ -44,6 +103,8 @@ class _SearchRuntime:
         self._config_mtime_ns: int | None = None
         self._lexical_states: dict[str, _LexicalIndexState] = {}
         self._semantic_states: dict[tuple[str, str], _SemanticIndexState] = {}
+        self._query_embeddings = _QueryEmbeddingCache(_QUERY_EMBEDDING_CACHE_BYTES)
+        self._filters = _SearchFilterResolver()
 
     def reset(self) -> None:
         with self._lock:
@@ -52,6 +113,8 @@ class _SearchRuntime:
             self._config_mtime_ns = None
             self._lexical_states.clear()
             self._semantic_states.clear()
+        self._query_embeddings.clear()
+        self._filters.reset()
 
     def load_config(self) -> WKSConfig:
         path = WKSConfig.get_config_path()
@@ -60,10 +123,13 @@ class _SearchRuntime:
             mtime_ns = path.stat().st_mtime_ns
             with self._lock:
                 if self._config is not None and self._config_path == path_value and self._config_mtime_ns == mtime_ns:
+                    _mark_cache("config", True)
                     return self._config
         else:
+            _mark_cache("config", False)
             return WKSConfig.load()
 
+        _mark_cache("config", False)
         config = WKSConfig.load()
         with self._lock:
             self._config = config
@@ -71,92 +137,337 @@ class _SearchRuntime:
             self._config_mtime_ns = mtime_ns
             self._lexical_states.clear()
             self._semantic_states.clear()
+        if config.index is not None:
+            self._query_embeddings.retain_models(
+                {spec.embedding_model for spec in config.index.indexes.values() if spec.embedding_model is not None}
+            )
         return config
 
-    def get_lexical_index_state(self, config: WKSConfig, index_name: str) -> _LexicalIndexState:
+    def search_lexical_chunks(
+        self,
+        config: WKSConfig,
+        index_name: str,
+        query: str,
+        limit: int,
+        search_filter: _SearchFilter | None = None,
+        fuzzy: bool = False,
+    ) -> _LexicalSearchResult:
+        active_filter = search_filter if search_filter is not None and search_filter.active else None
         with Database(config.database, "index") as db:
-            fingerprint = _collection_fingerprint(db, {"index_name": index_name})
-            with self._lock:
-                cached = self._lexical_states.get(index_name)
-                if cached is not None and cached.fingerprint == fingerprint:
-                    return cached
-            chunks = _ChunkStore(db).get_all(index_name)
+            store = _ChunkStore(db)
+            state = self._get_lexical_state(store, index_name)
+            if state.total_chunks == 0:
+                return _LexicalSearchResult(total_chunks=0, chunks=[], scores=None)
+            if fuzzy:
+                return self._search_fuzzy(config, store, index_name, state, query, limit, active_filter)
+            stats = state.stats
+            if stats is None or stats.chunk_count != state.total_chunks:
+                return self._search_text(config, store, index_name, state, query, limit, active_filter)
+            terms = list(dict.fromkeys(tokenize(query)))
+            with _timed("postings"):
+                term_postings = self._get_term_postings(store, index_name, state, stats, terms)
+            if active_filter is not None:
+                with _timed("filter"):
+                    allowed_ids = self._filters.lexical_ids(config, store, index_name, state, active_filter)
+                    term_postings = [_restrict_postings(postings, allowed_ids) for postings in term_postings]
+            with _timed("scoring"):
+                chunks, chunk_scores = _top_lexical_chunks(store, index_name, term_postings, limit)
+        return _LexicalSearchResult(total_chunks=state.total_chunks, chunks=chunks, scores=chunk_scores)
 
-        corpus = [chunk.text.lower().split() for chunk in chunks]
-        bm25: Any | None = None
-        if corpus:
-            from rank_bm25 import BM25Okapi
+    def _search_fuzzy(
+        self,
+        config: WKSConfig,
+        store: _ChunkStore,
+        index_name: str,
+        state: _LexicalIndexState,
+        query: str,
+        limit: int,
+        search_filter: _SearchFilter | None,
+    ) -> _LexicalSearchResult:
+        if not self._has_trigrams(store, index_name, state):
+            raise RuntimeError(
+                f"Trigram index is incomplete for '{index_name}'; fuzzy search is unavailable. Run: wksc index optimize"
+            )
+        allowed_ids = None
+        if search_filter is not None:
+            with _timed("filter"):
+                allowed_ids = self._filters.lexical_ids(config, store, index_name, state, search_filter)
+        with _timed("scoring"):
+            chunks, chunk_scores = store.search_trigrams(index_name, query, max(limit * 3, 30), allowed_ids=allowed_ids)
+        return _LexicalSearchResult(total_chunks=state.total_chunks, chunks=chunks, scores=chunk_scores)
 
-            bm25 = BM25Okapi(corpus)
+    def _search_text(
+        self,
+        config: WKSConfig,
+        store: _ChunkStore,
+        index_name: str,
+        state: _LexicalIndexState,
+        query: str,
+        limit: int,
+        search_filter: _SearchFilter | None,
+    ) -> _LexicalSearchResult:
+        with _timed("scoring"):
+            candidates = store.search_text(
+                index_name, query, _lexical_candidate_limit(limit), self._has_trigrams(store, index_name, state)
+            )
+        if search_filter is not None:
+            with _timed("filter"):
+                candidates = self._filters.filter_chunks(config, candidates, search_filter)
+        return _LexicalSearchResult(total_chunks=state.total_chunks, chunks=candidates, scores=None)
 
-        state = _LexicalIndexState(
-            fingerprint=fingerprint,
-            chunks=chunks,
-            corpus=corpus,
-            bm25=bm25,
-        )
+    def _has_trigrams(self, store: _ChunkStore, index_name: str, state: _LexicalIndexState) -> bool:
+        if state.has_trigrams is None:
+            state.has_trigrams = store.has_trigrams(index_name)
+        return state.has_trigrams
+
+    def semantic_filter_rows(
+        self, config: WKSConfig, state: _SemanticIndexState, search_filter: _SearchFilter
+    ) -> np.ndarray:
+        return self._filters.semantic_rows(config, state, search_filter)
+
+    def document_centroids(self, state: _SemanticIndexState) -> _DocumentCentroids:
+        with self._lock:
+            centroids = state.doc_centroids
+        if centroids is None:
+            with _timed("doc_centroids_build"):
+                centroids = _build_document_centroids(
+                    state.matrix, state.uri_ids, state.chunk_indexes, len(state.uris), state.live_rows
+                )
+            with self._lock:
+                state.doc_centroids = centroids
+        return centroids
+
+    def get_lexical_chunk_count(self, config: WKSConfig, index_name: str) -> int:
+        with Database(config.database, "index") as db:
+            return self._get_lexical_state(_ChunkStore(db), index_name).total_chunks
+
+    def _get_lexical_state(self, store: _ChunkStore, index_name: str) -> _LexicalIndexState:
+        with _timed("generation_check"):
+            generation = store.generation(index_name)
+        with self._lock:
+            cached = self._lexical_states.get(index_name)
+            if cached is not None and cached.generation == generation:
+                _mark_cache(f"lexical_state:{index_name}", True)
+                return cached
+        _mark_cache(f"lexical_state:{index_name}", False)
+        with _timed("state_build"):
+            state = _LexicalIndexState(
+                generation=generation,
+                total_chunks=store.count(index_name),
+                stats=store.posting_stats(index_name),
+                postings={},
+            )
         with self._lock:
             self._lexical_states[index_name] = state
         return state
 
-    def search_lexical_chunks(
+    def _get_term_postings(
         self,
-        config: WKSConfig,
+        store: _ChunkStore,
         index_name: str,
-        query: str,
-        limit: int,
-    ) -> tuple[int, list[_Chunk]]:
-        with Database(config.database, "index") as db:
-            store = _ChunkStore(db)
-            total_chunks = store.count(index_name)
-            if total_chunks == 0:
-                return total_chunks, []
-            return total_chunks, store.search_text(index_name, query, limit)
+        state: _LexicalIndexState,
+        stats: _PostingStats,
+        terms: list[str],
+    ) -> list[_TermPostings]:
+        with self._lock:
+            cached = dict(state.postings)
+        missing = [term for term in terms if term not in cached]
+        if missing:
+            rows_by_term = store.postings(index_name, missing)
+            loaded = {term: _build_term_postings(rows, stats) for term, rows in rows_by_term.items()}
+            cached.update(loaded)
+            with self._lock:
+                while len(state.postings) + len(loaded) > _MAX_CACHED_TERMS and state.postings:
+                    del state.postings[next(iter(state.postings))]
+                state.postings.update(loaded)
+        return [cached[term] for term in terms]
 
     def get_semantic_index_state(
         self,
         config: WKSConfig,
         index_name: str,
         embedding_model: str,
+        quantization: str = "none",
+        shard_count: int = 1,
     ) -> _SemanticIndexState:
         key = (index_name, embedding_model)
         collection_filter = {"index_name": index_name, "embedding_model": embedding_model}
         with Database(config.database, "index_embeddings") as db:
-            fingerprint = _collection_fingerprint(db, collection_filter)
+            store = _EmbeddingStore(db)
+            with _timed("generation_check"):
+                generation = store.generation(index_name, embedding_model)
+                matrix_file = _EmbeddingMatrix(index_name, embedding_model)
+                version = matrix_file.version()
             with self._lock:
                 cached = self._semantic_states.get(key)
-                if cached is not None and cached.fingerprint == fingerprint:
+                if (
+                    cached is not None
+                    and cached.generation == generation
+                    and cached.quantization == quantization
+                    and cached.matrix_version == version
+                    and cached.shard_count == shard_count
+                ):
+                    _mark_cache(f"semantic_state:{index_name}", True)
                     return cached
-            docs = _EmbeddingStore(db).get_all(index_name=index_name, embedding_model=embedding_model)
-
-        if docs:
-            matrix = np.asarray([doc["embedding"] for doc in docs], dtype=np.float32)
-            path_segments = [_extract_path_segments(doc["uri"]) for doc in docs]
-        else:
-            matrix = np.empty((0, 0), dtype=np.float32)
-            path_segments = []
-
-        state = _SemanticIndexState(
-            fingerprint=fingerprint,
-            docs=docs,
-            matrix=matrix,
-            path_segments=path_segments,
-        )
+            _mark_cache(f"semantic_state:{index_name}", False)
+            with _timed("fingerprint"):
+                fingerprint = _collection_fingerprint(db, collection_filter)
+            with _timed("state_build"):
+                snapshot = matrix_file.load()
+                if snapshot is None or snapshot.fingerprint != fingerprint:
+                    snapshot = _load_matrix(store, matrix_file, fingerprint, index_name, embedding_model)
+        with _timed("state_build"):
+            state = _build_semantic_state(
+                index_name, embedding_model, fingerprint, generation, snapshot, quantization, shard_count
+            )
         with self._lock:
             self._semantic_states[key] = state
         return state
 
+    def get_semantic_chunks(
+        self,
+        config: WKSConfig,
+        state: _SemanticIndexState,
+        rows: list[int],
+    ) -> list[dict[str, Any] | None]:
+        keys = [state.row_key(row) for row in rows]
+        with Database(config.database, "index_embeddings") as db:
+            by_key = _EmbeddingStore(db).get_chunks(state.index_name, state.embedding_model, keys)
+        return [by_key.get(key) for key in keys]
+
+    def get_query_embedding(self, key: tuple[Any, ...] | None) -> np.ndarray | None:
+        return self._query_embeddings.get(key) if key is not None else None
+
+    def put_query_embedding(self, key: tuple[Any, ...] | None, vector: np.ndarray) -> None:
+        if key is not None:
+            self._query_embeddings.put(key, vector)
+
+    def query_embedding_stats(self) -> dict[str, int]:
+        return self._query_embeddings.stats()
+
+    def has_semantic_ann(self, index_name: str, embedding_model: str) -> bool:
+        return _EmbeddingMatrix(index_name, embedding_model).has_centroids()
+
     def count_semantic_embeddings(self, config: WKSConfig, index_name: str, embedding_model: str) -> int:
         with Database(config.database, "index_embeddings") as db:
             return db.count_documents({"index_name": index_name, "embedding_model": embedding_model})
 
 
-def _collection_fingerprint(db: Database, filter_doc: dict[str, Any]) -> _CollectionFingerprint:
-    collection = db.get_database()[db.name]
-    count = collection.count_documents(filter_doc)
-    newest_doc = collection.find_one(filter_doc, {"_id": 1}, sort=[("_id", -1)])
-    newest_id = str(newest_doc["_id"]) if newest_doc is not None else None
-    return _CollectionFingerprint(count=count, newest_id=newest_id)
+def _build_semantic_state(
+    index_name: str,
+    embedding_model: str,
+    fingerprint: _CollectionFingerprint,
+    generation: int,
+    snapshot: _MatrixSnapshot,
+    quantization: str,
+    shard_count: int,
+) -> _SemanticIndexState:
+    matrix = snapshot.matrix
+    shards = None
+    if shard_count > 1 and quantization == "none" and len(snapshot.rows) >= _SHARD_MIN_ROWS:
+        shards = _ShardedMatrix(matrix, shard_count, snapshot.live_rows)
+        matrix = shards.matrix
+    ivf = None
+    if snapshot.centroids is not None and snapshot.lists is not None:
+        ivf = _build_ivf_lists(snapshot.centroids, snapshot.lists)
+    uris, uri_ids, chunk_indexes = _row_ids(snapshot.rows)
+    return _SemanticIndexState(
+        index_name=index_name,
+        embedding_model=embedding_model,
+        fingerprint=fingerprint,
+        generation=generation,
+        uris=uris,
+        uri_ids=uri_ids,
+        chunk_indexes=chunk_indexes,
+        matrix=matrix,
+        segment_rows=_segment_rows(uris, uri_ids),
+        quantization=quantization,
+        compact=(
+            _quantize_matrix(matrix, quantization, snapshot.live_rows)
+            if quantization != "none" and snapshot.rows
+            else None
+        ),
+        ivf=ivf,
+        matrix_version=snapshot.version,
+        shard_count=shard_count,
+        shards=shards,
+        live_rows=snapshot.live_rows,
+    )
+
+
+def _top_lexical_chunks(
+    store: _ChunkStore,
+    index_name: str,
+    term_postings: list[_TermPostings],
+    limit: int,
+) -> tuple[list[_Chunk], list[float]]:
+    depth = max(limit * 3, 30)
+    while True:
+        chunk_ids, scores = _top_k_postings(term_postings, depth)
+        by_id = store.get_by_ids(index_name, chunk_ids.tolist())
+        ranked = [
+            (by_id[chunk_id], score)
+            for chunk_id, score in zip(chunk_ids.tolist(), scores.tolist(), strict=True)
+            if chunk_id in by_id
+        ]
+        if len(chunk_ids) < depth or len({chunk.uri for chunk, _ in ranked}) >= limit:
+            return [chunk for chunk, _ in ranked], [score for _, score in ranked]
+        depth *= 4
+
+
+def _lexical_candidate_limit(k: int) -> int:
+    return min(max(k * 200, 1000), 10000)
+
+
+def _load_matrix(
+    store: _EmbeddingStore,
+    matrix_file: _EmbeddingMatrix,
+    fingerprint: _CollectionFingerprint,
+    index_name: str,
+    embedding_model: str,
+) -> _MatrixSnapshot:
+    docs, matrix = store.get_all(index_name, embedding_model)
+    rows = [(str(doc["uri"]), int(doc["chunk_index"])) for doc in docs]
+    try:
+        matrix_file.write(fingerprint, rows, matrix)
+    except OSError:
+        matrix_file.invalidate()
+    else:
+        snapshot = matrix_file.load()
+        if snapshot is not None and snapshot.rows == rows:
+            return snapshot
+    return _MatrixSnapshot(fingerprint=fingerprint, rows=rows, matrix=matrix, version=None)
+
+
+def _segment_rows(uris: list[str], uri_ids: np.ndarray) -> dict[str, np.ndarray]:
+    ids_by_segment: dict[str, list[int]] = defaultdict(list)
+    for uri_id, uri in enumerate(uris):
+        for segment in _extract_path_segments(uri):
+            ids_by_segment[segment].append(uri_id)
+    order = np.argsort(uri_ids, kind="stable")
+    offsets = np.searchsorted(uri_ids[order], np.arange(len(uris) + 1))
+    return {
+        segment: np.sort(np.concatenate([order[offsets[uri_id] : offsets[uri_id + 1]] for uri_id in ids]))
+        for segment, ids in ids_by_segment.items()
+    }
+
+
+def _query_embedding_key(
+    embedding_model: str,
+    embedding_mode: str,
+    query: str,
+    query_image: str,
+    image_text_weight: float | None,
+) -> tuple[Any, ...] | None:
+    image_checksum = ""
+    if query_image.strip():
+        try:
+            image_checksum = sha256(URI.from_any(query_image.strip()).path.read_bytes()).hexdigest()
+        except (OSError, ValueError):
+            return None
+    text = _WHITESPACE_RE.sub(" ", query).strip()
+    weight = image_text_weight if text and image_checksum else None
+    return (embedding_model, embedding_mode, text, image_checksum, weight)
 
 
 def _extract_path_segments(uri: str) -> frozenset[str]:
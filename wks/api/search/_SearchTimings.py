@@ -0,0 +1,83 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+class _SearchTimings:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._started = perf_counter()
+        self._phases: dict[str, float] = {}
+        self._cache: dict[str, bool] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[phase] = self._phases.get(phase, 0.0) + seconds
+
+    def mark_cache(self, key: str, hit: bool) -> None:
+        with self._lock:
+            self._cache[key] = self._cache.get(key, True) and hit
+
+    def output(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "total_ms": _ms(perf_counter() - self._started),
+                "phases": {phase: _ms(seconds) for phase, seconds in self._phases.items()},
+                "cache": dict(self._cache),
+            }
+
+
+_CURRENT_TIMINGS: ContextVar[_SearchTimings | None] = ContextVar("wks_search_timings", default=None)
+
+
+@contextmanager
+def _collect_timings(enabled: bool) -> Iterator[_SearchTimings | None]:
+    if not enabled:
+        yield None
+        return
+    timings = _SearchTimings()
+    token = _CURRENT_TIMINGS.set(timings)
+    try:
+        yield timings
+    finally:
+        _CURRENT_TIMINGS.reset(token)
+
+
+@contextmanager
+def _timed(phase: str, timings: _SearchTimings | None = None) -> Iterator[None]:
+    timings = timings if timings is not None else _CURRENT_TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, perf_counter() - started)
+
+
+def _run_timed(timings: _SearchTimings | None, phase: str, func: Callable[[], _T]) -> _T:
+    if timings is None:
+        return func()
+    token = _CURRENT_TIMINGS.set(timings)
+    started = perf_counter()
+    try:
+        return func()
+    finally:
+        timings.add(phase, perf_counter() - started)
+        _CURRENT_TIMINGS.reset(token)
+
+
+def _mark_cache(key: str, hit: bool) -> None:
+    timings = _CURRENT_TIMINGS.get()
+    if timings is not None:
+        timings.mark_cache(key, hit)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field, replace
+from threading import Event, Lock, Thread
+from typing import Literal
+
+import numpy as np
+
+from ..config.WKSConfig import WKSConfig
+from ..index._IndexSpec import _IndexSpec
+from ._build_query_embedding import build_query_embedding
+from ._SearchRuntime import _SEARCH_RUNTIME
+
+_WARMUP_QUERY = "warmup"
+
+_WarmupState = Literal["idle", "running", "ready"]
+
+
+@dataclass(frozen=True, slots=True)
+class _WarmupStatus:
+    state: _WarmupState = "idle"
+    models: list[str] = field(default_factory=list)
+    indexes: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+class _SearchWarmup:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._done = Event()
+        self._status = _WarmupStatus()
+
+    def start(self, config: WKSConfig | None = None) -> bool:
+        with self._lock:
+            if self._status.state == "running":
+                return False
+            self._status = _WarmupStatus(state="running")
+            self._done = Event()
+        Thread(target=self._run, args=(config,), name="wks-search-warmup", daemon=True).start()
+        return True
+
+    def wait(self, timeout: float | None = None) -> bool:
+        with self._lock:
+            done = self._done
+        return done.wait(timeout)
+
+    def status(self) -> _WarmupStatus:
+        with self._lock:
+            return self._status
+
+    def _run(self, config: WKSConfig | None) -> None:
+        try:
+            self._warm_indexes(config or _SEARCH_RUNTIME.load_config())
+        except Exception as exc:
+            self._record(errors=[f"config: {exc}"])
+        with self._lock:
+            self._status = replace(self._status, state="ready")
+            self._done.set()
+
+    def _warm_indexes(self, config: WKSConfig) -> None:
+        warmed_models: set[tuple[str, str]] = set()
+        indexes = config.index.indexes if config.index is not None else {}
+        for index_name, spec in indexes.items():
+            try:
+                if spec.embedding_model is None:
+                    _SEARCH_RUNTIME.get_lexical_chunk_count(config, index_name)
+                else:
+                    model_key = (spec.embedding_model, spec.embedding_mode)
+                    if model_key not in warmed_models:
+                        _warm_model(spec.embedding_model, spec)
+                        warmed_models.add(model_key)
+                        self._record(models=[spec.embedding_model])
+                    state = _SEARCH_RUNTIME.get_semantic_index_state(
+                        config, index_name, spec.embedding_model, spec.quantization, spec.scoring_shards
+                    )
+                    if spec.doc_candidates and state.row_count:
+                        _SEARCH_RUNTIME.document_centroids(state)
+                    if state.shards is not None:
+                        state.shards.top_k(np.zeros(state.matrix.shape[1], dtype=np.float32), 1)
+                self._record(indexes=[index_name])
+            except Exception as exc:
+                self._record(errors=[f"{index_name}: {exc}"])
+
+    def _record(
+        self, *, models: list[str] | None = None, indexes: list[str] | None = None, errors: list[str] | None = None
+    ) -> None:
+        with self._lock:
+            status = self._status
+            self._status = replace(
+                status,
+                models=status.models + (models or []),
+                indexes=status.indexes + (indexes or []),
+                errors=status.errors + (errors or []),
+            )
+
+
+def _warm_model(embedding_model: str, spec: _IndexSpec) -> None:
+    build_query_embedding(
+        query=_WARMUP_QUERY,
+        query_image="",
+        embedding_model=embedding_model,
+        embedding_mode=spec.embedding_mode,
+        image_text_weight=spec.image_text_weight,
+    )
+
+
+_SEARCH_WARMUP = _SearchWarmup()
@@ -0,0 +1,95 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from collections.abc import Hashable
+from threading import Lock
+
+import numpy as np
+
+from ..config.URI import URI
+from ._SearchFilter import _SearchFilter
+
+_MAX_CACHED_FILTERS = 32
+
+
+class _UriFilterIndex:
+    def __init__(self, uris: list[str], uri_ids: np.ndarray, row_ids: np.ndarray | None = None):
+        self.uris = [str(URI.from_any(uri)) for uri in uris]
+        self._uri_ids = uri_ids
+        self._row_ids = row_ids
+        order = sorted(range(len(self.uris)), key=self.uris.__getitem__)
+        self._sorted_uris = [self.uris[uri_id] for uri_id in order]
+        self._sorted_ids = np.asarray(order, dtype=np.int64)
+        buckets: dict[str, list[int]] = defaultdict(list)
+        for uri_id, uri in enumerate(self.uris):
+            buckets[_extension(uri)].append(uri_id)
+        self._extension_ids = {ext: np.asarray(ids, dtype=np.int64) for ext, ids in buckets.items()}
+        self._lock = Lock()
+        self._priority_version: Hashable | None = None
+        self._priorities = np.empty(0, dtype=np.float64)
+        self._rows: OrderedDict[tuple[_SearchFilter, Hashable | None], np.ndarray] = OrderedDict()
+
+    def rows(
+        self,
+        search_filter: _SearchFilter,
+        priorities: tuple[Hashable, dict[str, float]] | None = None,
+    ) -> np.ndarray:
+        key = (search_filter, priorities[0] if priorities is not None else None)
+        with self._lock:
+            cached = self._rows.get(key)
+            if cached is not None:
+                self._rows.move_to_end(key)
+                return cached
+        allowed = np.ones(len(self.uris), dtype=bool)
+        if search_filter.uri_prefix:
+            allowed &= self._prefix_mask(search_filter.uri_prefix)
+        if search_filter.extensions:
+            extension_mask = np.zeros(len(self.uris), dtype=bool)
+            for ext in search_filter.extensions:
+                extension_mask[self._extension_ids.get(ext, np.empty(0, dtype=np.int64))] = True
+            allowed &= extension_mask
+        if search_filter.min_priority is not None:
+            if priorities is None:
+                raise ValueError("min_priority filter requires node priorities")
+            allowed &= self._priority_array(*priorities) >= search_filter.min_priority
+        rows = np.flatnonzero(allowed[self._uri_ids])
+        if self._row_ids is not None:
+            rows = self._row_ids[rows]
+        with self._lock:
+            self._rows[key] = rows
+            while len(self._rows) > _MAX_CACHED_FILTERS:
+                self._rows.popitem(last=False)
+        return rows
+
+    def _prefix_mask(self, prefix: str) -> np.ndarray:
+        if prefix.endswith("/"):
+            ranges = [(bisect_left(self._sorted_uris, prefix), _prefix_end(self._sorted_uris, prefix))]
+        else:
+            ranges = [
+                (bisect_left(self._sorted_uris, prefix), bisect_right(self._sorted_uris, prefix)),
+                (bisect_left(self._sorted_uris, prefix + "/"), _prefix_end(self._sorted_uris, prefix + "/")),
+            ]
+        mask = np.zeros(len(self.uris), dtype=bool)
+        for start, stop in ranges:
+            mask[self._sorted_ids[start:stop]] = True
+        return mask
+
+    def _priority_array(self, version: Hashable, priorities: dict[str, float]) -> np.ndarray:
+        with self._lock:
+            if self._priority_version == version:
+                return self._priorities
+        values = np.fromiter(
+            (priorities.get(uri, -np.inf) for uri in self.uris), dtype=np.float64, count=len(self.uris)
+        )
+        with self._lock:
+            self._priority_version = version
+            self._priorities = values
+        return values
+
+
+def _prefix_end(sorted_uris: list[str], prefix: str) -> int:
+    return bisect_left(sorted_uris, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+def _extension(uri: str) -> str:
+    name = uri.rsplit("/", 1)[-1]
+    return name.rsplit(".", 1)[-1].lower() if "." in name.lstrip(".") else ""
@@ -1,7 +1,16 @@
 from wks.api.config.output_models import output_model
 
 SearchOutput = output_model(
-    "SearchOutput", "query", "index_name", "search_mode", "embedding_model", "hits", "total_chunks"
+    "SearchOutput",
+    "query",
+    "index_name",
+    "search_mode",
+    "embedding_model",
+    "hits",
+    "total_chunks",
+    "embedding_cache",
+    "timings",
 )
+SearchBatchOutput = output_model("SearchBatchOutput", "index_name", "results", "embedding_cache")
 
-__all__ = ["SearchOutput"]
+__all__ = ["SearchBatchOutput", "SearchOutput"]
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..index._PostingStore import _PostingStats
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+@dataclass(frozen=True, slots=True)
+class _TermPostings:
+    chunk_ids: np.ndarray
+    weights: np.ndarray
+    upper_bound: float
+
+
+def _bm25_idf(doc_freq: int, chunk_count: int) -> float:
+    return float(np.log(1.0 + (chunk_count - doc_freq + 0.5) / (doc_freq + 0.5)))
+
+
+def _build_term_postings(rows: list[tuple[int, int, int]], stats: _PostingStats) -> _TermPostings:
+    if not rows:
+        return _TermPostings(
+            chunk_ids=np.empty(0, dtype=np.int64),
+            weights=np.empty(0, dtype=np.float32),
+            upper_bound=0.0,
+        )
+    data = np.asarray(sorted(rows), dtype=np.float64)
+    chunk_ids = data[:, 0].astype(np.int64)
+    tf = data[:, 1]
+    length = data[:, 2]
+    avg_length = stats.avg_length
+    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * length / avg_length) if avg_length > 0 else BM25_K1
+    weights = (_bm25_idf(len(rows), stats.chunk_count) * tf * (BM25_K1 + 1.0) / (tf + norm)).astype(np.float32)
+    return _TermPostings(chunk_ids=chunk_ids, weights=weights, upper_bound=float(weights.max()))
+
+
+def _restrict_postings(postings: _TermPostings, allowed_ids: np.ndarray) -> _TermPostings:
+    if not len(postings.chunk_ids) or not len(allowed_ids):
+        return _TermPostings(chunk_ids=postings.chunk_ids[:0], weights=postings.weights[:0], upper_bound=0.0)
+    slots = np.minimum(np.searchsorted(allowed_ids, postings.chunk_ids), len(allowed_ids) - 1)
+    keep = allowed_ids[slots] == postings.chunk_ids
+    weights = postings.weights[keep]
+    return _TermPostings(
+        chunk_ids=postings.chunk_ids[keep],
+        weights=weights,
+        upper_bound=float(weights.max()) if len(weights) else 0.0,
+    )
+
+
+def _score_postings(postings: list[_TermPostings]) -> tuple[np.ndarray, np.ndarray]:
+    non_empty = [item for item in postings if len(item.chunk_ids) > 0]
+    if not non_empty:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    chunk_ids = np.concatenate([item.chunk_ids for item in non_empty])
+    weights = np.concatenate([item.weights for item in non_empty])
+    unique_ids, inverse = np.unique(chunk_ids, return_inverse=True)
+    scores = np.bincount(inverse, weights=weights).astype(np.float32)
+    order = np.argsort(-scores, kind="stable")
+    return unique_ids[order], scores[order]
+
+
+def _top_k_postings(postings: list[_TermPostings], k: int) -> tuple[np.ndarray, np.ndarray]:
+    ordered = sorted((item for item in postings if len(item.chunk_ids) > 0), key=lambda item: -item.upper_bound)
+    if not ordered or k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    remaining = [float(sum(item.upper_bound for item in ordered[i + 1 :])) for i in range(len(ordered))]
+    candidate_ids = ordered[0].chunk_ids
+    candidate_scores = ordered[0].weights.astype(np.float32)
+    accepting = True
+    for position, term in enumerate(ordered[1:], start=1):
+        threshold = _kth_score(candidate_scores, k)
+        accepting = accepting and remaining[position - 1] >= threshold
+        if accepting:
+            candidate_ids, candidate_scores = _merge_essential(candidate_ids, candidate_scores, term)
+        else:
+            candidate_ids, candidate_scores = _probe_non_essential(
+                candidate_ids, candidate_scores, term, remaining[position - 1], threshold
+            )
+    return _select_top_k(candidate_ids, candidate_scores, k)
+
+
+def _merge_essential(
+    candidate_ids: np.ndarray, candidate_scores: np.ndarray, term: _TermPostings
+) -> tuple[np.ndarray, np.ndarray]:
+    merged_ids = np.concatenate([candidate_ids, term.chunk_ids])
+    merged_weights = np.concatenate([candidate_scores, term.weights])
+    unique_ids, inverse = np.unique(merged_ids, return_inverse=True)
+    return unique_ids, np.bincount(inverse, weights=merged_weights).astype(np.float32)
+
+
+def _probe_non_essential(
+    candidate_ids: np.ndarray,
+    candidate_scores: np.ndarray,
+    term: _TermPostings,
+    remaining: float,
+    threshold: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    keep = candidate_scores + remaining >= threshold
+    candidate_ids = candidate_ids[keep]
+    candidate_scores = candidate_scores[keep]
+    slots = np.searchsorted(term.chunk_ids, candidate_ids)
+    slots[slots >= len(term.chunk_ids)] = 0
+    hits = term.chunk_ids[slots] == candidate_ids
+    candidate_scores[hits] += term.weights[slots[hits]]
+    return candidate_ids, candidate_scores
+
+
+def _select_top_k(candidate_ids: np.ndarray, candidate_scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    if len(candidate_ids) > k:
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        candidate_ids = candidate_ids[top]
+        candidate_scores = candidate_scores[top]
+    order = np.lexsort((candidate_ids, -candidate_scores))
+    return candidate_ids[order], candidate_scores[order]
+
+
+def _kth_score(scores: np.ndarray, k: int) -> float:
+    if len(scores) < k:
+        return 0.0
+    return float(np.partition(scores, len(scores) - k)[len(scores) - k])
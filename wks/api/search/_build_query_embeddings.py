@@ -0,0 +1,17 @@
+import numpy as np
+
+from ..index import _embedding_utils
+
+_QUERY_BATCH_SIZE = 64
+
+
+def build_query_embeddings(queries: list[str], embedding_model: str, embedding_mode: str) -> np.ndarray:
+    texts = [query.strip() for query in queries]
+    if not texts or not all(texts):
+        raise ValueError("query is required for text semantic search")
+    batch_size = min(len(texts), _QUERY_BATCH_SIZE)
+    if embedding_mode == "text":
+        return _embedding_utils.embed_texts(texts=texts, model_name=embedding_model, batch_size=batch_size)
+    if embedding_mode == "image_text_combo":
+        return _embedding_utils.embed_clip_texts(texts=texts, model_name=embedding_model, batch_size=batch_size)
+    raise ValueError(f"Unsupported embedding_mode: {embedding_mode}")
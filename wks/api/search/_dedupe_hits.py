@@ -1,7 +1,6 @@
-from hashlib import sha256
 from typing import Any
 
-from ..config.URI import URI
+from ..index._chunk_dedupe_keys import _chunk_dedupe_keys
 
 
 def _dedupe_hits(hits: list[dict[str, Any]], k: int) -> list[dict[str, Any]]:
@@ -10,8 +9,10 @@ def _dedupe_hits(hits: list[dict[str, Any]], k: int) -> list[dict[str, Any]]:
     seen_hashes: set[str] = set()
 
     for hit in hits:
-        canonical_uri = str(URI.from_any(hit["uri"]))
-        text_hash = sha256(hit["text"].encode("utf-8")).hexdigest()
+        canonical_uri = hit.get("canonical_uri")
+        text_hash = hit.get("text_hash")
+        if canonical_uri is None or text_hash is None:
+            canonical_uri, text_hash = _chunk_dedupe_keys(hit["uri"], hit["text"])
 
         if canonical_uri in seen_uris or text_hash in seen_hashes:
             continue
@@ -23,6 +24,8 @@ def _dedupe_hits(hits: list[dict[str, Any]], k: int) -> list[dict[str, Any]]:
                 "score": hit["score"],
                 "tokens": hit["tokens"],
                 "text": hit["text"],
+                "canonical_uri": canonical_uri,
+                "text_hash": text_hash,
             }
         )
         seen_uris.add(canonical_uri)
@@ -0,0 +1,10 @@
+import numpy as np
+
+
+def _row_ids(rows: list[tuple[str, int]]) -> tuple[list[str], np.ndarray, np.ndarray]:
+    ids_by_uri: dict[str, int] = {}
+    uri_ids = np.fromiter(
+        (ids_by_uri.setdefault(uri, len(ids_by_uri)) for uri, _ in rows), dtype=np.int32, count=len(rows)
+    )
+    chunk_indexes = np.fromiter((chunk_index for _, chunk_index in rows), dtype=np.int32, count=len(rows))
+    return list(ids_by_uri), uri_ids, chunk_indexes
@@ -12,11 +12,27 @@ def cmd(
     k: int = 10,
     query_image: str = "",
     strategy: str = "",
+    timings: bool = False,
+    uri_prefix: str = "",
+    extensions: list[str] | None = None,
+    min_priority: float | None = None,
+    fuzzy: bool = False,
 ) -> StageResult:
     def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
         yield (0.2, "Preparing search request...")
         response = search_documents(
-            SearchRequest(query=query, index=index, k=k, query_image=query_image, strategy=strategy)
+            SearchRequest(
+                query=query,
+                index=index,
+                k=k,
+                query_image=query_image,
+                strategy=strategy,
+                timings=timings,
+                uri_prefix=uri_prefix,
+                extensions=extensions or [],
+                min_priority=min_priority,
+                fuzzy=fuzzy,
+            )
         )
         yield (0.8, "Collecting search results...")
         yield (1.0, "Complete")
@@ -30,6 +46,8 @@ def cmd(
             embedding_model=response.embedding_model,
             hits=[hit.model_dump(mode="python") for hit in response.hits],
             total_chunks=response.total_chunks,
+            embedding_cache=response.embedding_cache,
+            timings=response.timings.model_dump(mode="python") if response.timings is not None else None,
         ).model_dump(mode="python")
         result_obj.success = response.success
 
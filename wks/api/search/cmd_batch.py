@@ -0,0 +1,60 @@
+from collections.abc import Iterator
+
+from wks.services.search import SearchBatchRequest, search_many
+
+from ..config.StageResult import StageResult
+from . import SearchBatchOutput
+
+
+def cmd_batch(
+    queries: list[str],
+    index: str = "",
+    k: int = 10,
+    strategy: str = "",
+    uri_prefix: str = "",
+    extensions: list[str] | None = None,
+    min_priority: float | None = None,
+    fuzzy: bool = False,
+) -> StageResult:
+    def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
+        yield (0.2, f"Preparing {len(queries)} search requests...")
+        if not queries:
+            yield (1.0, "Complete")
+            result_obj.result = "At least one query is required"
+            result_obj.output = SearchBatchOutput(
+                errors=["At least one query is required"],
+                warnings=[],
+                index_name="",
+                results=[],
+                embedding_cache={},
+            ).model_dump(mode="python")
+            result_obj.success = False
+            return
+        response = search_many(
+            SearchBatchRequest(
+                queries=queries,
+                index=index,
+                k=k,
+                strategy=strategy,
+                uri_prefix=uri_prefix,
+                extensions=extensions or [],
+                min_priority=min_priority,
+                fuzzy=fuzzy,
+            )
+        )
+        yield (0.8, "Collecting search results...")
+        yield (1.0, "Complete")
+        result_obj.result = response.message
+        result_obj.output = SearchBatchOutput(
+            errors=response.errors,
+            warnings=response.warnings,
+            index_name=response.index_name,
+            results=[result.model_dump(mode="python") for result in response.results],
+            embedding_cache=response.embedding_cache,
+        ).model_dump(mode="python")
+        result_obj.success = response.success
+
+    return StageResult(
+        announce=f"Searching for {len(queries)} queries...",
+        progress_callback=do_work,
+    )
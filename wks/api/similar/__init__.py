@@ -1,7 +1,14 @@
 from wks.api.config.output_models import output_model
 
 SimilarOutput = output_model(
-    "SimilarOutput", "query_uri", "index_name", "embedding_model", "query_chunk_count", "candidate_count", "hits"
+    "SimilarOutput",
+    "query_uri",
+    "index_name",
+    "embedding_model",
+    "query_chunk_count",
+    "candidate_count",
+    "hits",
+    "timings",
 )
 
 __all__ = ["SimilarOutput"]
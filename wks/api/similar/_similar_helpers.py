@@ -12,9 +12,12 @@ import numpy as np
 
 from ..config.URI import URI
 from ..config.WKSConfig import WKSConfig
+from ..index._DocumentCentroids import _DocumentCentroids
 from ..index._embedding_utils import cosine_scores
 from ..index._IndexSpec import _IndexSpec
-from ..search._SearchRuntime import _SemanticIndexState
+from ..index._IvfLists import _ANN_MIN_ROWS
+from ..index._QuantizedMatrix import _RERANK_CANDIDATES
+from ..search._SearchRuntime import _SEARCH_RUNTIME, _SemanticIndexState
 from .SimilarConfig import SimilarConfig
 
 
@@ -108,10 +111,15 @@ def _resolve_semantic_index(
 
 
 def _group_candidate_rows(state: _SemanticIndexState) -> dict[str, list[int]]:
-    grouped: dict[str, list[int]] = defaultdict(list)
-    for idx, doc in enumerate(state.docs):
-        grouped[_canonical_uri(doc["uri"])].append(idx)
-    return dict(grouped)
+    canonical_ids: dict[str, list[int]] = defaultdict(list)
+    for uri_id, uri in enumerate(state.uris):
+        canonical_ids[_canonical_uri(uri)].append(uri_id)
+    order = np.argsort(state.uri_ids, kind="stable")
+    offsets = np.searchsorted(state.uri_ids[order], np.arange(len(state.uris) + 1))
+    return {
+        uri: sorted(int(row) for uri_id in ids for row in order[offsets[uri_id] : offsets[uri_id + 1]])
+        for uri, ids in canonical_ids.items()
+    }
 
 
 def _collect_candidate_scores(
@@ -120,30 +128,72 @@ def _collect_candidate_scores(
     *,
     per_chunk: int,
     rrf_k: float,
+    doc_candidates: int = 0,
 ) -> dict[str, float]:
     scores: dict[str, float] = defaultdict(float)
-    if len(state.docs) == 0:
+    if state.row_count == 0:
         return {}
 
+    centroids = _SEARCH_RUNTIME.document_centroids(state) if doc_candidates else None
+    doc_count = max(doc_candidates, per_chunk) + 1
+    use_centroids = centroids is not None and centroids.document_count > doc_count
+    use_ann = state.ivf is not None and state.row_count > _ANN_MIN_ROWS
     for query_embedding in query_doc.embeddings:
-        ranked = np.argsort(-cosine_scores(query_embedding, state.matrix))
-        seen_uris: set[str] = set()
-        rank = 0
-        for idx in ranked.tolist():
-            raw_score = float(state.matrix[idx] @ query_embedding)
-            if raw_score <= 0.0:
-                continue
-            uri = _canonical_uri(state.docs[idx]["uri"])
-            if uri == query_doc.uri or uri in seen_uris:
-                continue
-            seen_uris.add(uri)
-            rank += 1
-            scores[uri] += 1.0 / (rrf_k + rank)
-            if rank >= per_chunk:
-                break
+        rows = _candidate_rows(
+            query_embedding,
+            state,
+            centroids if use_centroids else None,
+            doc_count,
+            max(_RERANK_CANDIDATES, per_chunk * 50) if use_ann else 0,
+        )
+        row_scores = (
+            state.scores(query_embedding) if rows is None else cosine_scores(query_embedding, state.vectors(rows))
+        )
+        order = np.argsort(-row_scores)
+        ranked = order if rows is None else rows[order]
+        _add_rrf_scores(scores, query_doc.uri, state, ranked, row_scores[order], per_chunk=per_chunk, rrf_k=rrf_k)
     return dict(scores)
 
 
+def _candidate_rows(
+    query_embedding: np.ndarray,
+    state: _SemanticIndexState,
+    centroids: _DocumentCentroids | None,
+    doc_count: int,
+    ann_probe: int,
+) -> np.ndarray | None:
+    if centroids is not None:
+        return centroids.rows(centroids.top_documents(query_embedding, doc_count))
+    if ann_probe and state.ivf is not None:
+        return state.ivf.probe(query_embedding, ann_probe)
+    return None
+
+
+def _add_rrf_scores(
+    scores: dict[str, float],
+    query_uri: str,
+    state: _SemanticIndexState,
+    ranked: np.ndarray,
+    ranked_scores: np.ndarray,
+    *,
+    per_chunk: int,
+    rrf_k: float,
+) -> None:
+    seen_uris: set[str] = set()
+    rank = 0
+    for idx, raw_score in zip(ranked.tolist(), ranked_scores.tolist(), strict=True):
+        if raw_score <= 0.0:
+            continue
+        uri = _canonical_uri(state.row_uri(idx))
+        if uri == query_uri or uri in seen_uris:
+            continue
+        seen_uris.add(uri)
+        rank += 1
+        scores[uri] += 1.0 / (rrf_k + rank)
+        if rank >= per_chunk:
+            break
+
+
 def _greedy_matches(similarity: np.ndarray, match_threshold: float) -> list[tuple[int, int, float]]:
     if similarity.ndim != 2:
         raise ValueError(f"similarity matrix must be 2D (found ndim={similarity.ndim})")
@@ -10,6 +10,7 @@ from ..config.URI import URI
 from ..index._build_semantic_embeddings import build_semantic_embeddings
 from ..index._SlidingWindowChunker import _SlidingWindowChunker
 from ..search._SearchRuntime import _SEARCH_RUNTIME
+from ..search._SearchTimings import _run_timed, _SearchTimings, _timed
 from ..transform.cmd_engine import cmd_engine
 from ..transform.get_content import get_content
 from . import SimilarOutput
@@ -32,10 +33,12 @@ def cmd(
     per_chunk: int | None = None,
     candidates: int | None = None,
     match_threshold: float | None = None,
+    timings: bool = False,
 ) -> StageResult:
     def do_work(result_obj: StageResult) -> Iterator[tuple[float, str]]:
         yield (0.05, "Loading configuration...")
-        config = _SEARCH_RUNTIME.load_config()
+        collector = _SearchTimings() if timings else None
+        config = _run_timed(collector, "config_load", _SEARCH_RUNTIME.load_config)
         similar_config = config.similar
         heartbeat_secs = similar_config.heartbeat_secs
 
@@ -63,6 +66,7 @@ def cmd(
                 query_chunk_count=0,
                 candidate_count=0,
                 hits=[],
+                timings=None,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -83,6 +87,7 @@ def cmd(
                 query_chunk_count=0,
                 candidate_count=0,
                 hits=[],
+                timings=None,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -101,6 +106,7 @@ def cmd(
                 query_chunk_count=0,
                 candidate_count=0,
                 hits=[],
+                timings=None,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -118,6 +124,7 @@ def cmd(
                 query_chunk_count=0,
                 candidate_count=0,
                 hits=[],
+                timings=None,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -125,33 +132,35 @@ def cmd(
         yield (0.1, "Resolved query path...")
         try:
             selected_engine = config.transform.default_engine
-            transform_result = cmd_engine(selected_engine, URI.from_path(query_path), overrides={}, output=None)
-            yield from relay_stage_with_heartbeat(
-                transform_result,
-                start_progress=0.12,
-                end_progress=0.28,
-                heartbeat_secs=heartbeat_secs,
-                idle_message="Query transform still running",
-                prefix="Query transform",
-            )
-            if not transform_result.success:
-                error = transform_result.output.get("errors", [transform_result.result])[0]
-                raise ValueError(str(error))
+            with _timed("query_transform", collector):
+                transform_result = cmd_engine(selected_engine, URI.from_path(query_path), overrides={}, output=None)
+                yield from relay_stage_with_heartbeat(
+                    transform_result,
+                    start_progress=0.12,
+                    end_progress=0.28,
+                    heartbeat_secs=heartbeat_secs,
+                    idle_message="Query transform still running",
+                    prefix="Query transform",
+                )
+                if not transform_result.success:
+                    error = transform_result.output.get("errors", [transform_result.result])[0]
+                    raise ValueError(str(error))
 
-            checksum = str(transform_result.output["checksum"])
-            text = yield from call_with_heartbeat(
-                lambda: get_content(checksum),
-                progress=0.3,
-                message="Loading transformed query content from cache...",
-                heartbeat_secs=heartbeat_secs,
-            )
+                checksum = str(transform_result.output["checksum"])
+                text = yield from call_with_heartbeat(
+                    lambda: get_content(checksum),
+                    progress=0.3,
+                    message="Loading transformed query content from cache...",
+                    heartbeat_secs=heartbeat_secs,
+                )
             if not text.strip():
                 raise ValueError(f"Query document has no textual content: {query_path}")
 
             query_uri = str(URI.from_path(query_path))
             yield (0.34, f"Chunking transformed query text ({len(text):,} chars)...")
             chunker = _SlidingWindowChunker(spec.max_tokens, spec.overlap_tokens)
-            chunks = chunker.chunk(text, query_uri)
+            with _timed("chunking", collector):
+                chunks = chunker.chunk(text, query_uri)
             if len(chunks) == 0:
                 raise ValueError(f"Query document did not produce any chunks: {query_path}")
 
@@ -169,7 +178,7 @@ def cmd(
                 )
 
             embeddings = yield from call_with_heartbeat(
-                build_query_embeddings,
+                lambda: _run_timed(collector, "query_embedding", build_query_embeddings),
                 progress=0.4,
                 message=f"Embedding {len(chunks)} query chunks with {embedding_model}...",
                 heartbeat_secs=heartbeat_secs,
@@ -200,6 +209,7 @@ def cmd(
                 query_chunk_count=0,
                 candidate_count=0,
                 hits=[],
+                timings=None,
             ).model_dump(mode="python")
             result_obj.success = False
             return
@@ -211,12 +221,18 @@ def cmd(
         candidate_limit = candidates if candidates is not None else similar_config.candidates
         match_cutoff = match_threshold if match_threshold is not None else similar_config.match_threshold
         state = yield from call_with_heartbeat(
-            lambda: _SEARCH_RUNTIME.get_semantic_index_state(config, index_name, embedding_model),
+            lambda: _run_timed(
+                collector,
+                "index_state",
+                lambda: _SEARCH_RUNTIME.get_semantic_index_state(
+                    config, index_name, embedding_model, quantization=spec.quantization, shard_count=spec.scoring_shards
+                ),
+            ),
             progress=0.55,
             message=f"Loading semantic index '{index_name}'...",
             heartbeat_secs=heartbeat_secs,
         )
-        if not state.docs:
+        if not state.row_count:
             yield (1.0, "Complete")
             error = (
                 f"No embeddings found for index '{index_name}' and model '{embedding_model}'. "
@@ -232,21 +248,30 @@ def cmd(
                 query_chunk_count=len(query_doc.chunks),
                 candidate_count=0,
                 hits=[],
+                timings=None,
             ).model_dump(mode="python")
             result_obj.success = False
             return
 
         yield (0.66, f"Collecting candidate documents from {len(query_doc.chunks)} query chunks...")
-        candidate_scores = _collect_candidate_scores(
-            query_doc,
-            state,
-            per_chunk=per_chunk_limit,
-            rrf_k=similar_config.rrf_k,
-        )
-        ranked_candidate_uris = [
-            uri for uri, _ in sorted(candidate_scores.items(), key=lambda item: item[1], reverse=True)[:candidate_limit]
-        ]
-        grouped_rows = _group_candidate_rows(state)
+        with _timed("candidate_scoring", collector):
+            candidate_scores = _collect_candidate_scores(
+                query_doc,
+                state,
+                per_chunk=per_chunk_limit,
+                rrf_k=similar_config.rrf_k,
+                doc_candidates=spec.doc_candidates,
+            )
+            ranked_candidate_uris = [
+                uri
+                for uri, _ in sorted(candidate_scores.items(), key=lambda item: item[1], reverse=True)[:candidate_limit]
+            ]
+            grouped_rows = _group_candidate_rows(state)
+            candidate_rows = [row for uri in ranked_candidate_uris for row in grouped_rows.get(uri, [])]
+        with _timed("hydrate", collector):
+            candidate_chunks = dict(
+                zip(candidate_rows, _SEARCH_RUNTIME.get_semantic_chunks(config, state, candidate_rows), strict=True)
+            )
 
         yield (0.78, f"Reranking {len(ranked_candidate_uris)} candidate documents...")
         hits: list[_CandidateMetrics] = []
@@ -256,20 +281,21 @@ def cmd(
             if idx == 1 or idx == total_candidates or idx % update_every == 0:
                 progress = 0.78 + 0.17 * (idx - 1) / max(total_candidates, 1)
                 yield (progress, f"Reranking candidate {idx}/{total_candidates}...")
-            row_indices = grouped_rows.get(candidate_uri, [])
+            row_indices = [row for row in grouped_rows.get(candidate_uri, []) if candidate_chunks[row] is not None]
             if not row_indices:
                 continue
-            candidate_docs = [state.docs[idx] for idx in row_indices]
-            candidate_matrix = state.matrix[row_indices]
-            metrics = _candidate_metrics(
-                query_doc=query_doc,
-                candidate_uri=candidate_uri,
-                candidate_docs=candidate_docs,
-                candidate_matrix=candidate_matrix,
-                initial_score=candidate_scores[candidate_uri],
-                match_threshold=match_cutoff,
-                similar_config=similar_config,
-            )
+            candidate_docs = [doc for row in row_indices if (doc := candidate_chunks[row]) is not None]
+            candidate_matrix = state.vectors(row_indices)
+            with _timed("rerank", collector):
+                metrics = _candidate_metrics(
+                    query_doc=query_doc,
+                    candidate_uri=candidate_uri,
+                    candidate_docs=candidate_docs,
+                    candidate_matrix=candidate_matrix,
+                    initial_score=candidate_scores[candidate_uri],
+                    match_threshold=match_cutoff,
+                    similar_config=similar_config,
+                )
             if metrics is not None:
                 hits.append(metrics)
 
@@ -304,6 +330,7 @@ def cmd(
             query_chunk_count=len(query_doc.chunks),
             candidate_count=len(ranked_candidate_uris),
             hits=output_hits,
+            timings=collector.output() if collector is not None else None,
         ).model_dump(mode="python")
         result_obj.success = True
 
@@ -11,6 +11,7 @@ from wks.api.config.now_iso import now_iso
 from ..config.URI import URI
 from . import MAX_GENERATOR_ITERATIONS
 from ._CacheManager import _CacheManager
+from ._transform_cache_key import transform_cache_key
 from ._TransformRecord import _TransformRecord
 
 if TYPE_CHECKING:
@@ -77,8 +78,7 @@ class _TransformController:
                 )
 
     def _compute_cache_key(self, file_checksum: str, engine_name: str, options_hash: str) -> str:
-        key_str = f"{file_checksum}:{engine_name}:{options_hash}"
-        return hashlib.sha256(key_str.encode()).hexdigest()
+        return transform_cache_key(file_checksum, engine_name, options_hash)
 
     def _find_cached_transform(
         self, file_checksum: str, engine_name: str, options_hash: str
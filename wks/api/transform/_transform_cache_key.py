@@ -0,0 +1,6 @@
+import hashlib
+
+
+def transform_cache_key(file_checksum: str, engine_name: str, options_hash: str) -> str:
+    key_str = f"{file_checksum}:{engine_name}:{options_hash}"
+    return hashlib.sha256(key_str.encode()).hexdigest()
@@ -5,7 +5,9 @@ import typer
 from wks.api.index.cmd import cmd
 from wks.api.index.cmd_backfill import cmd_backfill
 from wks.api.index.cmd_embed import cmd_embed
+from wks.api.index.cmd_migrate import cmd_migrate
 from wks.api.index.cmd_optimize import cmd_optimize
+from wks.api.index.cmd_quantization import cmd_quantization
 from wks.api.index.cmd_status import cmd_status
 from wks.cli._app_factory import build_typer_app, require_subcommand
 from wks.cli._handle_stage_result import _handle_stage_result
@@ -20,9 +22,10 @@ def index() -> typer.Typer:
     def add_cmd(
         name: str = typer.Argument(..., help="Index name"),
         uri: str = typer.Argument(..., help="URI or file path to index"),
+        force: bool = typer.Option(False, "--force", help="Re-index even if the stored checksum is current"),
     ) -> None:
         """Add a document to a named index."""
-        _handle_stage_result(cmd)(name, uri)
+        _handle_stage_result(cmd)(name, uri, force=force)
 
     @app.command(name="status")
     def status_cmd(
@@ -34,9 +37,10 @@ def index() -> typer.Typer:
     @app.command(name="backfill")
     def backfill_cmd(
         name: str = typer.Argument("", help="Index name (uses default index if omitted)"),
+        force: bool = typer.Option(False, "--force", help="Re-index files even if their stored checksum is current"),
     ) -> None:
         """Index all monitored files meeting the index's min_priority threshold."""
-        _handle_stage_result(cmd_backfill)(name=name)
+        _handle_stage_result(cmd_backfill)(name=name, force=force)
 
     @app.command(name="embed")
     def embed_cmd(
@@ -48,7 +52,21 @@ def index() -> typer.Typer:
 
     @app.command(name="optimize")
     def optimize_cmd() -> None:
-        """Create database indexes used by search."""
+        """Create database indexes, postings and ANN lists used by search."""
         _handle_stage_result(cmd_optimize)()
 
+    @app.command(name="quantization")
+    def quantization_cmd(
+        name: str = typer.Argument("", help="Index name (uses default index if omitted)"),
+        k: int = typer.Option(10, "--k", help="Top-k used to measure recall"),
+        queries: int = typer.Option(50, "--queries", help="Number of stored chunks sampled as queries"),
+    ) -> None:
+        """Report recall and latency of quantized semantic scoring."""
+        _handle_stage_result(cmd_quantization)(name=name, k=k, queries=queries)
+
+    @app.command(name="migrate")
+    def migrate_cmd() -> None:
+        """Convert stored embeddings to packed float32."""
+        _handle_stage_result(cmd_migrate)()
+
     return app
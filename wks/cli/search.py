@@ -1,10 +1,12 @@
 """Search Typer app factory."""
 
+from pathlib import Path
 from typing import Annotated
 
 import typer
 
 from wks.api.search.cmd import cmd
+from wks.api.search.cmd_batch import cmd_batch
 from wks.cli._handle_stage_result import _handle_stage_result
 
 
@@ -32,7 +34,56 @@ def search() -> typer.Typer:
         index: Annotated[str, typer.Option("--index", "-i", help="Index name (uses default from config)")] = "",
         strategy: Annotated[str, typer.Option("--strategy", "-s", help="Search strategy name")] = "",
         k: Annotated[int, typer.Option("--top", "-k", help="Number of results")] = 10,
+        timings: Annotated[
+            bool, typer.Option("--timings", help="Include per-phase latency timings and cache hit flags")
+        ] = False,
+        uri_prefix: Annotated[
+            str, typer.Option("--under", help="Only search documents at or below this path or URI prefix")
+        ] = "",
+        extensions: Annotated[
+            list[str] | None, typer.Option("--ext", help="Only search files with this extension (repeatable)")
+        ] = None,
+        min_priority: Annotated[
+            float | None, typer.Option("--min-priority", help="Only search files with monitor priority >= value")
+        ] = None,
+        fuzzy: Annotated[
+            bool, typer.Option("--fuzzy", help="Match lexical index terms by trigram similarity (typo tolerant)")
+        ] = False,
+        queries_file: Annotated[
+            Path | None,
+            typer.Option("--queries-file", help="Run one search per non-empty line of this file in a single batch"),
+        ] = None,
     ) -> None:
-        _handle_stage_result(cmd)(query or "", index=index, k=k, query_image=query_image, strategy=strategy)
+        if queries_file is not None:
+            if query or query_image:
+                raise typer.BadParameter("cannot be combined with a query argument", param_hint="--queries-file")
+            try:
+                lines = queries_file.read_text(encoding="utf-8").splitlines()
+            except OSError as exc:
+                raise typer.BadParameter(str(exc), param_hint="--queries-file") from exc
+            queries = [line.strip() for line in lines if line.strip()]
+            _handle_stage_result(cmd_batch)(
+                queries,
+                index=index,
+                k=k,
+                strategy=strategy,
+                uri_prefix=uri_prefix,
+                extensions=extensions,
+                min_priority=min_priority,
+                fuzzy=fuzzy,
+            )
+            return
+        _handle_stage_result(cmd)(
+            query or "",
+            index=index,
+            k=k,
+            query_image=query_image,
+            strategy=strategy,
+            timings=timings,
+            uri_prefix=uri_prefix,
+            extensions=extensions,
+            min_priority=min_priority,
+            fuzzy=fuzzy,
+        )
 
     return app
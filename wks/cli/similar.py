@@ -33,6 +33,9 @@ def similar() -> typer.Typer:
             float | None,
             typer.Option("--match-threshold", help="Minimum chunk similarity for document-level matching"),
         ] = None,
+        timings: Annotated[
+            bool, typer.Option("--timings", help="Include per-phase latency timings and cache hit flags")
+        ] = False,
     ) -> None:
         _handle_stage_result(cmd)(
             target=target,
@@ -41,6 +44,7 @@ def similar() -> typer.Typer:
             per_chunk=per_chunk,
             candidates=candidates,
             match_threshold=match_threshold,
+            timings=timings,
         )
 
     return app
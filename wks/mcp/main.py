@@ -1,11 +1,14 @@
 import sys
 
+from wks.services import start_warmup
+
 from .server import MCPServer
 
 
 def main() -> None:
     server = MCPServer()
     try:
+        start_warmup()
         server.run()
     except KeyboardInterrupt:
         sys.stderr.write("\nMCP Server stopped.\n")
@@ -23,11 +23,15 @@ GENERIC_PARAM_DESCRIPTIONS: dict[str, str] = {
     "direction": "Direction filter for related links.",
     "engine": "Optional transform engine name to use.",
     "errors_only": "When true, only clear error entries.",
+    "extensions": "Optional file extensions to restrict results to, such as `pdf` or `.md`.",
+    "force": "When true, redo the work even if the stored result is already current.",
+    "fuzzy": "When true, lexical indexes match terms by trigram similarity so misspellings still match.",
     "index": "Optional index name to use.",
     "k": "Maximum number of results to return.",
     "key": "Configuration key expressed as a dot path.",
     "limit": "Maximum number of records to return.",
     "list_name": "Configuration list name to inspect or modify.",
+    "min_priority": "Optional minimum monitor priority a file must have to be included.",
     "name": "Target name for the requested operation.",
     "output": "Optional output format or destination understood by the command.",
     "output_path": "Optional file path to write the result to.",
@@ -46,7 +50,9 @@ GENERIC_PARAM_DESCRIPTIONS: dict[str, str] = {
     "target": "Checksum, cached artifact, or filesystem path to read.",
     "target_a": "First target to compare.",
     "target_b": "Second target to compare.",
+    "timings": "When true, include per-phase latency timings and cache hit flags in the result.",
     "uri": "File or resource URI for the operation.",
+    "uri_prefix": "Optional path or URI prefix; only documents at or below it are included.",
     "value": "Value to set or add.",
 }
 
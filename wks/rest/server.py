@@ -2,36 +2,53 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+from itertools import chain
+from typing import Annotated, Literal
+
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from wks.services import WKSService
 from wks.services._models import FailureKind, ServiceResponse
 from wks.services.cat import CatResponse
 from wks.services.config import ConfigSectionResponse, ConfigSectionsResponse
-from wks.services.search import SearchResponse
+from wks.services.ready import ReadyResponse
+from wks.services.search import SearchBatchRequest, SearchBatchResponse, SearchResponse, SearchStreamEvent
 from wks.services.status import StatusResponse
 
 
 def create_app(*, service: WKSService | None = None) -> FastAPI:
     """Create the REST application."""
-    app = FastAPI(title="WKS REST", version="0.12.0")
     facade = service or WKSService.from_config()
 
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+        facade.warmup()
+        yield
+
+    app = FastAPI(title="WKS REST", version="0.12.0", lifespan=lifespan)
+
+    _register_service_routes(app, facade)
+    _register_search_routes(app, facade)
+    return app
+
+
+def _register_service_routes(app: FastAPI, facade: WKSService) -> None:
+    """Register readiness, status, cat and config routes."""
+
+    @app.get("/ready", response_model=ReadyResponse)
+    def ready() -> ReadyResponse:
+        response = facade.ready()
+        if not response.ready:
+            raise HTTPException(status_code=503, detail=response.model_dump(mode="python"))
+        return response
+
     @app.get("/status", response_model=StatusResponse)
     def get_status() -> StatusResponse:
         return facade.status()
 
-    @app.get("/search", response_model=SearchResponse)
-    def search(
-        query: str = "",
-        index: str = "",
-        k: int = Query(default=10, ge=1),
-        query_image: str = "",
-        strategy: str = "",
-    ) -> SearchResponse:
-        response = facade.search(query=query, index=index, k=k, query_image=query_image, strategy=strategy)
-        return _raise_for_failure(response)
-
     @app.get("/cat", response_model=CatResponse)
     def cat(target: str, output_path: str | None = None, engine: str | None = None) -> CatResponse:
         response = facade.cat(target=target, output_path=output_path, engine=engine)
@@ -46,7 +63,81 @@ def create_app(*, service: WKSService | None = None) -> FastAPI:
         response = facade.config_section(section)
         return _raise_for_failure(response)
 
-    return app
+
+def _register_search_routes(app: FastAPI, facade: WKSService) -> None:
+    """Register single, streaming and batched search routes."""
+
+    @app.get("/search", response_model=SearchResponse)
+    def search(
+        query: str = "",
+        index: str = "",
+        k: int = Query(default=10, ge=1),
+        query_image: str = "",
+        strategy: str = "",
+        timings: bool = False,
+        uri_prefix: str = "",
+        extensions: Annotated[list[str] | None, Query()] = None,
+        min_priority: float | None = None,
+        fuzzy: bool = False,
+    ) -> SearchResponse:
+        response = facade.search(
+            query=query,
+            index=index,
+            k=k,
+            query_image=query_image,
+            strategy=strategy,
+            timings=timings,
+            uri_prefix=uri_prefix,
+            extensions=extensions,
+            min_priority=min_priority,
+            fuzzy=fuzzy,
+        )
+        return _raise_for_failure(response)
+
+    @app.get("/search/stream")
+    def search_stream(
+        query: str = "",
+        index: str = "",
+        k: int = Query(default=10, ge=1),
+        query_image: str = "",
+        strategy: str = "",
+        uri_prefix: str = "",
+        extensions: Annotated[list[str] | None, Query()] = None,
+        min_priority: float | None = None,
+        fuzzy: bool = False,
+        format: Literal["ndjson", "sse"] = "ndjson",
+    ) -> StreamingResponse:
+        events = facade.stream_search(
+            query=query,
+            index=index,
+            k=k,
+            query_image=query_image,
+            strategy=strategy,
+            uri_prefix=uri_prefix,
+            extensions=extensions,
+            min_priority=min_priority,
+            fuzzy=fuzzy,
+        )
+        first = next(events)
+        if first.summary is not None:
+            _raise_for_failure(first.summary)
+        if format == "sse":
+            return StreamingResponse(_sse_lines(chain([first], events)), media_type="text/event-stream")
+        return StreamingResponse(_ndjson_lines(chain([first], events)), media_type="application/x-ndjson")
+
+    @app.post("/search/batch", response_model=SearchBatchResponse)
+    def search_batch(request: SearchBatchRequest) -> SearchBatchResponse:
+        response = facade.search_many(
+            queries=request.queries,
+            index=request.index,
+            k=request.k,
+            strategy=request.strategy,
+            uri_prefix=request.uri_prefix,
+            extensions=request.extensions,
+            min_priority=request.min_priority,
+            fuzzy=request.fuzzy,
+        )
+        return _raise_for_failure(response)
 
 
 def _raise_for_failure(response: ServiceResponse):
@@ -58,6 +149,18 @@ def _raise_for_failure(response: ServiceResponse):
     )
 
 
+def _ndjson_lines(events: Iterator[SearchStreamEvent]) -> Iterator[str]:
+    """Serialize stream events as newline-delimited JSON."""
+    for event in events:
+        yield event.model_dump_json() + "\n"
+
+
+def _sse_lines(events: Iterator[SearchStreamEvent]) -> Iterator[str]:
+    """Serialize stream events as server-sent events."""
+    for event in events:
+        yield f"event: {event.event}\ndata: {event.model_dump_json()}\n\n"
+
+
 def _status_code_for_failure(failure_kind: FailureKind | None) -> int:
     """Map a service failure kind to an HTTP status code."""
     if failure_kind == "validation":
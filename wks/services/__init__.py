@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
 
 from wks.api.config.WKSConfig import WKSConfig
@@ -7,7 +8,18 @@ from wks.api.config.WKSConfig import WKSConfig
 from .cat import CatRequest, CatResponse, read_content
 from .config import ConfigSectionResponse, ConfigSectionsResponse, list_config_sections, show_config_section
 from .mv import MoveRequest, MoveResponse, move_document
-from .search import SearchRequest, SearchResponse, search_documents
+from .ready import ReadyResponse, start_warmup, warmup_status
+from .search import (
+    SearchBatchRequest,
+    SearchBatchResponse,
+    SearchRequest,
+    SearchResponse,
+    SearchStreamEvent,
+    SearchTimings,
+    search_documents,
+    search_many,
+    stream_search,
+)
 from .status import StatusResponse, collect_status
 
 
@@ -22,6 +34,12 @@ class WKSService:
     def status(self) -> StatusResponse:
         return collect_status()
 
+    def warmup(self) -> bool:
+        return start_warmup(config=self._config)
+
+    def ready(self, *, wait: float = 0.0) -> ReadyResponse:
+        return warmup_status(wait=wait)
+
     def search(
         self,
         *,
@@ -30,10 +48,76 @@ class WKSService:
         k: int = 10,
         query_image: str = "",
         strategy: str = "",
+        timings: bool = False,
+        uri_prefix: str = "",
+        extensions: list[str] | None = None,
+        min_priority: float | None = None,
+        fuzzy: bool = False,
     ) -> SearchResponse:
-        request = SearchRequest(query=query, index=index, k=k, query_image=query_image, strategy=strategy)
+        request = SearchRequest(
+            query=query,
+            index=index,
+            k=k,
+            query_image=query_image,
+            strategy=strategy,
+            timings=timings,
+            uri_prefix=uri_prefix,
+            extensions=extensions or [],
+            min_priority=min_priority,
+            fuzzy=fuzzy,
+        )
         return search_documents(request, config=self._config)
 
+    def stream_search(
+        self,
+        *,
+        query: str = "",
+        index: str = "",
+        k: int = 10,
+        query_image: str = "",
+        strategy: str = "",
+        uri_prefix: str = "",
+        extensions: list[str] | None = None,
+        min_priority: float | None = None,
+        fuzzy: bool = False,
+    ) -> Iterator[SearchStreamEvent]:
+        request = SearchRequest(
+            query=query,
+            index=index,
+            k=k,
+            query_image=query_image,
+            strategy=strategy,
+            uri_prefix=uri_prefix,
+            extensions=extensions or [],
+            min_priority=min_priority,
+            fuzzy=fuzzy,
+        )
+        return stream_search(request, config=self._config)
+
+    def search_many(
+        self,
+        *,
+        queries: list[str],
+        index: str = "",
+        k: int = 10,
+        strategy: str = "",
+        uri_prefix: str = "",
+        extensions: list[str] | None = None,
+        min_priority: float | None = None,
+        fuzzy: bool = False,
+    ) -> SearchBatchResponse:
+        request = SearchBatchRequest(
+            queries=queries,
+            index=index,
+            k=k,
+            strategy=strategy,
+            uri_prefix=uri_prefix,
+            extensions=extensions or [],
+            min_priority=min_priority,
+            fuzzy=fuzzy,
+        )
+        return search_many(request, config=self._config)
+
     def cat(self, *, target: str, output_path: str | Path | None = None, engine: str | None = None) -> CatResponse:
         request = CatRequest(target=target, output_path=Path(output_path) if output_path else None, engine=engine)
         return read_content(request, config=self._config)
@@ -55,8 +139,13 @@ __all__ = [
     "ConfigSectionsResponse",
     "MoveRequest",
     "MoveResponse",
+    "ReadyResponse",
+    "SearchBatchRequest",
+    "SearchBatchResponse",
     "SearchRequest",
     "SearchResponse",
+    "SearchStreamEvent",
+    "SearchTimings",
     "StatusResponse",
     "WKSService",
     "collect_status",
@@ -64,5 +153,9 @@ __all__ = [
     "move_document",
     "read_content",
     "search_documents",
+    "search_many",
     "show_config_section",
+    "start_warmup",
+    "stream_search",
+    "warmup_status",
 ]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
+
+from .search import SearchBatchRequest, SearchBatchResponse, SearchRequest, SearchResponse, _error_response, _run_search
+
+
+def _run_batch(config: WKSConfig, request: SearchBatchRequest) -> SearchBatchResponse:
+    invalid = _validate_batch(config, request)
+    if invalid is not None:
+        return invalid
+    requests = [
+        SearchRequest(
+            query=query,
+            index=request.index,
+            k=request.k,
+            strategy=request.strategy,
+            uri_prefix=request.uri_prefix,
+            extensions=request.extensions,
+            min_priority=request.min_priority,
+            fuzzy=request.fuzzy,
+        )
+        for query in request.queries
+    ]
+    return _batch_response(_batch_results(config, requests))
+
+
+def _validate_batch(config: WKSConfig, request: SearchBatchRequest) -> SearchBatchResponse | None:
+    if config.index is None:
+        return SearchBatchResponse(
+            success=False,
+            message="Index not configured",
+            failure_kind="config",
+            errors=["No index section in config"],
+            index_name="",
+        )
+    if request.index and request.strategy:
+        return SearchBatchResponse(
+            success=False,
+            message="Cannot specify both --index and --strategy",
+            failure_kind="validation",
+            errors=["Cannot specify both --index and --strategy"],
+            index_name="",
+        )
+    return None
+
+
+def _batch_results(config: WKSConfig, requests: list[SearchRequest]) -> list[SearchResponse]:
+    runnable = [position for position, item in enumerate(requests) if item.query.strip()]
+    results: list[SearchResponse] = [
+        _error_response(
+            message="Either query or query_image is required",
+            failure_kind="validation",
+            errors=["Either query or query_image is required"],
+            query="",
+            index_name="",
+            search_mode="lexical",
+        )
+        for _ in requests
+    ]
+    if runnable:
+        for position, response in zip(
+            runnable, _run_search(config, [requests[position] for position in runnable]), strict=True
+        ):
+            results[position] = response
+    return results
+
+
+def _batch_response(results: list[SearchResponse]) -> SearchBatchResponse:
+    failed = [response for response in results if not response.success]
+    if failed and len(failed) == len(results) and len({response.failure_kind for response in failed}) == 1:
+        return SearchBatchResponse(
+            success=False,
+            message=failed[0].message,
+            failure_kind=failed[0].failure_kind,
+            errors=failed[0].errors,
+            index_name=failed[0].index_name,
+            results=results,
+            embedding_cache=_SEARCH_RUNTIME.query_embedding_stats(),
+        )
+    return SearchBatchResponse(
+        success=True,
+        message=f"Ran {len(results)} queries ({len(failed)} failed)",
+        errors=[],
+        warnings=[],
+        index_name=next((response.index_name for response in results if response.index_name), ""),
+        results=results,
+        embedding_cache=_SEARCH_RUNTIME.query_embedding_stats(),
+    )
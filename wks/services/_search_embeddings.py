@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from wks.api.index._IndexSpec import _IndexSpec
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME, _query_embedding_key
+from wks.api.search._SearchTimings import _mark_cache
+
+if TYPE_CHECKING:
+    from .search import SearchRequest
+
+
+class _QueryEmbeddings:
+    def __init__(self, requests: list[SearchRequest]):
+        self._requests = requests
+        self._lock = Lock()
+        self._entries: dict[tuple[str, str, float | None], tuple[Lock, list[list[np.ndarray | Exception]]]] = {}
+
+    def get(self, spec: _IndexSpec) -> list[np.ndarray | Exception]:
+        assert spec.embedding_model is not None
+        key = (spec.embedding_model, spec.embedding_mode, spec.image_text_weight)
+        with self._lock:
+            entry_lock, value = self._entries.setdefault(key, (Lock(), []))
+        with entry_lock:
+            if not value:
+                value.append(_embed_requests(self._requests, spec))
+        return value[0]
+
+
+def _embed_requests(requests: list[SearchRequest], spec: _IndexSpec) -> list[np.ndarray | Exception]:
+    keys, embeddings = _cached_embeddings(requests, spec)
+    missing = [position for position, embedding in enumerate(embeddings) if embedding is None]
+    _mark_cache(f"query_embedding:{spec.embedding_model}", not missing)
+    _fill_batched(requests, keys, embeddings, _batchable_positions(requests, missing), spec)
+    _fill_single(requests, keys, embeddings, missing, spec)
+    return [embedding for embedding in embeddings if embedding is not None]
+
+
+def _cached_embeddings(
+    requests: list[SearchRequest], spec: _IndexSpec
+) -> tuple[list[tuple[Any, ...] | None], list[np.ndarray | Exception | None]]:
+    assert spec.embedding_model is not None
+    keys = [
+        _query_embedding_key(
+            spec.embedding_model, spec.embedding_mode, request.query, request.query_image, spec.image_text_weight
+        )
+        for request in requests
+    ]
+    embeddings: list[np.ndarray | Exception | None] = [_SEARCH_RUNTIME.get_query_embedding(key) for key in keys]
+    return keys, embeddings
+
+
+def _batchable_positions(requests: list[SearchRequest], missing: list[int]) -> list[int]:
+    return [
+        position
+        for position in missing
+        if requests[position].query.strip() and not requests[position].query_image.strip()
+    ]
+
+
+def _fill_batched(
+    requests: list[SearchRequest],
+    keys: list[tuple[Any, ...] | None],
+    embeddings: list[np.ndarray | Exception | None],
+    batched: list[int],
+    spec: _IndexSpec,
+) -> None:
+    if len(batched) < 2:
+        return
+    vectors = _embed_batch(
+        [requests[position].query for position in batched], [keys[position] for position in batched], spec
+    )
+    for position, vector in zip(batched, vectors, strict=True):
+        embeddings[position] = vector
+
+
+def _fill_single(
+    requests: list[SearchRequest],
+    keys: list[tuple[Any, ...] | None],
+    embeddings: list[np.ndarray | Exception | None],
+    missing: list[int],
+    spec: _IndexSpec,
+) -> None:
+    for position in missing:
+        if embeddings[position] is None:
+            embeddings[position] = _embed_single(requests[position], keys[position], spec)
+
+
+def _embed_batch(
+    queries: list[str], keys: list[tuple[Any, ...] | None], spec: _IndexSpec
+) -> list[np.ndarray | Exception]:
+    from wks.api.search._build_query_embeddings import build_query_embeddings
+
+    assert spec.embedding_model is not None
+    try:
+        vectors = build_query_embeddings(queries, spec.embedding_model, spec.embedding_mode)
+    except Exception as exc:
+        return [exc] * len(queries)
+    for key, vector in zip(keys, vectors, strict=True):
+        _SEARCH_RUNTIME.put_query_embedding(key, vector)
+    return list(vectors)
+
+
+def _embed_single(request: SearchRequest, key: tuple[Any, ...] | None, spec: _IndexSpec) -> np.ndarray | Exception:
+    from wks.api.search._build_query_embedding import build_query_embedding
+
+    assert spec.embedding_model is not None
+    try:
+        vector = build_query_embedding(
+            query=request.query,
+            query_image=request.query_image,
+            embedding_model=spec.embedding_model,
+            embedding_mode=spec.embedding_mode,
+            image_text_weight=spec.image_text_weight,
+        )
+    except Exception as exc:
+        return exc
+    _SEARCH_RUNTIME.put_query_embedding(key, vector)
+    return vector
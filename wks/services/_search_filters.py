@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.index._IndexSpec import _IndexSpec
+from wks.api.search._SearchFilter import _SearchFilter
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME, _SemanticIndexState
+from wks.api.search._SearchTimings import _timed
+
+if TYPE_CHECKING:
+    from .search import SearchRequest
+
+
+def _request_filter(request: SearchRequest) -> _SearchFilter | None:
+    search_filter = _SearchFilter.build(request.uri_prefix, request.extensions, request.min_priority)
+    return search_filter if search_filter.active else None
+
+
+def _allowed_rows(
+    config: WKSConfig,
+    state: _SemanticIndexState,
+    spec: _IndexSpec,
+    request: SearchRequest,
+    query_embedding: np.ndarray,
+    search_filter: _SearchFilter | None,
+) -> np.ndarray | None:
+    allowed = None
+    if search_filter is not None:
+        with _timed("filter"):
+            allowed = _SEARCH_RUNTIME.semantic_filter_rows(config, state, search_filter)
+    if spec.doc_candidates:
+        with _timed("doc_prefilter"):
+            allowed = _prefilter_documents(state, query_embedding, max(spec.doc_candidates, 2 * request.k), allowed)
+    return allowed
+
+
+def _prefilter_documents(
+    state: _SemanticIndexState,
+    query_embedding: np.ndarray,
+    count: int,
+    allowed: np.ndarray | None,
+) -> np.ndarray | None:
+    centroids = _SEARCH_RUNTIME.document_centroids(state)
+    allowed_uris = np.unique(state.uri_ids[allowed]) if allowed is not None else None
+    if count >= (len(allowed_uris) if allowed_uris is not None else centroids.document_count):
+        return allowed
+    return _restrict_rows(centroids.rows(centroids.top_documents(query_embedding, count, allowed_uris)), allowed)
+
+
+def _restrict_rows(rows: np.ndarray, allowed: np.ndarray | None) -> np.ndarray:
+    return rows if allowed is None else np.intersect1d(rows, allowed, assume_unique=True)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Any
+
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.search._dedupe_hits import _dedupe_hits
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
+from wks.api.search._SearchTimings import _timed
+
+from ._search_filters import _request_filter
+from .search import SearchRequest, SearchResponse, _error_response, _query_output
+
+
+def _lexical_index_hits(
+    config: WKSConfig,
+    request: SearchRequest,
+    index_name: str,
+) -> tuple[list[dict[str, Any]], int] | SearchResponse:
+    if request.query_image.strip():
+        return _error_response(
+            message="query_image is only supported for semantic indexes",
+            failure_kind="validation",
+            errors=["query_image requires an index configured with embedding_model"],
+            query=_query_output(request),
+            index_name=index_name,
+            search_mode="lexical",
+        )
+    if not request.query.strip():
+        return [], 0
+
+    try:
+        lexical_result = _SEARCH_RUNTIME.search_lexical_chunks(
+            config, index_name, request.query, request.k, _request_filter(request), request.fuzzy
+        )
+    except RuntimeError as exc:
+        return _error_response(
+            message=str(exc),
+            failure_kind="runtime",
+            errors=[str(exc)],
+            query=request.query,
+            index_name=index_name,
+            search_mode="lexical",
+        )
+    if lexical_result.total_chunks == 0:
+        return _error_response(
+            message=f"Index '{index_name}' is empty",
+            failure_kind="not_found",
+            errors=[f"Index '{index_name}' is empty"],
+            query=request.query,
+            index_name=index_name,
+            search_mode="lexical",
+        )
+
+    if lexical_result.scores is None:
+        with _timed("scoring"):
+            hits = _rank_lexical_chunks(lexical_result.chunks, request.query, request.k)
+        return hits, lexical_result.total_chunks
+    with _timed("dedupe"):
+        hits = _dedupe_hits(
+            [
+                _chunk_hit(chunk, score)
+                for chunk, score in zip(lexical_result.chunks, lexical_result.scores, strict=True)
+            ],
+            request.k,
+        )
+    return hits, lexical_result.total_chunks
+
+
+def _rank_lexical_chunks(chunks: list[Any], query: str, k: int) -> list[dict[str, Any]]:
+    if not chunks:
+        return []
+    corpus = [chunk.text.lower().split() for chunk in chunks]
+    if not corpus:
+        return []
+    from rank_bm25 import BM25Okapi
+
+    bm25 = BM25Okapi(corpus)
+    query_terms = set(query.lower().split())
+    scores = bm25.get_scores(list(query_terms))
+    ranked = sorted(range(len(scores)), key=lambda item: scores[item], reverse=True)
+    ranked_hits = []
+    for item in ranked:
+        if not query_terms.intersection(corpus[item]):
+            continue
+        score = float(scores[item])
+        if score <= 0.0:
+            score = _term_frequency_score(query_terms, corpus[item])
+        ranked_hits.append(_chunk_hit(chunks[item], score))
+    return _dedupe_hits(ranked_hits, k)
+
+
+def _chunk_hit(chunk: Any, score: float) -> dict[str, Any]:
+    return {
+        "uri": chunk.uri,
+        "chunk_index": chunk.chunk_index,
+        "score": round(score, 4),
+        "tokens": chunk.tokens,
+        "text": chunk.text,
+        "canonical_uri": chunk.canonical_uri,
+        "text_hash": chunk.text_hash,
+    }
+
+
+def _term_frequency_score(query_terms: set[str], terms: list[str]) -> float:
+    if not terms:
+        return 0.0
+    return sum(1 for term in terms if term in query_terms) / len(terms)
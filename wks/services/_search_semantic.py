@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.index._IndexSpec import _IndexSpec
+from wks.api.index._IvfLists import _ANN_MIN_ROWS
+from wks.api.index._QuantizedMatrix import _RERANK_CANDIDATES
+from wks.api.search._dedupe_hits import _dedupe_hits
+from wks.api.search._SearchFilter import _SearchFilter
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME, _SemanticIndexState
+from wks.api.search._SearchTimings import _timed
+
+from ._search_embeddings import _QueryEmbeddings
+from ._search_filters import _allowed_rows, _request_filter, _restrict_rows
+from .search import SearchRequest, _error_response, _IndexResult, _query_output
+
+MAX_IMPLICIT_SEMANTIC_EMBEDDINGS = _ANN_MIN_ROWS
+_SEMANTIC_OVERFETCH = 10
+_SCORE_QUERY_BLOCK = 64
+
+
+def _semantic_index_hits(
+    config: WKSConfig,
+    requests: list[SearchRequest],
+    index_name: str,
+    spec: _IndexSpec,
+    query_embeddings: _QueryEmbeddings,
+) -> list[_IndexResult]:
+    embedding_model = spec.embedding_model
+    assert embedding_model is not None
+    state = _SEARCH_RUNTIME.get_semantic_index_state(
+        config, index_name, embedding_model, quantization=spec.quantization, shard_count=spec.scoring_shards
+    )
+    if not state.row_count:
+        return [
+            _error_response(
+                message=f"No embeddings for index '{index_name}'",
+                failure_kind="not_found",
+                errors=[
+                    f"No embeddings found for index '{index_name}' and model '{embedding_model}'. "
+                    "Run: wksc index embed <index_name>"
+                ],
+                query=_query_output(request),
+                index_name=index_name,
+                search_mode="semantic",
+                embedding_model=embedding_model,
+                total_chunks=0,
+            )
+            for request in requests
+        ]
+
+    with _timed("query_embedding"):
+        embeddings = query_embeddings.get(spec)
+    filters = [_request_filter(request) for request in requests]
+    results: list[_IndexResult] = []
+    for start in range(0, len(requests), _SCORE_QUERY_BLOCK):
+        block = range(start, min(start + _SCORE_QUERY_BLOCK, len(requests)))
+        shared_scores = _block_scores(
+            state, spec, [embeddings[position] for position in block], [filters[position] for position in block]
+        )
+        for offset, position in enumerate(block):
+            scores = shared_scores[:, offset] if shared_scores is not None else None
+            results.append(
+                _request_hits(
+                    config, state, spec, index_name, requests[position], embeddings[position], filters[position], scores
+                )
+            )
+    return results
+
+
+def _block_scores(
+    state: _SemanticIndexState,
+    spec: _IndexSpec,
+    embeddings: list[np.ndarray | Exception],
+    filters: list[_SearchFilter | None],
+) -> np.ndarray | None:
+    if spec.doc_candidates or any(search_filter is not None for search_filter in filters):
+        return None
+    vectors = [embedding for embedding in embeddings if isinstance(embedding, np.ndarray)]
+    if len(vectors) < 2 or len(vectors) != len(embeddings) or _uses_ann(state) or state.shards is not None:
+        return None
+    with _timed("scoring"):
+        return _semantic_scores(state, np.stack(vectors), None)
+
+
+def _request_hits(
+    config: WKSConfig,
+    state: _SemanticIndexState,
+    spec: _IndexSpec,
+    index_name: str,
+    request: SearchRequest,
+    embedding: np.ndarray | Exception,
+    search_filter: _SearchFilter | None,
+    scores: np.ndarray | None,
+) -> _IndexResult:
+    try:
+        if isinstance(embedding, Exception):
+            raise embedding
+        allowed = _allowed_rows(config, state, spec, request, embedding, search_filter)
+        hits = _rank_semantic_hits(config, state, embedding, request.query, request.k, scores, allowed)
+    except Exception as exc:
+        return _error_response(
+            message=str(exc),
+            failure_kind="runtime",
+            errors=[str(exc)],
+            query=_query_output(request),
+            index_name=index_name,
+            search_mode="semantic",
+            embedding_model=spec.embedding_model,
+            total_chunks=state.row_count,
+        )
+    return hits, state.row_count
+
+
+def _rank_semantic_hits(
+    config: WKSConfig,
+    state: _SemanticIndexState,
+    query_embedding: np.ndarray,
+    query: str,
+    k: int,
+    scores: np.ndarray | None = None,
+    allowed: np.ndarray | None = None,
+) -> list[dict[str, Any]]:
+    if not state.row_count or (allowed is not None and not len(allowed)):
+        return []
+    if state.shards is not None and allowed is None and not _uses_ann(state):
+        return _rank_sharded_hits(config, state, query_embedding, query, k)
+
+    with _timed("scoring"):
+        rows, boosted = _boosted_semantic_scores(state, query_embedding, query, k, scores, allowed)
+    return _hits_from_scores(config, state, rows, boosted, k)
+
+
+def _rank_sharded_hits(
+    config: WKSConfig,
+    state: _SemanticIndexState,
+    query_embedding: np.ndarray,
+    query: str,
+    k: int,
+) -> list[dict[str, Any]]:
+    assert state.shards is not None
+    boost_rows, boost_factors = _path_boost_rows(state, _query_terms(query))
+    limit = k * _SEMANTIC_OVERFETCH * 4
+    while True:
+        with _timed("scoring"):
+            rows, boosted = state.shards.top_k(query_embedding, limit, boost_rows, boost_factors)
+        hits = _hits_from_scores(config, state, rows, boosted, k)
+        if len(hits) >= k or limit >= state.row_count:
+            return hits
+        limit *= 4
+
+
+def _hits_from_scores(
+    config: WKSConfig,
+    state: _SemanticIndexState,
+    rows: np.ndarray,
+    boosted: np.ndarray,
+    k: int,
+) -> list[dict[str, Any]]:
+    depth = min(len(boosted), k * _SEMANTIC_OVERFETCH)
+    hydrate_limit = 2 * k
+    while True:
+        with _timed("scoring"):
+            top = _top_positions(boosted, depth)
+            _, first = np.unique(state.uri_ids[rows[top]], return_index=True)
+            candidates = top[np.sort(first)]
+            if depth < len(boosted):
+                candidates = candidates[:hydrate_limit]
+        with _timed("hydrate"):
+            chunks = _SEARCH_RUNTIME.get_semantic_chunks(config, state, rows[candidates].tolist())
+        with _timed("dedupe"):
+            hits = _dedupe_hits(
+                [
+                    _semantic_hit(chunk, float(boosted[pos]))
+                    for pos, chunk in zip(candidates.tolist(), chunks, strict=True)
+                    if chunk is not None
+                ],
+                k,
+            )
+        if len(hits) >= k or depth >= len(boosted):
+            return hits
+        depth = min(len(boosted), depth * 4)
+        hydrate_limit *= 4
+
+
+def _boosted_semantic_scores(
+    state: _SemanticIndexState,
+    query_embedding: np.ndarray,
+    query: str,
+    k: int,
+    scores: np.ndarray | None,
+    allowed: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    from wks.api.index._embedding_utils import cosine_scores
+
+    rerank_depth = max(_RERANK_CANDIDATES, k * 20)
+    probed = _probe_rows(state, query_embedding, rerank_depth, allowed)
+    rows = probed if probed is not None else np.arange(state.row_count)
+    query_terms = _query_terms(query)
+    if scores is None or probed is not None:
+        scores = _semantic_scores(state, query_embedding, probed)
+    boosted = scores * _path_boost_factors(state, query_terms, probed)
+
+    if state.compact is not None:
+        rows = np.sort(rows[_top_positions(boosted, rerank_depth)])
+        exact = cosine_scores(query_embedding, state.vectors(rows))
+        boosted = exact.astype(np.float64) * _path_boost_factors(state, query_terms, rows)
+    return rows, boosted
+
+
+def _probe_rows(
+    state: _SemanticIndexState,
+    query_embedding: np.ndarray,
+    depth: int,
+    allowed: np.ndarray | None,
+) -> np.ndarray | None:
+    if not _uses_ann(state) or (allowed is not None and len(allowed) <= MAX_IMPLICIT_SEMANTIC_EMBEDDINGS):
+        return allowed
+    assert state.ivf is not None
+    return _restrict_rows(state.ivf.probe(query_embedding, depth), allowed)
+
+
+def _uses_ann(state: _SemanticIndexState) -> bool:
+    return state.ivf is not None and state.row_count > MAX_IMPLICIT_SEMANTIC_EMBEDDINGS
+
+
+def _semantic_scores(state: _SemanticIndexState, query_embedding: np.ndarray, rows: np.ndarray | None) -> np.ndarray:
+    from wks.api.index._embedding_utils import cosine_scores
+
+    if state.compact is None:
+        scores = state.scores(query_embedding) if rows is None else cosine_scores(query_embedding, state.vectors(rows))
+        return scores.astype(np.float64)
+    matrix = state.compact.values
+    scales = state.compact.scales
+    if rows is not None:
+        matrix = np.asarray(matrix[rows])
+        scales = scales[rows] if scales is not None else None
+    return cosine_scores(query_embedding, matrix, scales).astype(np.float64)
+
+
+def _query_terms(query: str) -> set[str]:
+    return {term.lower() for term in query.split() if term}
+
+
+def _path_boost_factors(state: _SemanticIndexState, query_terms: set[str], rows: np.ndarray | None) -> np.ndarray:
+    matched = [state.segment_rows[term] for term in query_terms if term in state.segment_rows]
+    size = state.row_count if rows is None else len(rows)
+    if not matched:
+        return np.ones(size, dtype=np.float64)
+    counts = np.zeros(state.row_count, dtype=np.float64)
+    for term_rows in matched:
+        counts[term_rows] += 1.0
+    if rows is not None:
+        counts = counts[rows]
+    return 1.0 + 0.2 * counts
+
+
+def _path_boost_rows(state: _SemanticIndexState, query_terms: set[str]) -> tuple[np.ndarray | None, np.ndarray | None]:
+    matched = [state.segment_rows[term] for term in query_terms if term in state.segment_rows]
+    if not matched:
+        return None, None
+    rows, counts = np.unique(np.concatenate(matched), return_counts=True)
+    return rows, 1.0 + 0.2 * counts.astype(np.float64)
+
+
+def _top_positions(values: np.ndarray, depth: int) -> np.ndarray:
+    top = np.argpartition(-values, depth - 1)[:depth] if depth < len(values) else np.arange(len(values))
+    return top[np.lexsort((top, -values[top]))]
+
+
+def _semantic_hit(chunk: dict[str, Any], score: float) -> dict[str, Any]:
+    return {
+        "uri": chunk["uri"],
+        "chunk_index": chunk["chunk_index"],
+        "score": round(score, 4),
+        "tokens": chunk["tokens"],
+        "text": chunk["text"],
+        "canonical_uri": chunk.get("canonical_uri"),
+        "text_hash": chunk.get("text_hash"),
+    }
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Any
+
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.search._dedupe_hits import _dedupe_hits
+from wks.api.search._rrf import rrf_merge
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
+from wks.api.search._SearchTimings import _timed
+
+from ._search_embeddings import _QueryEmbeddings
+from ._search_lexical import _lexical_index_hits
+from ._search_semantic import MAX_IMPLICIT_SEMANTIC_EMBEDDINGS, _semantic_index_hits
+from .search import (
+    SearchRequest,
+    SearchResponse,
+    SearchStreamEvent,
+    _error_response,
+    _IndexResult,
+    _query_output,
+    _search_hit,
+)
+
+_STRATEGY_MAX_WORKERS = 8
+_STRATEGY_EXECUTOR = ThreadPoolExecutor(max_workers=_STRATEGY_MAX_WORKERS, thread_name_prefix="wks-search")
+
+_StrategyOutcome = tuple[list[_IndexResult | None], list[str]]
+
+
+class _StrategyFanOut:
+    def __init__(self, config: WKSConfig, requests: list[SearchRequest], strategy_name: str, *, explicit: bool):
+        assert config.index is not None
+        self._config = config
+        self._indexes = config.index.indexes
+        self._requests = requests
+        self._strategy_name = strategy_name
+        self._members = list(dict.fromkeys(config.index.strategies[strategy_name].indexes))
+        self._sub_requests = [
+            SearchRequest(
+                query=request.query,
+                k=request.k * 3,
+                query_image=request.query_image,
+                uri_prefix=request.uri_prefix,
+                extensions=request.extensions,
+                min_priority=request.min_priority,
+                fuzzy=request.fuzzy,
+            )
+            for request in requests
+        ]
+        self._query_embeddings = _QueryEmbeddings(self._sub_requests)
+        self._limit_semantic = not explicit and not any(request.query_image.strip() for request in requests)
+
+    def outcomes(self) -> Iterator[tuple[str, _StrategyOutcome]]:
+        for index_name in self._members:
+            if index_name not in self._indexes:
+                yield index_name, ([None] * len(self._requests), [f"Strategy index '{index_name}' not found, skipping"])
+        searched = [index_name for index_name in self._members if self._searchable(index_name)]
+        if len(searched) < 2:
+            for index_name in searched:
+                yield index_name, self._search(index_name)
+            return
+        futures = {
+            _STRATEGY_EXECUTOR.submit(copy_context().run, self._search, index_name): index_name
+            for index_name in searched
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def _searchable(self, index_name: str) -> bool:
+        if index_name not in self._indexes:
+            return False
+        return self._indexes[index_name].embedding_model is not None or any(
+            request.query.strip() for request in self._requests
+        )
+
+    def _search(self, index_name: str) -> _StrategyOutcome:
+        spec = self._indexes[index_name]
+        if spec.embedding_model is None:
+            return [
+                _lexical_index_hits(self._config, request, index_name) if request.query.strip() else None
+                for request in self._sub_requests
+            ], []
+        skipped = self._skip_reason(index_name, spec.embedding_model)
+        if skipped:
+            return [None] * len(self._requests), [skipped]
+        return list(
+            _semantic_index_hits(self._config, self._sub_requests, index_name, spec, self._query_embeddings)
+        ), []
+
+    def _skip_reason(self, index_name: str, embedding_model: str) -> str:
+        if not self._limit_semantic:
+            return ""
+        embedding_count = _SEARCH_RUNTIME.count_semantic_embeddings(self._config, index_name, embedding_model)
+        if embedding_count <= MAX_IMPLICIT_SEMANTIC_EMBEDDINGS or _SEARCH_RUNTIME.has_semantic_ann(
+            index_name, embedding_model
+        ):
+            return ""
+        return (
+            f"Skipping semantic index '{index_name}' in implicit strategy '{self._strategy_name}' "
+            f"({embedding_count} embeddings exceeds {MAX_IMPLICIT_SEMANTIC_EMBEDDINGS}); "
+            f"run 'wksc index optimize' to build an ANN index, "
+            f"or use --strategy {self._strategy_name} to include it explicitly"
+        )
+
+
+def _run_strategy_search(
+    config: WKSConfig,
+    requests: list[SearchRequest],
+    strategy_name: str,
+    *,
+    explicit_strategy: bool,
+) -> list[SearchResponse]:
+    assert config.index is not None
+    if strategy_name not in config.index.strategies:
+        available = list(config.index.strategies.keys())
+        return [
+            _error_response(
+                message=f"Unknown strategy: {strategy_name}",
+                failure_kind="not_found",
+                errors=[f"Strategy '{strategy_name}' not defined in config (available: {available})"],
+                query=_query_output(request),
+                index_name=strategy_name,
+                search_mode="combined",
+            )
+            for request in requests
+        ]
+    outcomes = dict(_StrategyFanOut(config, requests, strategy_name, explicit=explicit_strategy).outcomes())
+    return _strategy_responses(config, requests, strategy_name, outcomes)
+
+
+def _strategy_responses(
+    config: WKSConfig,
+    requests: list[SearchRequest],
+    strategy_name: str,
+    outcomes: dict[str, _StrategyOutcome],
+) -> list[SearchResponse]:
+    assert config.index is not None
+    ordered = [
+        outcomes[index_name] for index_name in config.index.strategies[strategy_name].indexes if index_name in outcomes
+    ]
+    return [
+        _strategy_response(request, strategy_name, [(results[position], skipped) for results, skipped in ordered])
+        for position, request in enumerate(requests)
+    ]
+
+
+def _strategy_member_event(
+    request: SearchRequest,
+    index_name: str,
+    result: _IndexResult | None,
+    skipped: list[str],
+) -> SearchStreamEvent:
+    if isinstance(result, SearchResponse):
+        return SearchStreamEvent(event="hits", index_name=index_name, warnings=skipped, errors=result.errors)
+    hits = [_search_hit(hit) for hit in result[0][: request.k]] if result is not None else []
+    return SearchStreamEvent(event="hits", index_name=index_name, hits=hits, warnings=skipped)
+
+
+def _strategy_response(
+    request: SearchRequest,
+    strategy_name: str,
+    outcomes: list[tuple[_IndexResult | None, list[str]]],
+) -> SearchResponse:
+    ranked_lists: list[list[dict[str, Any]]] = []
+    warnings: list[str] = []
+    total_chunks = 0
+    for result, skipped in outcomes:
+        warnings.extend(skipped)
+        if isinstance(result, SearchResponse):
+            warnings.extend(result.errors)
+        elif result is not None:
+            hits, _ = result
+            ranked_lists.append(hits)
+            total_chunks += len(hits)
+
+    if not ranked_lists:
+        return SearchResponse(
+            success=True,
+            message=f"No results from any index in strategy '{strategy_name}'",
+            errors=[],
+            warnings=warnings,
+            query=_query_output(request),
+            index_name=strategy_name,
+            search_mode="combined",
+            embedding_model=None,
+            hits=[],
+            total_chunks=0,
+        )
+
+    with _timed("merge"):
+        merged = rrf_merge(ranked_lists, request.k)
+    with _timed("dedupe"):
+        hits = _dedupe_hits(merged, request.k)
+    with _timed("serialization"):
+        search_hits = [_search_hit(hit) for hit in hits]
+    return SearchResponse(
+        success=True,
+        message=f"Found {len(hits)} results for '{_query_output(request)}'",
+        errors=[],
+        warnings=warnings,
+        query=_query_output(request),
+        index_name=strategy_name,
+        search_mode="combined",
+        embedding_model=None,
+        hits=search_hits,
+        total_chunks=total_chunks,
+    )
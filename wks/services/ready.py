@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import ConfigDict, Field
+
+from wks.api.config.WKSConfig import WKSConfig
+from wks.api.search._SearchWarmup import _SEARCH_WARMUP
+
+from ._models import ServiceResponse
+
+
+class ReadyResponse(ServiceResponse):
+    model_config = ConfigDict(extra="forbid")
+
+    ready: bool
+    state: Literal["idle", "running", "ready"]
+    models: list[str] = Field(default_factory=list)
+    indexes: list[str] = Field(default_factory=list)
+    errors: list[str] = Field(default_factory=list)
+
+
+def start_warmup(*, config: WKSConfig | None = None) -> bool:
+    return _SEARCH_WARMUP.start(config)
+
+
+def warmup_status(*, wait: float = 0.0) -> ReadyResponse:
+    if wait > 0:
+        _SEARCH_WARMUP.wait(wait)
+    status = _SEARCH_WARMUP.status()
+    ready = status.state == "ready"
+    if ready:
+        message = "Warmup complete" if not status.errors else f"Warmup complete with {len(status.errors)} error(s)"
+    else:
+        message = "Warmup in progress" if status.state == "running" else "Warmup not started"
+    return ReadyResponse(
+        success=True,
+        message=message,
+        ready=ready,
+        state=status.state,
+        models=status.models,
+        indexes=status.indexes,
+        errors=status.errors,
+    )
@@ -1,19 +1,16 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from wks.api.config.WKSConfig import WKSConfig
-from wks.api.index._IndexSpec import _IndexSpec
-from wks.api.search._dedupe_hits import _dedupe_hits
-from wks.api.search._rrf import rrf_merge
-from wks.api.search._SearchRuntime import _SEARCH_RUNTIME, _LexicalIndexState, _SemanticIndexState
+from wks.api.search._SearchRuntime import _SEARCH_RUNTIME
+from wks.api.search._SearchTimings import _collect_timings, _timed
 
 from ._models import FailureKind, ServiceResponse
 
-MAX_IMPLICIT_SEMANTIC_EMBEDDINGS = 100_000
-
 
 class SearchRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -23,6 +20,19 @@ class SearchRequest(BaseModel):
     k: int = Field(default=10, ge=1)
     query_image: str = ""
     strategy: str = ""
+    timings: bool = False
+    uri_prefix: str = ""
+    extensions: list[str] = Field(default_factory=list)
+    min_priority: float | None = None
+    fuzzy: bool = False
+
+
+class SearchTimings(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    total_ms: float
+    phases: dict[str, float] = Field(default_factory=dict)
+    cache: dict[str, bool] = Field(default_factory=dict)
 
 
 class SearchHit(BaseModel):
@@ -46,11 +56,87 @@ class SearchResponse(ServiceResponse):
     embedding_model: str | None = None
     hits: list[SearchHit] = Field(default_factory=list)
     total_chunks: int = 0
+    embedding_cache: dict[str, int] = Field(default_factory=dict)
+    timings: SearchTimings | None = None
+
+
+class SearchBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    queries: list[str] = Field(min_length=1)
+    index: str = ""
+    k: int = Field(default=10, ge=1)
+    strategy: str = ""
+    uri_prefix: str = ""
+    extensions: list[str] = Field(default_factory=list)
+    min_priority: float | None = None
+    fuzzy: bool = False
+
+
+class SearchBatchResponse(ServiceResponse):
+    model_config = ConfigDict(extra="forbid")
+
+    errors: list[str] = Field(default_factory=list)
+    warnings: list[str] = Field(default_factory=list)
+    index_name: str
+    results: list[SearchResponse] = Field(default_factory=list)
+    embedding_cache: dict[str, int] = Field(default_factory=dict)
+
+
+class SearchStreamEvent(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    event: Literal["hits", "summary"]
+    index_name: str
+    hits: list[SearchHit] = Field(default_factory=list)
+    warnings: list[str] = Field(default_factory=list)
+    errors: list[str] = Field(default_factory=list)
+    summary: SearchResponse | None = None
+
+
+_IndexResult = tuple[list[dict[str, Any]], int] | SearchResponse
 
 
 def search_documents(request: SearchRequest, *, config: WKSConfig | None = None) -> SearchResponse:
+    with _collect_timings(request.timings) as timings:
+        with _timed("config_load"):
+            loaded_config = config or _SEARCH_RUNTIME.load_config()
+        response = _validate_request(loaded_config, request) or _run_search(loaded_config, [request])[0]
+        if timings is not None:
+            response.timings = SearchTimings(**timings.output())
+    return response
+
+
+def stream_search(request: SearchRequest, *, config: WKSConfig | None = None) -> Iterator[SearchStreamEvent]:
+    from ._search_strategy import _strategy_member_event, _strategy_responses, _StrategyFanOut, _StrategyOutcome
+
     loaded_config = config or _SEARCH_RUNTIME.load_config()
-    if loaded_config.index is None:
+    invalid = _validate_request(loaded_config, request)
+    if invalid is not None:
+        yield SearchStreamEvent(event="summary", index_name=invalid.index_name, summary=invalid)
+        return
+
+    strategy_name = _resolve_strategy_name(loaded_config, request)
+    if not strategy_name:
+        response = _run_search(loaded_config, [request])[0]
+        if response.success:
+            yield SearchStreamEvent(event="hits", index_name=response.index_name, hits=response.hits)
+        yield SearchStreamEvent(event="summary", index_name=response.index_name, summary=response)
+        return
+
+    outcomes: dict[str, _StrategyOutcome] = {}
+    for index_name, outcome in _StrategyFanOut(
+        loaded_config, [request], strategy_name, explicit=bool(request.strategy)
+    ).outcomes():
+        outcomes[index_name] = outcome
+        yield _strategy_member_event(request, index_name, outcome[0][0], outcome[1])
+    response = _strategy_responses(loaded_config, [request], strategy_name, outcomes)[0]
+    response.embedding_cache = _SEARCH_RUNTIME.query_embedding_stats()
+    yield SearchStreamEvent(event="summary", index_name=strategy_name, summary=response)
+
+
+def _validate_request(config: WKSConfig, request: SearchRequest) -> SearchResponse | None:
+    if config.index is None:
         return _error_response(
             message="Index not configured",
             failure_kind="config",
@@ -77,11 +163,27 @@ def search_documents(request: SearchRequest, *, config: WKSConfig | None = None)
             index_name="",
             search_mode="lexical",
         )
+    return None
 
-    strategy_name = _resolve_strategy_name(loaded_config, request)
+
+def search_many(request: SearchBatchRequest, *, config: WKSConfig | None = None) -> SearchBatchResponse:
+    from ._search_batch import _run_batch
+
+    return _run_batch(config or _SEARCH_RUNTIME.load_config(), request)
+
+
+def _run_search(config: WKSConfig, requests: list[SearchRequest]) -> list[SearchResponse]:
+    from ._search_strategy import _run_strategy_search
+
+    strategy_name = _resolve_strategy_name(config, requests[0])
     if strategy_name:
-        return _run_strategy_search(loaded_config, request, strategy_name, explicit_strategy=bool(request.strategy))
-    return _run_single_index_search(loaded_config, request)
+        responses = _run_strategy_search(config, requests, strategy_name, explicit_strategy=bool(requests[0].strategy))
+    else:
+        responses = _run_single_index_search(config, requests)
+    embedding_cache = _SEARCH_RUNTIME.query_embedding_stats()
+    for response in responses:
+        response.embedding_cache = embedding_cache
+    return responses
 
 
 def _resolve_strategy_name(config: WKSConfig, request: SearchRequest) -> str:
@@ -93,64 +195,52 @@ def _resolve_strategy_name(config: WKSConfig, request: SearchRequest) -> str:
     return ""
 
 
-def _run_single_index_search(config: WKSConfig, request: SearchRequest) -> SearchResponse:
+def _run_single_index_search(config: WKSConfig, requests: list[SearchRequest]) -> list[SearchResponse]:
+    from ._search_embeddings import _QueryEmbeddings
+    from ._search_lexical import _lexical_index_hits
+    from ._search_semantic import _semantic_index_hits
+
     assert config.index is not None
-    index_name = request.index if request.index else config.index.default_index
+    index_name = requests[0].index if requests[0].index else config.index.default_index
     if index_name not in config.index.indexes:
         available = list(config.index.indexes.keys())
-        return _error_response(
-            message=f"Unknown index: {index_name}",
-            failure_kind="not_found",
-            errors=[f"Index '{index_name}' not defined in config (available: {available})"],
-            query=_query_output(request),
-            index_name=index_name,
-            search_mode="lexical",
-        )
+        return [
+            _error_response(
+                message=f"Unknown index: {index_name}",
+                failure_kind="not_found",
+                errors=[f"Index '{index_name}' not defined in config (available: {available})"],
+                query=_query_output(request),
+                index_name=index_name,
+                search_mode="lexical",
+            )
+            for request in requests
+        ]
 
     spec = config.index.indexes[index_name]
     if spec.embedding_model is not None:
-        return _run_semantic_search(config, request, index_name, spec)
-    return _run_lexical_search(config, request, index_name)
+        results = _semantic_index_hits(config, requests, index_name, spec, _QueryEmbeddings(requests))
+        search_mode: Literal["lexical", "semantic"] = "semantic"
+    else:
+        results = [_lexical_index_hits(config, request, index_name) for request in requests]
+        search_mode = "lexical"
+    return [
+        _index_response(request, index_name, search_mode, spec.embedding_model, result)
+        for request, result in zip(requests, results, strict=True)
+    ]
 
 
-def _run_semantic_search(
-    config: WKSConfig,
+def _index_response(
     request: SearchRequest,
     index_name: str,
-    spec: _IndexSpec,
+    search_mode: Literal["lexical", "semantic"],
+    embedding_model: str | None,
+    result: _IndexResult,
 ) -> SearchResponse:
-    embedding_model = spec.embedding_model
-    assert embedding_model is not None
-    semantic_state = _SEARCH_RUNTIME.get_semantic_index_state(config, index_name, embedding_model)
-    if not semantic_state.docs:
-        return _error_response(
-            message=f"No embeddings for index '{index_name}'",
-            failure_kind="not_found",
-            errors=[
-                f"No embeddings found for index '{index_name}' and model '{embedding_model}'. "
-                "Run: wksc index embed <index_name>"
-            ],
-            query=_query_output(request),
-            index_name=index_name,
-            search_mode="semantic",
-            embedding_model=embedding_model,
-            total_chunks=0,
-        )
-
-    try:
-        hits = _rank_semantic_hits(semantic_state, spec, request.query, request.query_image, request.k)
-    except Exception as exc:
-        return _error_response(
-            message=str(exc),
-            failure_kind="runtime",
-            errors=[str(exc)],
-            query=_query_output(request),
-            index_name=index_name,
-            search_mode="semantic",
-            embedding_model=embedding_model,
-            total_chunks=len(semantic_state.docs),
-        )
-
+    if isinstance(result, SearchResponse):
+        return result
+    hits, total_chunks = result
+    with _timed("serialization"):
+        search_hits = [_search_hit(hit) for hit in hits]
     return SearchResponse(
         success=True,
         message=f"Found {len(hits)} results for '{_query_output(request)}'",
@@ -158,284 +248,17 @@ def _run_semantic_search(
         warnings=[],
         query=_query_output(request),
         index_name=index_name,
-        search_mode="semantic",
+        search_mode=search_mode,
         embedding_model=embedding_model,
-        hits=[SearchHit(**hit) for hit in hits],
-        total_chunks=len(semantic_state.docs),
-    )
-
-
-def _run_lexical_search(config: WKSConfig, request: SearchRequest, index_name: str) -> SearchResponse:
-    if request.query_image.strip():
-        return _error_response(
-            message="query_image is only supported for semantic indexes",
-            failure_kind="validation",
-            errors=["query_image requires an index configured with embedding_model"],
-            query=_query_output(request),
-            index_name=index_name,
-            search_mode="lexical",
-        )
-    if not request.query.strip():
-        return SearchResponse(
-            success=True,
-            message="Found 0 results for ''",
-            errors=[],
-            warnings=[],
-            query="",
-            index_name=index_name,
-            search_mode="lexical",
-            embedding_model=None,
-            hits=[],
-            total_chunks=0,
-        )
-
-    try:
-        total_chunks, candidate_chunks = _SEARCH_RUNTIME.search_lexical_chunks(
-            config,
-            index_name,
-            request.query,
-            _lexical_candidate_limit(request.k),
-        )
-    except RuntimeError as exc:
-        return _error_response(
-            message=str(exc),
-            failure_kind="runtime",
-            errors=[str(exc)],
-            query=request.query,
-            index_name=index_name,
-            search_mode="lexical",
-        )
-    if total_chunks == 0:
-        return _error_response(
-            message=f"Index '{index_name}' is empty",
-            failure_kind="not_found",
-            errors=[f"Index '{index_name}' is empty"],
-            query=request.query,
-            index_name=index_name,
-            search_mode="lexical",
-        )
-
-    hits = _rank_lexical_chunks(candidate_chunks, request.query, request.k)
-    return SearchResponse(
-        success=True,
-        message=f"Found {len(hits)} results for '{request.query}'",
-        errors=[],
-        warnings=[],
-        query=request.query,
-        index_name=index_name,
-        search_mode="lexical",
-        embedding_model=None,
-        hits=[SearchHit(**hit) for hit in hits],
-        total_chunks=total_chunks,
-    )
-
-
-def _run_strategy_search(
-    config: WKSConfig,
-    request: SearchRequest,
-    strategy_name: str,
-    *,
-    explicit_strategy: bool,
-) -> SearchResponse:
-    assert config.index is not None
-    if strategy_name not in config.index.strategies:
-        available = list(config.index.strategies.keys())
-        return _error_response(
-            message=f"Unknown strategy: {strategy_name}",
-            failure_kind="not_found",
-            errors=[f"Strategy '{strategy_name}' not defined in config (available: {available})"],
-            query=_query_output(request),
-            index_name=strategy_name,
-            search_mode="combined",
-        )
-
-    strategy = config.index.strategies[strategy_name]
-    over_fetch = request.k * 3
-    ranked_lists: list[list[dict[str, Any]]] = []
-    warnings: list[str] = []
-    total_chunks = 0
-
-    for index_name in strategy.indexes:
-        if index_name not in config.index.indexes:
-            warnings.append(f"Strategy index '{index_name}' not found, skipping")
-            continue
-        spec = config.index.indexes[index_name]
-        if spec.embedding_model is not None:
-            if not explicit_strategy and not request.query_image.strip():
-                embedding_count = _SEARCH_RUNTIME.count_semantic_embeddings(config, index_name, spec.embedding_model)
-                if embedding_count > MAX_IMPLICIT_SEMANTIC_EMBEDDINGS:
-                    warnings.append(
-                        f"Skipping semantic index '{index_name}' in implicit strategy '{strategy_name}' "
-                        f"({embedding_count} embeddings exceeds {MAX_IMPLICIT_SEMANTIC_EMBEDDINGS}); "
-                        f"use --strategy {strategy_name} to include it explicitly"
-                    )
-                    continue
-            semantic_response = _run_semantic_search(
-                config,
-                SearchRequest(
-                    query=request.query,
-                    index=index_name,
-                    k=over_fetch,
-                    query_image=request.query_image,
-                ),
-                index_name,
-                spec,
-            )
-            if semantic_response.success:
-                ranked_lists.append([hit.model_dump(mode="python") for hit in semantic_response.hits])
-                total_chunks += len(semantic_response.hits)
-            else:
-                warnings.extend(semantic_response.errors)
-            continue
-        if not request.query.strip():
-            continue
-        lexical_response = _run_lexical_search(
-            config,
-            SearchRequest(query=request.query, index=index_name, k=over_fetch),
-            index_name,
-        )
-        if lexical_response.success:
-            ranked_lists.append([hit.model_dump(mode="python") for hit in lexical_response.hits])
-            total_chunks += len(lexical_response.hits)
-        else:
-            warnings.extend(lexical_response.errors)
-
-    if not ranked_lists:
-        return SearchResponse(
-            success=True,
-            message=f"No results from any index in strategy '{strategy_name}'",
-            errors=[],
-            warnings=warnings,
-            query=_query_output(request),
-            index_name=strategy_name,
-            search_mode="combined",
-            embedding_model=None,
-            hits=[],
-            total_chunks=0,
-        )
-
-    merged = rrf_merge(ranked_lists, request.k)
-    hits = _dedupe_hits(merged, request.k)
-    return SearchResponse(
-        success=True,
-        message=f"Found {len(hits)} results for '{_query_output(request)}'",
-        errors=[],
-        warnings=warnings,
-        query=_query_output(request),
-        index_name=strategy_name,
-        search_mode="combined",
-        embedding_model=None,
-        hits=[SearchHit(**hit) for hit in hits],
+        hits=search_hits,
         total_chunks=total_chunks,
     )
 
 
-def _rank_semantic_hits(
-    state: _SemanticIndexState,
-    spec: _IndexSpec,
-    query: str,
-    query_image: str,
-    k: int,
-) -> list[dict[str, Any]]:
-    from wks.api.index._embedding_utils import cosine_scores
-    from wks.api.search._build_query_embedding import build_query_embedding
-
-    if not state.docs:
-        return []
-
-    embedding_model = spec.embedding_model
-    assert embedding_model is not None
-
-    query_embedding = build_query_embedding(
-        query=query,
-        query_image=query_image,
-        embedding_model=embedding_model,
-        embedding_mode=spec.embedding_mode,
-        image_text_weight=spec.image_text_weight,
+def _search_hit(hit: dict[str, Any]) -> SearchHit:
+    return SearchHit(
+        uri=hit["uri"], chunk_index=hit["chunk_index"], score=hit["score"], tokens=hit["tokens"], text=hit["text"]
     )
-    scores = cosine_scores(query_embedding, state.matrix)
-    query_terms = {term.lower() for term in query.split() if term} if query.strip() else set()
-    boosted: list[float] = []
-    for index, segments in enumerate(state.path_segments):
-        if not query_terms or not segments:
-            boosted.append(float(scores[index]))
-            continue
-        matches = sum(1 for term in query_terms if term in segments)
-        boosted.append(float(scores[index]) * (1.0 + 0.2 * matches))
-
-    ranked = sorted(range(len(boosted)), key=lambda item: boosted[item], reverse=True)
-    ranked_hits = [
-        {
-            "uri": state.docs[item]["uri"],
-            "chunk_index": state.docs[item]["chunk_index"],
-            "score": round(boosted[item], 4),
-            "tokens": state.docs[item]["tokens"],
-            "text": state.docs[item]["text"],
-        }
-        for item in ranked
-    ]
-    return _dedupe_hits(ranked_hits, k)
-
-
-def _rank_lexical_hits(state: _LexicalIndexState, query: str, k: int) -> list[dict[str, Any]]:
-    if state.bm25 is None:
-        return []
-    query_terms = set(query.lower().split())
-    scores = state.bm25.get_scores(list(query_terms))
-    ranked = sorted(range(len(scores)), key=lambda item: scores[item], reverse=True)
-    ranked_hits = [
-        {
-            "uri": state.chunks[item].uri,
-            "chunk_index": state.chunks[item].chunk_index,
-            "score": round(float(scores[item]), 4),
-            "tokens": state.chunks[item].tokens,
-            "text": state.chunks[item].text,
-        }
-        for item in ranked
-        if query_terms.intersection(state.corpus[item])
-    ]
-    return _dedupe_hits(ranked_hits, k)
-
-
-def _rank_lexical_chunks(chunks: list[Any], query: str, k: int) -> list[dict[str, Any]]:
-    if not chunks:
-        return []
-    corpus = [chunk.text.lower().split() for chunk in chunks]
-    if not corpus:
-        return []
-    from rank_bm25 import BM25Okapi
-
-    bm25 = BM25Okapi(corpus)
-    query_terms = set(query.lower().split())
-    scores = bm25.get_scores(list(query_terms))
-    ranked = sorted(range(len(scores)), key=lambda item: scores[item], reverse=True)
-    ranked_hits = []
-    for item in ranked:
-        if not query_terms.intersection(corpus[item]):
-            continue
-        score = float(scores[item])
-        if score <= 0.0:
-            score = _term_frequency_score(query_terms, corpus[item])
-        ranked_hits.append(
-            {
-                "uri": chunks[item].uri,
-                "chunk_index": chunks[item].chunk_index,
-                "score": round(score, 4),
-                "tokens": chunks[item].tokens,
-                "text": chunks[item].text,
-            }
-        )
-    return _dedupe_hits(ranked_hits, k)
-
-
-def _lexical_candidate_limit(k: int) -> int:
-    return min(max(k * 200, 1000), 10000)
-
-
-def _term_frequency_score(query_terms: set[str], terms: list[str]) -> float:
-    if not terms:
-        return 0.0
-    return sum(1 for term in terms if term in query_terms) / len(terms)
 
 
 def _query_output(request: SearchRequest) -> str: